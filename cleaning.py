@@ -1,12 +1,22 @@
 # scripts/make_dataset_6000.py
-import re, os
+import argparse, re, os
 import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from core.obyek import default_normalizer, normalize_obyek
+
 SRC = "data/data3.csv"
 OUT = "data/data_augmented_6000.csv"
 TARGET_SIZE = 6000
+CHUNK_SIZE = 200_000
+SEED = 42
+# Dummy ditarik per blok tetap; blok ke-i memakai SeedSequence(seed).spawn()[i], sehingga
+# isi file hanya tergantung seed & target_size, tidak pada --chunk-size (ukuran tulis CSV).
+DUMMY_BLOCK = 10_000
+
+# rentang jam [awal, akhir) per bucket, urutan sama dengan jam_bucket()
+JAM_RANGE = {"dini": (0, 6), "pagi": (6, 12), "siang": (12, 18), "malam": (18, 24)}
 
 def extract_kecamatan(lokasi: str) -> str:
     if not isinstance(lokasi, str): return "lainnya"
@@ -15,15 +25,8 @@ def extract_kecamatan(lokasi: str) -> str:
     return kec.title() if kec else "Lainnya"
 
 # Standarisasi obyek ke kategori kecil yang konsisten
-def std_obyek(obyek: str) -> str:
-    s = (obyek or "").lower()
-    if any(k in s for k in ["rumah", "kontrakan", "kos", "asrama"]): return "rumah"
-    if any(k in s for k in ["toko", "ruko", "counter", "kios", "cafe", "kafe", "warung", "resto", "kedai"]): return "toko"
-    if any(k in s for k in ["pasar"]): return "pasar"
-    if any(k in s for k in ["pabrik", "industri", "gudang"]): return "pabrik"
-    if any(k in s for k in ["panel listrik", "gardu", "trafo", "kabel listrik", "listrik"]): return "instalasi_listrik"
-    if any(k in s for k in ["kantor", "instansi", "sekolah", "kampus"]): return "kantor"
-    return "lainnya"
+# (tabel kata kunci & automaton dipakai bersama FirePredictor dan data source: core/obyek.py)
+std_obyek = normalize_obyek
 
 def jam_bucket(jam):
     try:
@@ -35,9 +38,60 @@ def jam_bucket(jam):
     elif 12 <= h <= 17: return "siang"
     else:               return "malam"
 
-def main():
-    assert os.path.exists(SRC), f"File tidak ditemukan: {SRC}"
-    df = pd.read_csv(SRC)
+def fit_distributions(df: pd.DataFrame, cap: float) -> dict:
+    """Distribusi kategorikal & numerik dari data real, dipakai sampler dummy."""
+    def probs(col):
+        p = df[col].value_counts(normalize=True)
+        return p.index.to_numpy(), p.to_numpy()
+    mob = df["mobil"].astype(int).value_counts(normalize=True)
+    return {
+        "kecamatan": probs("kecamatan"), "kawasan_std": probs("kawasan_std"),
+        "obyek_std": probs("obyek_std"), "jam_bucket": probs("jam_bucket"),
+        "mobil": (mob.index.to_numpy(dtype=np.int64), mob.to_numpy()),
+        "air_mean": df["air"].mean(), "air_std": max(df["air"].std(), 1.0), "cap": cap,
+    }
+
+def sample_dummy(dist: dict, n: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Tarik n baris dummy sekaligus (tanpa loop per baris)."""
+    def cat(col):
+        cats, p = dist[col]
+        return cats[rng.choice(len(cats), size=n, p=p)]
+
+    kec, kaw, obj, jb = cat("kecamatan"), cat("kawasan_std"), cat("obyek_std"), cat("jam_bucket")
+
+    # jam dari bucket: awal + offset acak di dalam rentang bucket
+    lo = np.full(n, JAM_RANGE["malam"][0], dtype=np.int64)
+    width = np.full(n, 6, dtype=np.int64)
+    for b, (a, z) in JAM_RANGE.items():
+        m = jb == b
+        lo[m], width[m] = a, z - a
+    jam = lo + (rng.random(n) * width).astype(np.int64)
+    bulan = rng.integers(1, 13, size=n)
+
+    # air ~ normal di sekitar mean, lalu sesuaikan sedikit berdasar obyek/kawasan
+    air = rng.normal(dist["air_mean"], dist["air_std"] * 0.9, size=n)
+    besar = np.isin(obj, ["pabrik", "pasar"])
+    kecil = np.isin(obj, ["rumah", "toko"])
+    air = np.where(besar, air * 1.2, air)
+    air = np.where(kecil, air * 0.9, air)
+    air = np.where(kaw == "pemukiman", air * 0.95, air)
+    air = np.round(np.clip(air, 2.0, dist["cap"]), 2)  # batas bawah 2 m3
+
+    # mobil: sampling dari distribusi nyata + penyesuaian ringan
+    mob_vals, mob_p = dist["mobil"]
+    mob = mob_vals[rng.choice(len(mob_vals), size=n, p=mob_p)]
+    mob = np.where(besar, np.maximum(mob, 3), mob)
+    mob = np.where(kecil, np.maximum(mob, 1), mob)
+
+    return pd.DataFrame({
+        "kecamatan": kec, "kawasan_std": kaw, "obyek_std": obj,
+        "bulan": bulan, "jam": jam, "jam_bucket": jb,
+        "air": air, "mobil": mob,
+    })
+
+def main(src=SRC, out=OUT, target_size=TARGET_SIZE, seed=SEED, chunk_size=CHUNK_SIZE):
+    assert os.path.exists(src), f"File tidak ditemukan: {src}"
+    df = pd.read_csv(src)
 
     # pastikan kolom yang dipakai ada
     needed = ["lokasi","kawasan","obyek","air","mobil","jam","bulan"]
@@ -47,7 +101,7 @@ def main():
 
     # bersihkan/standar
     df["kecamatan"]   = df["lokasi"].apply(extract_kecamatan)
-    df["obyek_std"]   = df["obyek"].apply(std_obyek)
+    df["obyek_std"]   = default_normalizer().normalize_series(df["obyek"])
     df["kawasan_std"] = df["kawasan"].astype(str).str.strip().str.lower()
     df["bulan"]       = pd.to_numeric(df["bulan"], errors="coerce").fillna(1).astype(int).clip(1,12)
     df["jam"]         = pd.to_numeric(df["jam"], errors="coerce").fillna(12).astype(int).clip(0,23)
@@ -64,68 +118,36 @@ def main():
 
     base_cols = ["kecamatan","kawasan_std","obyek_std","bulan","jam","jam_bucket","air","mobil"]
 
-    # kalau data sudah >= TARGET_SIZE, cukup sampling ulang agar pas 6000
-    if len(df) >= TARGET_SIZE:
-        final = df.sample(TARGET_SIZE, replace=False, random_state=42)[base_cols].reset_index(drop=True)
-        final.to_csv(OUT, index=False)
-        print(f"✅ Disimpan: {OUT} (ambil sampel dari real), rows={len(final)}")
+    # kalau data sudah >= target_size, cukup sampling ulang agar pas
+    if len(df) >= target_size:
+        final = df.sample(target_size, replace=False, random_state=seed)[base_cols].reset_index(drop=True)
+        final.to_csv(out, index=False)
+        print(f"✅ Disimpan: {out} (ambil sampel dari real), rows={len(final)}")
         return
 
-    # ------- generate dummy -------
-    n_need = TARGET_SIZE - len(df)
-    rng = np.random.default_rng(42)
-
-    # Distribusi kategorikal dari data real
-    p_kec   = df["kecamatan"].value_counts(normalize=True)
-    p_kaw   = df["kawasan_std"].value_counts(normalize=True)
-    p_obj   = df["obyek_std"].value_counts(normalize=True)
-    p_jb    = df["jam_bucket"].value_counts(normalize=True)
-
-    # Untuk nilai numerik, sampling dari real + noise ringan
-    air_mean, air_std = df["air"].mean(), max(df["air"].std(), 1.0)
-    mob_counts = df["mobil"].value_counts(normalize=True)
-
-    def sample_cat(series_prob):
-        cats = series_prob.index.to_list()
-        probs= series_prob.values
-        return rng.choice(cats, p=probs)
-
-    dummies = []
-    for _ in range(n_need):
-        kec  = sample_cat(p_kec)
-        kaw  = sample_cat(p_kaw)
-        obj  = sample_cat(p_obj)
-        jb   = sample_cat(p_jb)
-        # jam dari bucket
-        if jb == "dini":  jam = int(rng.integers(0,6))
-        elif jb == "pagi": jam = int(rng.integers(6,12))
-        elif jb == "siang":jam = int(rng.integers(12,18))
-        else:              jam = int(rng.integers(18,24))
-        bulan = int(rng.integers(1,13))
-
-        # air ~ normal di sekitar mean, lalu sesuaikan sedikit berdasar obyek/kawasan
-        air = rng.normal(air_mean, air_std*0.9)
-        if obj in ["pabrik","pasar"]: air *= 1.2
-        if obj in ["rumah","toko"]:   air *= 0.9
-        if kaw in ["pemukiman"]:       air *= 0.95
-        air = float(np.clip(air, 2.0, cap))  # batas bawah 2 m3
-
-        # mobil: sampling dari distribusi nyata + penyesuaian ringan
-        mob = int(rng.choice(mob_counts.index.to_list(), p=mob_counts.values))
-        if obj in ["pabrik","pasar"]: mob = max(mob, 3)
-        if obj in ["rumah","toko"]:   mob = max(mob, 1)
-
-        dummies.append({
-            "kecamatan":kec, "kawasan_std":kaw, "obyek_std":obj,
-            "bulan":bulan, "jam":jam, "jam_bucket":jb,
-            "air":round(air,2), "mobil":mob
-        })
-
-    df_dummy = pd.DataFrame(dummies)
-    final = pd.concat([df[base_cols], df_dummy[base_cols]], ignore_index=True)
-    final.to_csv(OUT, index=False)
-    print(f"✅ Disimpan: {OUT} (real+dummy), rows={len(final)}")
+    # ------- generate dummy (vektor, per blok; beberapa blok per tulis CSV) -------
+    n_need = target_size - len(df)
+    n_blocks = -(-n_need // DUMMY_BLOCK)
+    seeds = np.random.SeedSequence(seed).spawn(n_blocks)
+    per_write = max(1, chunk_size // DUMMY_BLOCK)
+    dist = fit_distributions(df, cap)
+
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    df[base_cols].to_csv(out, index=False)
+    for first in range(0, n_blocks, per_write):
+        parts = [sample_dummy(dist, min(DUMMY_BLOCK, n_need - i * DUMMY_BLOCK), np.random.default_rng(seeds[i]))
+                 for i in range(first, min(first + per_write, n_blocks))]
+        pd.concat(parts, ignore_index=True)[base_cols].to_csv(out, mode="a", header=False, index=False)
+    print(f"✅ Disimpan: {out} (real+dummy), rows={len(df) + n_need}")
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Bersihkan data real + tambah dummy sampai target_size baris.")
+    ap.add_argument("--src", default=SRC)
+    ap.add_argument("--out", default=OUT)
+    ap.add_argument("--target-size", type=int, default=TARGET_SIZE)
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                    help="Baris dummy per tulis CSV (kelipatan blok %d; tidak mengubah isi file)." % DUMMY_BLOCK)
+    args = ap.parse_args()
     Path("data").mkdir(exist_ok=True)
-    main()
+    main(args.src, args.out, args.target_size, args.seed, args.chunk_size)
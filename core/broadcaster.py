@@ -0,0 +1,93 @@
+# core/broadcaster.py
+import json
+import queue
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+
+class Broadcaster:
+    """
+    Satu sumber event untuk semua klien Server-Sent Events (/api/stream).
+
+    Event dipublikasikan sekali lalu disalin ke antrean tiap klien, jadi jumlah klien
+    tidak menambah pembacaan sheet. Klien yang terlalu lambat (antrean penuh) diputus
+    dan akan reconnect sendiri lewat EventSource.
+    """
+
+    def __init__(self, queue_size: int = 100, heartbeat: float = 15.0):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._clients: set = set()
+        self._lock = threading.Lock()
+        self._poller: Optional[threading.Thread] = None
+        self._event_id = 0
+
+    @property
+    def client_count(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def publish(self, event: str, data: dict) -> None:
+        with self._lock:
+            self._event_id += 1
+            msg = f"id: {self._event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+            for q in list(self._clients):
+                try:
+                    q.put_nowait(msg)
+                except queue.Full:
+                    self._clients.discard(q)
+                    self._close(q)
+
+    @staticmethod
+    def _close(q: queue.Queue) -> None:
+        # buang satu pesan lama supaya sinyal putus (None) pasti muat
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            q.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def stream(self) -> Iterator[str]:
+        """Generator untuk `Response(..., mimetype="text/event-stream")`."""
+        q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._clients.add(q)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    msg = q.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ": ping\n\n"   # komentar SSE agar koneksi tidak diputus proxy
+                    continue
+                if msg is None:
+                    return
+                yield msg
+        finally:
+            with self._lock:
+                self._clients.discard(q)
+
+    def start_poller(self, poll: Callable[[], object], interval: float) -> None:
+        """
+        Jalankan satu thread yang memanggil `poll()` tiap `interval` detik selama ada klien,
+        supaya laporan dari penulis lain (bukan dari app ini) ikut terdeteksi.
+        """
+        if self._poller is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                if not self.client_count:
+                    continue
+                try:
+                    poll()
+                except Exception as e:
+                    print(f" Poller stream gagal: {e}")
+
+        self._poller = threading.Thread(target=loop, name="stream-poller", daemon=True)
+        self._poller.start()
@@ -0,0 +1,119 @@
+# core/compression.py
+import gzip
+import zlib
+
+from flask import request
+
+try:  # brotli opsional; tanpa paket ini cukup gzip
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = {"text/html", "application/json", "text/css", "application/javascript", "text/plain"}
+ETAG_SUFFIXES = ("-br", "-gzip")
+
+
+def _accept_q(accept: str) -> dict:
+    """'gzip;q=0.8, br;q=0' -> {'gzip': 0.8, 'br': 0.0}; q yang tidak valid dianggap 0."""
+    out = {}
+    for part in (accept or "").lower().split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for p in params:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        out[coding] = q
+    return out
+
+
+def _pick_encoding(accept: str):
+    """Encoding dengan q tertinggi yang didukung (seri -> br); q=0 berarti ditolak klien."""
+    q = _accept_q(accept)
+    best, best_q = None, 0.0
+    for enc in (("br", "gzip") if brotli is not None else ("gzip",)):
+        w = q.get(enc, q.get("*", 0.0))
+        if w > best_q:
+            best, best_q = enc, w
+    return best
+
+
+def negotiated_encoding(app):
+    """Encoding yang akan dipakai `init_compression` untuk request ini (None = tanpa kompresi)."""
+    if "COMPRESS_RESPONSES" not in app.config or not app.config["COMPRESS_RESPONSES"]:
+        return None
+    return _pick_encoding(request.headers.get("Accept-Encoding"))
+
+
+def _coalesce(chunks, min_chunk):
+    # Jinja menghasilkan potongan sangat kecil; gabungkan dulu supaya flush kompresi tidak boros
+    buf, size = [], 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        buf.append(chunk)
+        size += len(chunk)
+        if size >= min_chunk:
+            yield b"".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b"".join(buf)
+
+
+def _stream_gzip(chunks, level, min_chunk=4096):
+    # wbits 16+ -> header gzip; SYNC_FLUSH per potong supaya browser bisa render bertahap
+    comp = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in _coalesce(chunks, min_chunk):
+        yield comp.compress(chunk) + comp.flush(zlib.Z_SYNC_FLUSH)
+    yield comp.flush()
+
+
+def _stream_brotli(chunks, level, min_chunk=4096):
+    comp = brotli.Compressor(quality=min(level, 11))
+    for chunk in _coalesce(chunks, min_chunk):
+        yield comp.process(chunk) + comp.flush()
+    yield comp.finish()
+
+
+def init_compression(app, min_size: int = 500, level: int = 6) -> None:
+    """
+    Kompres respons HTML/JSON (gzip, atau brotli bila paketnya ada) sesuai Accept-Encoding.
+    Respons streaming dikompres per potong, SSE (text/event-stream) dan file statis
+    (direct_passthrough) dibiarkan apa adanya. ETag diberi akhiran encoding supaya tetap kuat.
+    Bisa dimatikan dengan `app.config["COMPRESS_RESPONSES"] = False`.
+    """
+    app.config.setdefault("COMPRESS_RESPONSES", True)
+
+    @app.after_request
+    def _compress(resp):
+        if not app.config["COMPRESS_RESPONSES"]:
+            return resp
+        if (resp.status_code != 200 or resp.direct_passthrough
+                or "Content-Encoding" in resp.headers
+                or resp.mimetype not in COMPRESSIBLE):
+            return resp
+        enc = negotiated_encoding(app)
+        if enc is None:
+            return resp
+
+        if resp.is_streamed:
+            chunks = resp.response
+            resp.response = _stream_brotli(chunks, level) if enc == "br" else _stream_gzip(chunks, level)
+            resp.headers.pop("Content-Length", None)
+        else:
+            body = resp.get_data()
+            if len(body) < min_size:
+                return resp
+            body = brotli.compress(body, quality=min(level, 11)) if enc == "br" else gzip.compress(body, level)
+            resp.set_data(body)
+
+        resp.headers["Content-Encoding"] = enc
+        resp.vary.add("Accept-Encoding")
+        etag, weak = resp.get_etag()
+        if etag:
+            resp.set_etag(f"{etag}-{enc}", weak=weak)
+        return resp
@@ -1,18 +1,33 @@
 
+import base64
+import hashlib
+import json
 import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from typing import Optional, List, Literal
 
 import gspread
+import numpy as np
 import pandas as pd
 from oauth2client.service_account import ServiceAccountCredentials
 
+from core.kecamatan import KecamatanResolver
+from core.obyek import default_normalizer
+from core.sheets_quota import default_scheduler
+
 
 STANDARD_COLUMNS = [
     "Waktu", "Waktu_dt", "Nama Pelapor", "Alamat",
     "Kecamatan", "Kawasan",
     "Obyek", "Air", "Mobil",
-    "Tanggal", "Pukul", "Bulan"
+    "Tanggal", "Pukul", "Bulan",
+    "Kategori",   # obyek yang sudah distandarkan (core/obyek.py)
+    # realisasi lapangan (diisi petugas setelah kejadian); Air/Mobil di atas = prediksi saat lapor
+    "Air Realisasi", "Mobil Realisasi",
 ]
 
 
@@ -24,6 +39,13 @@ KECAMATAN_BANDUNG: List[str] = [
     "Panyileukan","Rancasari","Regol","Sukajadi","Sukasari","Sumur Bandung","Ujungberung"
 ]
 
+# dimensi yang bisa dipakai /api/stats/pivot (rows/cols)
+PIVOT_DIMENSIONS = ("kecamatan", "kawasan", "obyek", "kategori", "day", "month", "year", "hour", "weekday")
+TIME_DIMENSIONS = {"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}
+
+# kolom yang boleh dipakai untuk urutan tabel (keyset: nilai kolom + nomor baris sheet)
+PAGE_SORT_COLUMNS = {"waktu": "Waktu_dt", "air": "Air", "mobil": "Mobil"}
+
 def _extract_hhmm(text: Optional[str]) -> Optional[str]:
   
     if text is None or (isinstance(text, float) and pd.isna(text)):
@@ -77,8 +99,15 @@ def _parse_ambiguous_datetime(s: Optional[str]) -> pd.Timestamp:
           
             return pd.to_datetime(f"{y}-{mo:02d}-{d:02d} {hh:02d}:{mm:02d}:{ss:02d}", errors="coerce")
 
-   
-    return pd.to_datetime(s, dayfirst=True, errors="coerce")
+    # sisanya lewat pandas; awalan tahun 4 digit (ISO) tidak boleh dibaca day-first (YYYY-DD-MM)
+    return pd.to_datetime(s, dayfirst=not re.match(r"^\d{4}\D", s), errors="coerce")
+
+def _parse_datetime_series(s: pd.Series) -> pd.Series:
+    """
+    Versi Series dari `_parse_ambiguous_datetime`. Jangan `pd.to_datetime(s, dayfirst=True)`:
+    pandas menebak format dari nilai pertama, sehingga ISO '2024-02-01' terbaca 2 Januari.
+    """
+    return pd.to_datetime(s.apply(_parse_ambiguous_datetime), errors="coerce")
 
 def _guess_kecamatan_from_alamat(alamat: Optional[str]) -> str:
   
@@ -91,32 +120,372 @@ def _guess_kecamatan_from_alamat(alamat: Optional[str]) -> str:
     parts = [p.strip() for p in alamat.split(",") if p.strip()]
     return parts[-1] if parts else "Lainnya"
 
+_resolver: Optional[KecamatanResolver] = None
+_resolver_lock = threading.Lock()
+
+def kecamatan_resolver() -> KecamatanResolver:
+    """Resolver kecamatan bersama (cache hasil dipersist di <cache>/kecamatan.json)."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            base = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+            cache_dir = os.getenv("FIREAI_CACHE_DIR", os.path.join(base, "cache"))
+            _resolver = KecamatanResolver(KECAMATAN_BANDUNG, cache_path=os.path.join(cache_dir, "kecamatan.json"))
+        return _resolver
+
+def records_json(df: pd.DataFrame) -> list:
+    """DataFrame -> list of dict siap-JSON (NaN/NaT -> null, datetime -> ISO)."""
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+def _records_digest(records: list) -> str:
+    return hashlib.sha1(json.dumps(records, default=str, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _encode_cursor(key: float, rid: int) -> str:
+    raw = json.dumps([float(key) if np.isfinite(key) else str(key), int(rid)])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        key, rid = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(key), int(rid)
+    except Exception:
+        raise ValueError("cursor tidak valid")
+
+def parse_date_range(date_from=None, date_to=None) -> tuple:
+    """
+    ('2024-01-01', '2024-03-31') -> (Timestamp awal, Timestamp akhir EKSKLUSIF).
+    Tanggal tanpa jam pada `date_to` berarti sampai akhir hari itu. ValueError kalau tidak valid.
+    """
+    def parse(v, name):
+        if v is None or (isinstance(v, str) and not v.strip()):
+            return None, False
+        try:
+            ts = pd.Timestamp(v)
+        except (ValueError, TypeError):
+            raise ValueError(f"{name} bukan tanggal yang valid: {v!r}")
+        if ts is pd.NaT:
+            raise ValueError(f"{name} bukan tanggal yang valid: {v!r}")
+        date_only = isinstance(v, str) and len(v.strip()) <= 10
+        return (ts.tz_localize(None) if ts.tzinfo else ts), date_only
+
+    start, _ = parse(date_from, "from")
+    end, date_only = parse(date_to, "to")
+    if end is not None and date_only:
+        end = end + pd.Timedelta(days=1)
+    elif end is not None:
+        end = end + pd.Timedelta(microseconds=1)
+    if start is not None and end is not None and end <= start:
+        raise ValueError("rentang tanggal kosong: to lebih awal dari from")
+    return start, end
+
 class SheetReader:
     def __init__(self, sheet_name: Optional[str] = None,
                  cred_filename: Optional[str] = None,
-                 worksheet: Optional[str] = None):
+                 worksheet: Optional[str] = None,
+                 sheet=None, spreadsheet=None, shards: Optional[str] = None,
+                 scheduler=None):
         self.sheet_name = sheet_name or os.getenv("GSHEET_NAME", "PrediksiKebakaran")
         cred_filename = cred_filename or os.getenv("GSHEET_CRED_FILE", "gsheet-cred.json") #ganti gsheet-cred.json dengan nama folder yang ada di secrete
         self.worksheet = worksheet  # 
+        # Layout arsip: "" = satu worksheet; "year" = satu worksheet per tahun (judul mengandung 4 digit tahun)
+        self.shard_mode = (shards if shards is not None else os.getenv("GSHEET_SHARDS", "")).lower()
+        self.spreadsheet = spreadsheet
+        # semua panggilan ke Sheets API lewat scheduler kuota (lihat core/sheets_quota.py);
+        # sheet/spreadsheet siap pakai (sintetis) tidak dibatasi kecuali scheduler diberikan
+        self.scheduler = scheduler
+
+        if sheet is not None:
+            # worksheet siap pakai (apa saja yang punya get_all_records), mis. data sintetis untuk benchmark
+            if self.shard_mode and spreadsheet is None:
+                if shards:
+                    raise ValueError("shards='year' butuh spreadsheet=... (daftar worksheet), bukan sheet=...")
+                self.shard_mode = ""   # GSHEET_SHARDS dari env tidak berlaku untuk satu worksheet siap pakai
+            self.sheet = sheet
+        elif spreadsheet is not None:
+            # spreadsheet siap pakai (punya worksheets()/sheet1), mis. arsip sintetis per tahun
+            self.sheet = None if self.shard_mode else spreadsheet.sheet1
+        else:
+            base_dir = os.path.dirname(os.path.abspath(__file__))
+            cred_path = os.path.normpath(os.path.join(base_dir, "..", "secrets", cred_filename))
+
+            scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+            creds = ServiceAccountCredentials.from_json_keyfile_name(cred_path, scope)
+            client = gspread.authorize(creds)
+            self.spreadsheet = client.open(self.sheet_name)
+            self.sheet = self.spreadsheet.worksheet(self.worksheet) if self.worksheet else self.spreadsheet.sheet1
+            self.scheduler = scheduler or default_scheduler()
+
+        # Snapshot: hasil baca sheet disimpan sampai `cache_ttl` detik.
+        # `version` naik setiap kali isi sheet berubah -> dipakai untuk ETag & memo agregasi.
+        self.cache_ttl = float(os.getenv("GSHEET_CACHE_TTL", "30"))
+        self.version = 0
+        self._digest = ""
+        self._snapshot: Optional[pd.DataFrame] = None
+        self._fetched_at = 0.0
+        self._memo: dict = {}
+        self._listeners: list = []
+        self._lock = threading.RLock()          # state snapshot (cepat, tanpa I/O)
+        self._refresh_lock = threading.RLock()  # satu baca sheet + pemanggilan listener pada satu waktu
+        self._invalidations = 0
+        self._bg_lock = threading.Lock()
+        self._bg_refresh: Optional[threading.Thread] = None
+
+        # Shard per tahun: shard tahun berjalan dibaca ulang setiap refresh; worksheet tahun lalu
+        # (tertutup) disimpan dan baru dibaca ulang setelah `closed_shard_ttl` detik, karena
+        # realisasi lapangan masih bisa diisi/diperbaiki setelah tahun berganti.
+        self.shard_workers = int(os.getenv("GSHEET_SHARD_WORKERS", "4"))
+        self.shard_list_ttl = 300.0
+        self.closed_shard_ttl = float(os.getenv("GSHEET_CLOSED_SHARD_TTL", "3600"))
+        self._shards: list = []              # [(tahun, worksheet)] urut tahun
+        self._shards_listed_at = float("-inf")
+        self._closed_shards: dict = {}       # judul worksheet -> (records, waktu baca monotonic)
+
+        # Baca gagal (kuota habis, 5xx, jaringan) -> snapshot lama tetap disajikan
+        self.last_error: Optional[str] = None
+        self.stale_reads = 0                 # berapa refresh yang jatuh ke snapshot lama
+
+    def _stale(self) -> bool:
+        return self._snapshot is None or time.monotonic() - self._fetched_at >= self.cache_ttl
+
+    def get_dataframe(self) -> pd.DataFrame:
+        """
+        Snapshot terkini (jangan dimodifikasi in-place; frame ini dibagi ke semua pemanggil).
+        Baca sheet berjalan di luar `_lock`: selama satu thread me-refresh, thread lain yang
+        sudah punya snapshot langsung memakai snapshot lama, tidak ikut menunggu jaringan.
+        """
+        with self._lock:
+            snap, stale = self._snapshot, self._stale()
+        if not stale:
+            return snap
+        if not self._refresh_lock.acquire(blocking=snap is None):
+            return snap
+        try:
+            with self._lock:
+                if not self._stale():            # sudah di-refresh thread lain selagi menunggu
+                    return self._snapshot
+            self._refresh()
+            return self._snapshot
+        finally:
+            self._refresh_lock.release()
+
+    def snapshot_version(self) -> int:
+        """Versi snapshot (monoton naik). Tidak membaca sheet selama snapshot masih dalam TTL."""
+        self.get_dataframe()
+        return self.version
+
+    def snapshot_tag(self) -> str:
+        """Versi + digest isi; unik walau `version` mulai dari 1 lagi setelah restart."""
+        v = self.snapshot_version()
+        return f"{v}.{self._digest[:16]}"
+
+    def cached_tag(self) -> str:
+        """
+        Seperti `snapshot_tag` tapi tidak pernah menunggu baca sheet (untuk revalidasi ETag).
+        Kalau TTL sudah lewat, refresh dijalankan di thread latar; request berikutnya melihat versi baru.
+        """
+        if time.monotonic() - self._fetched_at >= self.cache_ttl:
+            self._refresh_in_background()
+        return f"{self.version}.{self._digest[:16]}"
+
+    def _refresh_in_background(self) -> None:
+        with self._bg_lock:
+            if self._bg_refresh is not None and self._bg_refresh.is_alive():
+                return
+            self._bg_refresh = threading.Thread(target=self.get_dataframe, name="sheet-refresh", daemon=True)
+            self._bg_refresh.start()
+
+    def subscribe(self, callback) -> None:
+        """
+        Daftarkan `callback(new_rows, snapshot, reset)` yang dipanggil setiap versi naik.
+        Sheet diasumsikan append-only: `new_rows` = baris setelah snapshot lama.
+        Kalau baris lama ikut berubah, `reset=True` dan `new_rows` = seluruh snapshot.
+        Callback dipanggil setelah `_lock` dilepas (request lain tidak ikut menunggu), berurutan
+        per versi, oleh thread yang me-refresh; refresh berikutnya menunggu callback selesai.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    @property
+    def degraded(self) -> bool:
+        """True kalau refresh terakhir gagal dan yang disajikan adalah snapshot lama."""
+        return self.last_error is not None
+
+    @property
+    def unavailable(self) -> bool:
+        """Belum pernah berhasil membaca sheet (snapshot kosong hanya pengganti)."""
+        return self.degraded and self.version == 0
+
+    def status(self) -> dict:
+        return {"version": self.version, "degraded": self.degraded, "unavailable": self.unavailable,
+                "last_error": self.last_error, "stale_reads": self.stale_reads,
+                "age_s": round(time.monotonic() - self._fetched_at, 1) if self._fetched_at > 0 else None}
+
+    def _call(self, fn, *args):
+        if self.scheduler is None:
+            return fn(*args)
+        return self.scheduler.call(fn, *args, kind="read")
+
+    def invalidate(self) -> None:
+        """Paksa baca ulang pada akses berikutnya (mis. setelah aplikasi menambah baris)."""
+        with self._lock:
+            self._fetched_at = float("-inf")
+            self._invalidations += 1
+
+    def memo(self, name: str, params: tuple, fn):
+        """Cache hasil turunan (agregasi dsb.) per versi snapshot."""
+        self.get_dataframe()
+        with self._lock:
+            key = (self.version, name, params)
+            if key in self._memo:
+                return self._memo[key]
+        # dihitung di luar lock; hasil versi lama yang telat selesai tidak akan pernah dipakai
+        value = fn()
+        with self._lock:
+            if len(self._memo) >= 256:
+                self._memo.clear()
+            self._memo[key] = value
+        return value
+
+    # === Shard per tahun ===
+    def _list_shards(self) -> list:
+        now = time.monotonic()
+        year = datetime.now().year
+        if (now - self._shards_listed_at < self.shard_list_ttl
+                and any(y == year for y, _ in self._shards)):
+            return self._shards
+        shards = []
+        for ws in self._call(self.spreadsheet.worksheets):
+            m = re.search(r"(19|20)\d{2}", ws.title)
+            if m:
+                shards.append((int(m.group(0)), ws))
+        self._shards = sorted(shards, key=lambda x: x[0])
+        self._shards_listed_at = now
+        return self._shards
+
+    def _fetch_sharded(self) -> list:
+        """Gabungan records semua shard (urut tahun); yang belum di-cache dibaca paralel."""
+        shards = self._list_shards()
+        this_year = datetime.now().year
+        now = time.monotonic()
+
+        def cached(y, ws):
+            hit = self._closed_shards.get(ws.title)
+            return y < this_year and hit is not None and now - hit[1] < self.closed_shard_ttl
+
+        todo = [ws for y, ws in shards if not cached(y, ws)]
+        fresh = {}
+        if todo:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.shard_workers, len(todo)))) as pool:
+                fresh = dict(zip([ws.title for ws in todo], pool.map(lambda ws: self._call(ws.get_all_records), todo)))
+
+        records = []
+        for y, ws in shards:
+            if ws.title in fresh:
+                recs = fresh[ws.title]
+                if y < this_year:
+                    self._closed_shards[ws.title] = (recs, now)
+            else:
+                recs = self._closed_shards[ws.title][0]
+            records.extend(recs)
+        return records
 
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        cred_path = os.path.normpath(os.path.join(base_dir, "..", "secrets", cred_filename))
+    def _fetch_records(self) -> list:
+        if self.shard_mode == "year":
+            return self._fetch_sharded()
+        return self._call(self.sheet.get_all_records)
 
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = ServiceAccountCredentials.from_json_keyfile_name(cred_path, scope)
-        client = gspread.authorize(creds)
-        self.sheet = client.open(self.sheet_name).worksheet(self.worksheet) if self.worksheet else client.open(self.sheet_name).sheet1
+    # === Indeks waktu ===
+    def time_index(self) -> tuple:
+        """
+        (posisi baris, waktu int64 ns) untuk baris ber-waktu valid, urut waktu.
+        Dibangun sekali per versi snapshot; rentang tanggal = dua `searchsorted`.
+        """
+        return self.memo("time_index", (), self._build_time_index)
 
-  
-    def get_dataframe(self) -> pd.DataFrame:
+    def _build_time_index(self) -> tuple:
+        df = self._snapshot
+        if "Waktu_dt" in df.columns and pd.api.types.is_datetime64_any_dtype(df["Waktu_dt"]):
+            dt = df["Waktu_dt"]
+        elif "Waktu" in df.columns:
+            dt = _parse_datetime_series(df["Waktu"])
+        else:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.int64)
+        if getattr(dt.dt, "tz", None) is not None:
+            dt = dt.dt.tz_localize(None)
+        t = dt.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        pos = np.flatnonzero(dt.notna().to_numpy())
+        order = pos[np.argsort(t[pos], kind="stable")]
+        return order, t[order]
+
+    def rows_in_range(self, start=None, end=None) -> tuple:
+        """Irisan indeks waktu untuk [start, end) (Timestamp atau None = tanpa batas)."""
+        order, t = self.time_index()
+        lo = 0 if start is None else int(np.searchsorted(t, start.value, side="left"))
+        hi = len(t) if end is None else int(np.searchsorted(t, end.value, side="left"))
+        return order[lo:hi], t[lo:hi]
+
+    def _refresh(self) -> None:
+        # Dipanggil dengan `_refresh_lock` (hanya thread ini yang mengubah snapshot), jadi
+        # jaringan, parsing & listener bisa di luar `_lock`; `_lock` hanya untuk menukar state.
+        gen = self._invalidations
+        try:
+            records = self._fetch_records()
+        except Exception as e:
+            print(f" Gagal membaca Google Sheet: {e}")
+            with self._lock:
+                self._mark_fetched(gen)
+                self.last_error = f"{type(e).__name__}: {e}"
+                if self._snapshot is None:
+                    # belum pernah berhasil -> pengganti kosong; UI memakai cache disk (lihat `unavailable`)
+                    self._snapshot = self._empty_df()
+                else:
+                    self.stale_reads += 1
+            return
+
+        digest = _records_digest(records)
+        if self._snapshot is not None and digest == self._digest:
+            with self._lock:
+                self._mark_fetched(gen)
+                self.last_error = None
+            return
+
+        prev = self._snapshot
+        n_prev = 0 if prev is None else len(prev)
+        append_only = (prev is not None and 0 < n_prev <= len(records)
+                       and _records_digest(records[:n_prev]) == self._digest)
+        snapshot = self._build_dataframe(records)
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._digest = digest
+            self._mark_fetched(gen)
+            self.last_error = None
+            self.version += 1
+            self._memo.clear()
+
+        if append_only:
+            new_rows, reset = snapshot.iloc[n_prev:], False
+        else:
+            new_rows, reset = snapshot, True
+        for cb in list(self._listeners):
+            try:
+                cb(new_rows, snapshot, reset)
+            except Exception as e:
+                print(f" Listener snapshot gagal: {e}")
+
+    def _mark_fetched(self, gen: int) -> None:
+        # invalidate() selama baca berjalan -> hasil baca ini mungkin belum memuat baris baru
+        self._fetched_at = time.monotonic() if gen == self._invalidations else float("-inf")
+
+    def _build_dataframe(self, records: list) -> pd.DataFrame:
         try:
-            records = self.sheet.get_all_records()
             df = pd.DataFrame(records)
             if df.empty:
                 return self._empty_df()
             df = self._normalize_columns(df)
             df = self._ensure_time_columns(df)
             df = self._ensure_kecamatan_kawasan(df)
+            df = self._ensure_kategori(df)
             df = self._finalize_columns(df)
             return df
         except Exception as e:
@@ -124,22 +493,162 @@ class SheetReader:
             return self._empty_df()
 
     def aggregate(self, by: str = "month", kecamatan: str | None = None,
-                  alamat_contains: str | None = None, obyek: str | None = None) -> pd.DataFrame:
+                  alamat_contains: str | None = None, obyek: str | None = None,
+                  date_from=None, date_to=None) -> pd.DataFrame:
+        """Hitungan per hari/bulan/tahun; `date_from`/`date_to` (inklusif) membatasi rentang waktu."""
+        start, end = parse_date_range(date_from, date_to)
+        return self.memo("aggregate", (by, kecamatan, alamat_contains, obyek, start, end),
+                         lambda: self._aggregate(by, kecamatan, alamat_contains, obyek, start, end))
+
+    def _aggregate(self, by: str, kecamatan: str | None,
+                   alamat_contains: str | None, obyek: str | None,
+                   start=None, end=None) -> pd.DataFrame:
     
         df = self.get_dataframe()
         if df.empty:
             return pd.DataFrame(columns=["label","count"])
 
-      
-        if "Waktu_dt" in df.columns and pd.api.types.is_datetime64_any_dtype(df["Waktu_dt"]):
-            dt = df["Waktu_dt"]
-        elif "Waktu" in df.columns:
-            dt = pd.to_datetime(df["Waktu"], errors="coerce", dayfirst=True)
+        # hanya baris dalam rentang yang disentuh (indeks waktu urut + searchsorted)
+        pos, t = self.rows_in_range(start, end)
+        if kecamatan or alamat_contains or obyek:
+            sub = df.iloc[pos]
+            sub.index = np.arange(len(pos))
+            keep = self._apply_filters(sub, kecamatan=kecamatan, alamat_contains=alamat_contains, obyek=obyek).index
+            t = t[keep.to_numpy()]
+
+        # bucket = datetime64 dipotong ke hari/bulan/tahun (aritmetika integer), t sudah urut
+        unit = {"day": "D", "year": "Y"}.get((by or "month").lower(), "M")
+        buckets, counts = np.unique(t.view("datetime64[ns]").astype(f"datetime64[{unit}]"), return_counts=True)
+        return pd.DataFrame({"label": np.datetime_as_string(buckets), "count": counts})
+
+    def pivot(self, rows: str = "kecamatan", cols: str | None = "month",
+              sums: tuple = (), kecamatan: str | None = None,
+              alamat_contains: str | None = None, obyek: str | None = None) -> dict:
+        """
+        Matriks hitungan 2 dimensi (rows x cols) + opsional jumlah Air/Mobil per sel.
+        Dihitung sekali jalan: label tiap dimensi difaktorkan jadi kode integer,
+        lalu satu `np.bincount` atas kode sel (r * n_cols + c) per metrik.
+        """
+        rows = (rows or "kecamatan").lower()
+        cols = (cols or "").lower() or None
+        for d in (rows, cols):
+            if d is not None and d not in PIVOT_DIMENSIONS:
+                raise ValueError(f"dimensi tidak dikenal: {d} (pilihan: {', '.join(PIVOT_DIMENSIONS)})")
+        sums = tuple(sorted({str(x).lower() for x in sums} & {"air", "mobil"}))
+        params = (rows, cols, sums, kecamatan, alamat_contains, obyek)
+        return self.memo("pivot", params, lambda: self._pivot(*params))
+
+    def _pivot(self, rows: str, cols: str | None, sums: tuple, kecamatan: str | None,
+               alamat_contains: str | None, obyek: str | None) -> dict:
+        out = {"rows": rows, "cols": cols, "row_labels": [], "col_labels": [], "count": []}
+        for m in sums:
+            out[m] = []
+
+        df = self.get_dataframe()
+        if df.empty:
+            return out
+        df = self._apply_filters(df, kecamatan=kecamatan, alamat_contains=alamat_contains, obyek=obyek)
+        if any(d in TIME_DIMENSIONS or d in ("hour", "weekday") for d in (rows, cols) if d):
+            df = df[df["Waktu_dt"].notna()]
+        if df.empty:
+            return out
+
+        r_codes, r_labels = self._dimension_codes(df, rows)
+        if cols:
+            c_codes, c_labels = self._dimension_codes(df, cols)
         else:
-            return pd.DataFrame(columns=["label","count"])
-        df = df.assign(__dt=dt).dropna(subset=["__dt"])
+            c_codes, c_labels = np.zeros(len(df), dtype=np.int64), ["total"]
+        n_r, n_c = len(r_labels), len(c_labels)
+        cell = r_codes * n_c + c_codes
+
+        out["row_labels"], out["col_labels"] = r_labels, c_labels
+        out["count"] = np.bincount(cell, minlength=n_r * n_c).reshape(n_r, n_c).tolist()
+        for m, col in (("air", "Air"), ("mobil", "Mobil")):
+            if m in sums:
+                w = pd.to_numeric(df[col], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+                mat = np.bincount(cell, weights=w, minlength=n_r * n_c).reshape(n_r, n_c)
+                out[m] = np.round(mat, 2).tolist()
+        return out
+
+    @staticmethod
+    def _dimension_codes(df: pd.DataFrame, dim: str) -> tuple:
+        """Label dimensi -> (kode int64 per baris, daftar label terurut)."""
+        if dim in TIME_DIMENSIONS:
+            labels = df["Waktu_dt"].dt.strftime(TIME_DIMENSIONS[dim])
+        elif dim == "hour":
+            labels = df["Waktu_dt"].dt.hour.astype(int)
+        elif dim == "weekday":
+            labels = df["Waktu_dt"].dt.dayofweek.astype(int)   # 0 = Senin
+        else:
+            col = {"kecamatan": "Kecamatan", "kawasan": "Kawasan", "obyek": "Obyek", "kategori": "Kategori"}[dim]
+            labels = df[col].fillna("Lainnya").astype(str).str.strip()
+        codes, uniques = pd.factorize(labels, sort=True)
+        return codes.astype(np.int64), [u.item() if hasattr(u, "item") else u for u in uniques]
+
+    def get_page(self, limit: int = 50, cursor: Optional[str] = None,
+                 sort: str = "waktu", order: str = "desc",
+                 kecamatan: str | None = None, alamat_contains: str | None = None,
+                 obyek: str | None = None) -> dict:
+        """
+        Satu halaman laporan dengan keyset pagination.
+        Urutan = (kolom sort, nomor baris sheet); `cursor` adalah posisi baris terakhir
+        halaman sebelumnya sehingga halaman berikutnya tidak bergeser walau ada baris baru.
+        Nilai kosong (NaT/NaN) selalu ditaruh di akhir.
+        """
+        limit = max(1, min(int(limit), 500))
+        params = (limit, cursor, sort, order, kecamatan, alamat_contains, obyek)
+        return self.memo("page", params, lambda: self._get_page(*params))
 
-   
+    def _get_page(self, limit: int, cursor: Optional[str], sort: str, order: str,
+                  kecamatan: str | None, alamat_contains: str | None, obyek: str | None) -> dict:
+        col = PAGE_SORT_COLUMNS.get((sort or "waktu").lower(), "Waktu_dt")
+        desc = (order or "desc").lower() != "asc"
+
+        df = self.get_dataframe()
+        if df.empty:
+            return {"rows": [], "next_cursor": None}
+        df = self._apply_filters(df, kecamatan=kecamatan, alamat_contains=alamat_contains, obyek=obyek)
+
+        key = self._sort_key(df[col], desc)
+        rid = df.index.to_numpy(dtype=np.int64)
+
+        if cursor:
+            ck, crid = _decode_cursor(cursor)
+            if desc:
+                mask = (key < ck) | ((key == ck) & (rid < crid))
+            else:
+                mask = (key > ck) | ((key == ck) & (rid > crid))
+            df, key, rid = df[mask], key[mask], rid[mask]
+
+        # lexsort: kunci terakhir = kunci utama
+        order_idx = np.lexsort((rid, key))
+        if desc:
+            order_idx = order_idx[::-1]
+        order_idx = order_idx[:limit + 1]
+        has_more = len(order_idx) > limit
+        order_idx = order_idx[:limit]
+
+        page = df.iloc[order_idx]
+        rows = records_json(page)
+        next_cursor = None
+        if has_more and len(order_idx):
+            last = order_idx[-1]
+            next_cursor = _encode_cursor(key[last], rid[last])
+        return {"rows": rows, "next_cursor": next_cursor}
+    
+    def filtered(self, kecamatan: str | None = None, alamat_contains: str | None = None,
+                 obyek: str | None = None) -> pd.DataFrame:
+        """Snapshot dengan filter yang sama seperti aggregate/pivot/get_page."""
+        return self._apply_filters(self.get_dataframe(), kecamatan=kecamatan,
+                                   alamat_contains=alamat_contains, obyek=obyek)
+
+    @staticmethod
+    def _apply_filters(df: pd.DataFrame, kecamatan: str | None = None,
+                       alamat_contains: str | None = None, obyek: str | None = None) -> pd.DataFrame:
+        """
+        Filter kecamatan (exact), alamat (substring) dan obyek (exact pada teks asli ATAU
+        kategori standar, mis. obyek=rumah juga mengambil 'rumah tinggal'), semua case-insensitive.
+        """
         col_kec = "Kecamatan" if "Kecamatan" in df.columns else ("Kawasan" if "Kawasan" in df.columns else None)
         col_oby = "Obyek" if "Obyek" in df.columns else ("Objek" if "Objek" in df.columns else None)
 
@@ -151,26 +660,27 @@ class SheetReader:
        
         if alamat_contains and "Alamat" in df.columns:
             sub = str(alamat_contains).strip().lower()
-            df = df[df["Alamat"].astype(str).str.lower().str.contains(sub, na=False)]
+            df = df[df["Alamat"].astype(str).str.lower().str.contains(sub, na=False, regex=False)]
 
        
         if obyek and col_oby:
             key = str(obyek).strip().lower()
-            df = df[df[col_oby].astype(str).str.strip().str.lower() == key]
-
-     
-        by = (by or "month").lower()
-        if by == "day":
-            df["label"] = df["__dt"].dt.strftime("%Y-%m-%d")
-        elif by == "year":
-            df["label"] = df["__dt"].dt.strftime("%Y")
-        else:  
-            df["label"] = df["__dt"].dt.strftime("%Y-%m")
-
-        out = df.groupby("label", as_index=False).size().rename(columns={"size": "count"})
-        out = out.sort_values("label")
-        return out[["label","count"]]
-    
+            mask = df[col_oby].astype(str).str.strip().str.lower() == key
+            if "Kategori" in df.columns:
+                mask |= df["Kategori"].astype(str) == key
+            df = df[mask]
+
+        return df
+
+    @staticmethod
+    def _sort_key(s: pd.Series, desc: bool) -> np.ndarray:
+        """Kolom sort -> float64; kosong diberi nilai ekstrem supaya selalu di akhir."""
+        if pd.api.types.is_datetime64_any_dtype(s):
+            vals = s.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+            vals[s.isna().to_numpy()] = np.nan
+        else:
+            vals = pd.to_numeric(s, errors="coerce").to_numpy(dtype=np.float64)
+        return np.where(np.isnan(vals), -np.inf if desc else np.inf, vals)
    
     def _empty_df(self) -> pd.DataFrame:
         return pd.DataFrame(columns=STANDARD_COLUMNS)
@@ -190,6 +700,8 @@ class SheetReader:
             "Pelapor": "Nama Pelapor",
             "Nama Pelapor ": "Nama Pelapor",
             "Jam": "Pukul",
+            "Realisasi Air": "Air Realisasi",
+            "Realisasi Mobil": "Mobil Realisasi",
         }
         for src, dst in alias_map.items():
             if src in df.columns and dst not in df.columns:
@@ -208,7 +720,7 @@ class SheetReader:
                 df[col] = default
 
        
-        for num_col in ("Air", "Mobil", "Bulan"):
+        for num_col in ("Air", "Mobil", "Bulan", "Air Realisasi", "Mobil Realisasi"):
             if num_col in df.columns:
                 df[num_col] = pd.to_numeric(df[num_col], errors="coerce")
 
@@ -227,10 +739,10 @@ class SheetReader:
         waktu_dt = None
         if "Waktu" in df.columns:
            
-            waktu_dt = df["Waktu"].apply(_parse_ambiguous_datetime)
+            waktu_dt = _parse_datetime_series(df["Waktu"])
 
         if waktu_dt is None or getattr(waktu_dt, "isna", lambda: True)().all():
-            T = pd.to_datetime(df["Tanggal"], errors="coerce", dayfirst=True) if "Tanggal" in df.columns else None
+            T = _parse_datetime_series(df["Tanggal"]) if "Tanggal" in df.columns else None
             P = df["Pukul"].apply(_extract_hhmm) if "Pukul" in df.columns else None
 
             if T is not None and (P is not None or not T.isna().all()):
@@ -253,7 +765,9 @@ class SheetReader:
     def _ensure_kecamatan_kawasan(self, df: pd.DataFrame) -> pd.DataFrame:
         """Ekstrak Kecamatan dari Alamat dan sinkronkan ke Kawasan."""
         df = df.copy()
-        df["Kecamatan"] = df["Alamat"].apply(_guess_kecamatan_from_alamat)
+        resolver = kecamatan_resolver()
+        df["Kecamatan"] = resolver.resolve_series(df["Alamat"])
+        resolver.save()
 
         if "Kawasan" not in df.columns or df["Kawasan"].isna().all():
             df["Kawasan"] = df["Kecamatan"]
@@ -263,6 +777,13 @@ class SheetReader:
 
         return df
 
+    def _ensure_kategori(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Kategori obyek standar, pakai normalizer yang sama dengan training & FirePredictor."""
+        df = df.copy()
+        obyek = df["Obyek"] if "Obyek" in df.columns else pd.Series(None, index=df.index, dtype=object)
+        df["Kategori"] = default_normalizer().normalize_series(obyek)
+        return df
+
     def _finalize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """Pastikan semua kolom standar ada dan urut konsisten."""
         df = df.copy()
@@ -0,0 +1,40 @@
+# core/features.py
+"""
+Satu-satunya tempat baris input model dibangun, dipakai /submit (prediksi) dan
+training/incremental.py (retraining dari sheet), supaya fitur saat latih = fitur saat prediksi.
+"""
+from typing import Iterable, Mapping
+
+from core.obyek import normalize_obyek
+
+# form belum punya isian kawasan -> prediksi selalu memakai nilai ini
+KAWASAN_DEFAULT = "umum"
+
+
+def fitur_laporan(lokasi, obyek, bulan) -> dict:
+    """Isian form laporan -> dict fitur mentah (sebelum disesuaikan dengan encoder)."""
+    return {
+        "lokasi": lokasi,
+        "kawasan": KAWASAN_DEFAULT,
+        "obyek": (obyek or "").strip().lower(),
+        "bulan": int(bulan),
+    }
+
+
+def standarkan(row: Mapping, features: Iterable[str], known: Mapping[str, set]) -> dict:
+    """
+    Sesuaikan fitur mentah dengan bundle: isi `obyek_standar` (core/obyek.py) dan ganti teks
+    obyek bebas dengan kategori standarnya, tapi hanya bila teks mentahnya tidak dikenal
+    encoder dan hasil standarnya dikenal; kalau tidak tetap masuk slot unknown (-1).
+    `known` = {fitur: set kategori encoder (string)}.
+    """
+    row = dict(row)
+    features = list(features)
+    raw = row.get("obyek")
+    if "obyek_standar" in features and "obyek_standar" not in row:
+        row["obyek_standar"] = normalize_obyek(raw)
+    if "obyek" in features and isinstance(raw, str) and raw not in known.get("obyek", ()):
+        std = normalize_obyek(raw)
+        if std in known.get("obyek", ()):
+            row["obyek"] = std
+    return row
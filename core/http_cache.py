@@ -0,0 +1,87 @@
+# core/http_cache.py
+import hashlib
+import os
+from functools import wraps
+from typing import Callable, Optional
+
+from flask import current_app, request
+
+from core.compression import negotiated_encoding
+
+
+def make_etag(tag: str) -> str:
+    """ETag kuat dari versi snapshot + path + query (urutan parameter tidak berpengaruh)."""
+    args = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+    raw = f"{tag}|{request.path}|{args}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def conditional_get(tag_fn: Callable[[], str], max_age: int = 0,
+                    skip_if: Optional[Callable[[], bool]] = None):
+    """
+    Dekorator route: pasang ETag + Cache-Control, jawab `If-None-Match` dengan 304.
+    `tag_fn` harus murah dan TIDAK membaca sheet (mis. `SheetReader.cached_tag`) karena
+    dipanggil sebelum view, sehingga 304 dikirim tanpa membaca sheet ulang maupun
+    menghitung agregasi. Setelah view jalan tag diambil lagi (snapshot bisa saja baru
+    di-refresh oleh view) supaya ETag selalu sesuai isi respons.
+    Hanya berlaku untuk GET/HEAD; `skip_if()` bisa menonaktifkan cache per request,
+    dan `tag_fn()` yang mengembalikan None berarti belum ada versi (tanpa ETag).
+    """
+    cache_control = f"private, max-age={int(max_age)}, must-revalidate"
+
+    def deco(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD") or (skip_if and skip_if()):
+                return view(*args, **kwargs)
+
+            tag = tag_fn()
+            if tag is None:
+                return view(*args, **kwargs)
+            etag = make_etag(tag)
+            # varian terkompresi membawa akhiran encoding (lihat core/compression.py); akhiran
+            # hanya diterima kalau encoding itu juga yang dipilih untuk request sekarang
+            enc = negotiated_encoding(current_app)
+            candidates = (etag, f"{etag}-{enc}") if enc else (etag,)
+            matched = next((e for e in candidates if request.if_none_match.contains(e)), None)
+            if matched:
+                resp = current_app.response_class(status=304)
+                resp.set_etag(matched)
+            else:
+                resp = current_app.make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+                resp.set_etag(make_etag(tag_fn() or tag))
+            resp.headers["Cache-Control"] = cache_control
+            return resp
+        return wrapper
+    return deco
+
+
+def init_static_cache(app, prefix: str = "css/", max_age: int = 31536000) -> None:
+    """
+    Cache jangka panjang untuk file statis di `static/<prefix>`.
+    `url_for('static', ...)` otomatis diberi `?v=<mtime>` sehingga file yang berubah
+    langsung dapat URL baru; tanpa `v` file tetap divalidasi ulang seperti biasa.
+    """
+    static_dir = app.static_folder
+
+    @app.url_defaults
+    def _static_version(endpoint, values):
+        if endpoint != "static" or "v" in values:
+            return
+        filename = values.get("filename") or ""
+        if not filename.startswith(prefix):
+            return
+        try:
+            values["v"] = int(os.path.getmtime(os.path.join(static_dir, filename)))
+        except OSError:
+            pass
+
+    @app.after_request
+    def _static_headers(resp):
+        if (request.endpoint == "static" and request.args.get("v")
+                and (request.view_args or {}).get("filename", "").startswith(prefix)
+                and resp.status_code in (200, 304)):
+            resp.headers["Cache-Control"] = f"public, max-age={int(max_age)}, immutable"
+        return resp
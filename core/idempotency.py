@@ -0,0 +1,135 @@
+# core/idempotency.py
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Iterable, Optional
+
+
+def _norm_text(s: Optional[str]) -> str:
+    """Lowercase, buang tanda baca, rapatkan spasi -> 'Jl. Sukabumi  No.5' == 'jl sukabumi no 5'."""
+    s = (s or "").lower()
+    s = re.sub(r"[^\w\s]", " ", s)
+    return " ".join(s.split())
+
+
+# hasil `begin` kalau request lain masih memproses kunci yang sama sampai `wait_timeout` habis
+PENDING = {"status": "processing"}
+
+
+class IdempotencyIndex:
+    """
+    Indeks submit yang sudah diproses, untuk mencegah prediksi/pencatatan/WA ganda.
+
+    Setiap submit dicatat dengan dua jenis kunci:
+      - token idempotensi dari form / header `Idempotency-Key` (kunci utama), berlaku `ttl` detik
+      - hash ternormalisasi (nama, lokasi, obyek), hanya berlaku `content_window` detik:
+        penahan klik dobel dari klien tanpa token. Sengaja pendek, karena kebakaran kedua
+        di alamat yang sama oleh pelapor yang sama tetap harus bisa dilaporkan (0 = mati).
+    Entri disimpan ke file JSON lokal supaya tetap berlaku walau aplikasi di-restart.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: int = 600, content_window: int = 30,
+                 wait_timeout: float = 30.0):
+        self.path = path
+        self.ttl = int(ttl)
+        self.content_window = int(content_window)
+        self.wait_timeout = wait_timeout
+        self._entries: dict = {}      # key -> {"result": ..., "expires": ts}
+        self._pending: set = set()    # key yang sedang diproses request lain
+        self._cond = threading.Condition()
+        self._load()
+
+    # ---------- kunci ----------
+    @staticmethod
+    def key_for_token(token: Optional[str]) -> Optional[str]:
+        token = (token or "").strip()
+        return f"tok:{token}" if token else None
+
+    def key_for_report(self, nama: str, lokasi: str, obyek: str) -> Optional[str]:
+        """Kunci isi laporan (jendela geser `content_window` detik sejak submit pertama)."""
+        if self.content_window <= 0:
+            return None
+        base = "|".join(_norm_text(x) for x in (nama, lokasi, obyek))
+        return "rep:" + hashlib.sha256(base.encode("utf-8")).hexdigest()
+
+    # ---------- alur utama ----------
+    def begin(self, keys: Iterable[Optional[str]], store_keys: Iterable[Optional[str]]) -> Optional[dict]:
+        """
+        Cek `keys`. Kalau ada hasil tersimpan -> kembalikan hasil itu (submit ganda).
+        Kalau salah satu kunci sedang diproses request lain -> tunggu hasilnya; kalau
+        `wait_timeout` habis dan masih diproses -> `PENDING` (jangan diproses lagi).
+        Kalau tidak ada -> reservasi `store_keys` dan kembalikan None (lanjut proses normal,
+        lalu panggil `complete` atau `release`).
+        """
+        keys = [k for k in keys if k]
+        store_keys = [k for k in store_keys if k]
+        deadline = time.monotonic() + self.wait_timeout
+        with self._cond:
+            while True:
+                self._prune_locked()
+                for k in keys:
+                    e = self._entries.get(k)
+                    if e is not None:
+                        return e["result"]
+                if not any(k in self._pending for k in keys):
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return PENDING
+                self._cond.wait(remaining)
+            self._pending.update(store_keys)
+            return None
+
+    def complete(self, store_keys: Iterable[Optional[str]], result: dict) -> None:
+        now = time.time()
+        with self._cond:
+            for k in store_keys:
+                if not k:
+                    continue
+                self._pending.discard(k)
+                ttl = self.content_window if k.startswith("rep:") else self.ttl
+                self._entries[k] = {"result": result, "expires": now + ttl}
+            self._cond.notify_all()
+            self._save_locked()
+
+    def release(self, store_keys: Iterable[Optional[str]]) -> None:
+        """Lepas reservasi tanpa menyimpan (mis. prediksi gagal) supaya submit ulang tetap diproses."""
+        with self._cond:
+            for k in store_keys:
+                if k:
+                    self._pending.discard(k)
+            self._cond.notify_all()
+
+    # ---------- persistensi ----------
+    def _prune_locked(self) -> None:
+        now = time.time()
+        expired = [k for k, e in self._entries.items() if e["expires"] <= now]
+        for k in expired:
+            del self._entries[k]
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+            self._prune_locked()
+        except Exception as e:
+            print(f" Gagal membaca indeks idempotensi: {e}")
+            self._entries = {}
+
+    def _save_locked(self) -> None:
+        if not self.path:
+            return
+        self._prune_locked()
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f" Gagal menyimpan indeks idempotensi: {e}")
@@ -0,0 +1,229 @@
+# core/kecamatan.py
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# nama lain / singkatan yang sering muncul di alamat -> nama kecamatan baku
+ALIASES: Dict[str, str] = {
+    "margacinta": "Buahbatu",       # nama lama kecamatan Buahbatu
+    "kircon": "Kiaracondong",
+    "ujber": "Ujungberung",
+    "dago": "Coblong",
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# naikkan kalau aturan resolve berubah -> cache persisten lama otomatis dibuang
+RESOLVER_VERSION = 2
+
+
+def _squash(text: str) -> str:
+    """'Kiara Condong' / 'kiara-condong' / 'KiaraCondong' -> 'kiaracondong'."""
+    return _NON_ALNUM.sub("", text.lower())
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in _NON_ALNUM.split(text.lower()) if w]
+
+
+def levenshtein(a: str, b: str, limit: int) -> int:
+    """Edit distance; berhenti lebih awal (return limit+1) kalau pasti melebihi `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        best = i
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            best = min(best, cur[j])
+        if best > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class BKTree:
+    """BK-tree atas metrik Levenshtein: query radius r hanya menelusuri anak dengan jarak d-r..d+r."""
+
+    def __init__(self, words: Iterable[str] = ()):
+        self._root = None
+        for w in words:
+            self.add(w)
+
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            d = levenshtein(word, node[0], max(len(word), len(node[0])))
+            if d == 0:
+                return
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, radius: int) -> List[tuple]:
+        """[(jarak, kata)] dalam radius, urut dari yang terdekat."""
+        if self._root is None:
+            return []
+        out, stack = [], [self._root]
+        while stack:
+            node_word, children = stack.pop()
+            d = levenshtein(word, node_word, radius + len(word) + len(node_word))
+            if d <= radius:
+                out.append((d, node_word))
+            for k, child in children.items():
+                if d - radius <= k <= d + radius:
+                    stack.append(child)
+        return sorted(out)
+
+
+class KecamatanResolver:
+    """
+    Alamat bebas -> nama kecamatan baku, toleran salah ketik dan spasi.
+
+    Urutan: (1) nama/alias persis: jendela 1-4 KATA UTUH alamat yang digabung (tanpa spasi),
+    jadi 'Kiara Condong' cocok tapi 'Jl. Pandiran' tidak menjadi 'Andir'; kalau beberapa cocok,
+    yang paling kanan menang (kecamatan biasanya ditulis setelah nama jalan), lalu yang terpanjang;
+    (2) fuzzy: jendela 1-3 kata alamat dicari di BK-tree dengan batas edit distance sesuai
+    panjang nama; (3) fallback lama: segmen terakhir setelah koma.
+    Hasil per alamat disimpan di cache (dict, opsional dipersist ke JSON bersama versi tabel
+    nama/alias, sehingga mengubah ALIASES membuang entri lama).
+    """
+
+    def __init__(self, names: List[str], aliases: Optional[Dict[str, str]] = None,
+                 cache_path: Optional[str] = None, max_cache: int = 200_000):
+        self._canon: Dict[str, str] = {_squash(n): n for n in names}
+        for alias, name in (aliases if aliases is not None else ALIASES).items():
+            self._canon.setdefault(_squash(alias), name)
+        self._keys = sorted(self._canon, key=len, reverse=True)
+        self._tree = BKTree(self._keys)
+        table = json.dumps([RESOLVER_VERSION, sorted(self._canon.items())], ensure_ascii=False)
+        self.table_version = hashlib.sha1(table.encode("utf-8")).hexdigest()[:16]
+        self.cache_path = cache_path
+        self.max_cache = max_cache
+        self._cache: Dict[str, str] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.stats = Counter()
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, encoding="utf-8") as f:
+                    data = json.load(f)
+                # format lama (dict polos) atau tabel nama/alias berbeda -> mulai dari kosong
+                if isinstance(data, dict) and data.get("version") == self.table_version:
+                    self._cache = data.get("entries", {})
+            except (OSError, ValueError) as e:
+                print(f" Gagal membaca cache kecamatan: {e}")
+
+    @staticmethod
+    def _radius(key: str) -> int:
+        # nama pendek (Andir, Regol) hanya boleh 1 salah ketik; nama panjang 2
+        if len(key) < 5:
+            return 0
+        return 1 if len(key) <= 8 else 2
+
+    def _exact(self, alamat: str) -> Optional[str]:
+        words = _words(alamat)
+        best = None   # (akhir jendela, panjang key, key)
+        for n in (1, 2, 3, 4):
+            for i in range(len(words) - n + 1):
+                key = "".join(words[i:i + n])
+                if key in self._canon:
+                    cand = (i + n, len(key), key)
+                    if best is None or cand > best:
+                        best = cand
+        return self._canon[best[2]] if best else None
+
+    def _fuzzy(self, alamat: str) -> Optional[str]:
+        words = _words(alamat)
+        best = None   # (jarak, key)
+        for n in (3, 2, 1):
+            for i in range(len(words) - n + 1):
+                cand = "".join(words[i:i + n])
+                if len(cand) < 4:
+                    continue
+                for d, key in self._tree.search(cand, 2):
+                    if d > self._radius(key):
+                        continue
+                    if best is None or d < best[0]:
+                        best = (d, key)
+                    elif d == best[0] and self._canon[key] != self._canon[best[1]]:
+                        best = (d, None)   # ambigu pada jarak yang sama -> jangan tebak
+        return self._canon[best[1]] if best and best[1] else None
+
+    def _resolve(self, alamat) -> str:
+        if not isinstance(alamat, str) or not alamat.strip():
+            return "Lainnya"
+        kec = self._exact(alamat)
+        if kec:
+            self.stats["exact"] += 1
+            return kec
+        kec = self._fuzzy(alamat)
+        if kec:
+            self.stats["fuzzy"] += 1
+            return kec
+        self.stats["fallback"] += 1
+        parts = [p.strip() for p in alamat.split(",") if p.strip()]
+        return parts[-1] if parts else "Lainnya"
+
+    def resolve(self, alamat) -> str:
+        if not isinstance(alamat, str):
+            return self._resolve(alamat)
+        with self._lock:
+            hit = self._cache.get(alamat)
+        if hit is not None:
+            self.stats["cache"] += 1
+            return hit
+        kec = self._resolve(alamat)
+        with self._lock:
+            if len(self._cache) >= self.max_cache:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[alamat] = kec
+            self._dirty = True
+        return kec
+
+    def resolve_series(self, alamat: pd.Series) -> pd.Series:
+        """Resolve per alamat UNIK lalu map balik (arsip punya banyak alamat berulang)."""
+        uniq = pd.unique(alamat)
+        mapping = {a: self.resolve(a) for a in uniq if isinstance(a, str)}
+        return alamat.map(lambda a: mapping.get(a, "Lainnya") if isinstance(a, str) else "Lainnya")
+
+    def save(self) -> None:
+        """Tulis cache ke disk (atomik) bila ada entri baru."""
+        if not self.cache_path or not self._dirty:
+            return
+        with self._lock:
+            data, self._dirty = dict(self._cache), False
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp = f"{self.cache_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": self.table_version, "entries": data}, f, ensure_ascii=False)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            print(f" Gagal menyimpan cache kecamatan: {e}")
+
+    def reclassification_report(self, alamat: pd.Series, legacy: Callable[[str], str]) -> dict:
+        """Bandingkan hasil resolver dengan tebakan lama: berapa baris pindah kategori & ke mana."""
+        new = self.resolve_series(alamat)
+        old = alamat.map(legacy)
+        changed = old != new
+        pairs = Counter(zip(old[changed], new[changed]))
+        return {
+            "rows": int(len(alamat)),
+            "reclassified": int(changed.sum()),
+            "categories_before": int(old.nunique()),
+            "categories_after": int(new.nunique()),
+            "changes": [{"from": a, "to": b, "count": c} for (a, b), c in pairs.most_common()],
+        }
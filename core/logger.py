@@ -1,37 +1,210 @@
 
 
+import json
 import os
+import threading
 import gspread
-from datetime import datetime
+from datetime import datetime, timedelta
+from gspread.utils import ValueRenderOption
 from oauth2client.service_account import ServiceAccountCredentials
 
+from core.sheets_quota import default_scheduler, may_have_applied
+
+SHEETS_EPOCH = datetime(1899, 12, 30)   # hari ke-0 serial number tanggal Google Sheets
+# format teks waktu yang kita tulis (lihat simpan_laporan & /submit)
+FORMAT_WAKTU = ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%H:%M", "%H:%M:%S")
+
+
+def _waktu(v) -> str:
+    """
+    Sel tanggal/jam -> 'YYYYmmddHHMM' (atau 'HHMM' untuk jam saja), dibulatkan ke menit.
+    Serial number dari sheet (>= 1 = tanggal, < 1 = jam) dan teks FORMAT_WAKTU yang kita
+    kirim menghasilkan nilai yang sama.
+    """
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        dt = SHEETS_EPOCH + timedelta(days=float(v), seconds=30)
+        return dt.strftime("%Y%m%d%H%M") if v >= 1 else dt.strftime("%H%M")
+    text = str(v).strip()
+    for fmt in FORMAT_WAKTU:
+        try:
+            dt = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return dt.strftime("%H%M") if fmt.startswith("%H") else dt.strftime("%Y%m%d%H%M")
+    return text.lower()
+
+
+def _teks(v) -> str:
+    # USER_ENTERED menyimpan teks angka sebagai angka: "7" terbaca kembali 7 / 7.0
+    if isinstance(v, float) and v.is_integer():
+        v = int(v)
+    return str(v).strip().lower()
+
 class GoogleSheetLogger:
-    def __init__(self, sheet_name: str, cred_filename: str = 'gsheet-cred.json'):#ganti gsheet-cred.json dengan nama folder yang ada di secrete
+    def __init__(self, sheet_name: str, cred_filename: str = 'gsheet-cred.json', on_terkirim=None,
+                 spreadsheet=None, scheduler=None):#ganti gsheet-cred.json dengan nama folder yang ada di secrete
 
        
         base_dir = os.path.dirname(os.path.abspath(__file__))
-        cred_path = os.path.normpath(os.path.join(base_dir, '..', 'secrets', cred_filename))
+        if spreadsheet is None:
+            cred_path = os.path.normpath(os.path.join(base_dir, '..', 'secrets', cred_filename))
+            scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+            creds = ServiceAccountCredentials.from_json_keyfile_name(cred_path, scope)
+            client = gspread.authorize(creds)
+            spreadsheet = client.open(sheet_name)
+        self.spreadsheet = spreadsheet
+        self.sheet = self.spreadsheet.sheet1
+        # GSHEET_SHARDS=year -> laporan baru ditulis ke worksheet tahun berjalan (lihat SheetReader)
+        self.shard_mode = os.getenv("GSHEET_SHARDS", "").lower()
+        self._shard = None   # worksheet tahun berjalan (diisi _worksheet_tahun_ini)
 
-       
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = ServiceAccountCredentials.from_json_keyfile_name(cred_path, scope)
-        client = gspread.authorize(creds)
-        self.sheet = client.open(sheet_name).sheet1
+        # Laporan masuk outbox lokal dulu (simpan_laporan tidak menunggu Google), lalu
+        # dikirim thread latar lewat scheduler kuota (prioritas di atas baca dashboard).
+        # Yang gagal tetap di outbox dan dicoba lagi tiap `interval` detik.
+        self.scheduler = scheduler or default_scheduler()
+        cache_dir = os.getenv("FIREAI_CACHE_DIR", os.path.normpath(os.path.join(base_dir, '..', 'cache')))
+        self.outbox_path = os.path.join(cache_dir, "sheets_outbox.jsonl")
+        self.interval = float(os.getenv("GSHEET_OUTBOX_INTERVAL", "30"))
+        self.on_terkirim = on_terkirim      # callback(jumlah baris) setelah baris sampai ke sheet
+        self._outbox_lock = threading.Lock()
+        self._kirim_lock = threading.Lock()
+        self._ada_kiriman = threading.Event()
+        self._ada_kiriman.set()             # sisa outbox dari proses sebelumnya langsung dikirim
+        threading.Thread(target=self._loop_kirim, name="sheets-outbox", daemon=True).start()
 
-    def simpan_laporan(self, data: dict) -> bool:
-        
+    def _tulis(self, fn, *args, **kwargs):
+        return self.scheduler.call(fn, *args, kind="write", **kwargs)
+
+    def _worksheet_tahun_ini(self):
+        """Worksheet bernama tahun berjalan; dibuat (dengan header sheet1) kalau belum ada."""
+        title = str(datetime.now().year)
+        if self._shard is not None and self._shard.title == title:
+            return self._shard
+        try:
+            ws = self._tulis(self.spreadsheet.worksheet, title)
+        except gspread.exceptions.WorksheetNotFound:
+            header = self._tulis(self.sheet.row_values, 1)
+            ws = self._tulis(self.spreadsheet.add_worksheet, title=title, rows=1000, cols=max(len(header), 7))
+            if header:
+                self._tulis(ws.append_row, header, value_input_option='USER_ENTERED')
+        self._shard = ws
+        return ws
+
+    def _target(self):
+        return self._worksheet_tahun_ini() if self.shard_mode == "year" else self.sheet
+
+    def _append(self, target, rows: list) -> None:
+        if len(rows) == 1:
+            self._tulis(target.append_row, rows[0], value_input_option='USER_ENTERED')
+        else:
+            self._tulis(target.append_rows, rows, value_input_option='USER_ENTERED')
+
+    @staticmethod
+    def _kunci(row) -> tuple:
+        """
+        Identitas baris untuk cek duplikat: tanggal, jam, nama, lokasi, obyek.
+        Sisi sheet dibaca UNFORMATTED_VALUE (tanggal/jam = serial number, tidak tergantung
+        locale tampilan); sisi outbox berisi teks yang kita kirim. Keduanya diseragamkan `_waktu` / `_teks`.
+        """
+        row = list(row) + [""] * 5
+        return (_waktu(row[0]), _waktu(row[1])) + tuple(_teks(c) for c in row[2:5])
+
+    # === Outbox (baris yang belum terkirim) ===
+    # Satu entri per baris JSON: {"row": [...], "cek": bool}. cek=True artinya kiriman
+    # sebelumnya gagal dengan hasil tidak pasti (5xx/jaringan) -> cek sheet dulu sebelum dikirim ulang.
+    def _baca_outbox(self) -> list:
         try:
-            row = [
-                data.get("tanggal", datetime.now().strftime("%Y-%m-%d")),
-                data.get("jam", datetime.now().strftime("%H:%M")),
-                data.get("nama", ""),
-                data.get("lokasi", ""),
-                data.get("obyek", ""),
-                data.get("air", ""),
-                data.get("mobil", "")
-            ]
-            self.sheet.append_row(row, value_input_option='USER_ENTERED')
-            return True
-        except Exception as e:
-            print(f" Gagal menyimpan ke Google Sheet: {e}")
-            return False
+            with open(self.outbox_path, "r", encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+        # format lama (list per baris) berasal dari tulis yang mungkin sudah masuk
+        return [e if isinstance(e, dict) else {"row": e, "cek": True} for e in entries]
+
+    def _tulis_outbox(self, entries: list) -> None:
+        if not entries:
+            if os.path.exists(self.outbox_path):
+                os.remove(self.outbox_path)
+            return
+        os.makedirs(os.path.dirname(self.outbox_path), exist_ok=True)
+        tmp = self.outbox_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for e in entries:
+                f.write(json.dumps(e, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.outbox_path)
+
+    def outbox_size(self) -> int:
+        with self._outbox_lock:
+            return len(self._baca_outbox())
+
+    def _selesai(self, n: int, cek: bool = False) -> None:
+        """n entri terdepan outbox: dibuang (terkirim) atau ditandai cek (hasil tidak pasti)."""
+        with self._outbox_lock:
+            entries = self._baca_outbox()
+            if cek:
+                for e in entries[:n]:
+                    e["cek"] = True
+                self._tulis_outbox(entries)
+            else:
+                self._tulis_outbox(entries[n:])
+
+    def kirim_outbox(self) -> int:
+        """
+        Kirim semua entri outbox (urut, satu append); kembalikan jumlah baris yang ditulis.
+        Entri bertanda cek yang sudah ada di baris-baris terakhir sheet tidak dikirim lagi.
+        """
+        with self._kirim_lock:
+            with self._outbox_lock:
+                pending = self._baca_outbox()
+            if not pending:
+                return 0
+            target = self._target()
+            rows = [e["row"] for e in pending]
+            if any(e.get("cek") for e in pending):
+                tail = self.scheduler.call(target.get_all_values, kind="read",
+                                           value_render_option=ValueRenderOption.unformatted)
+                tail = tail[-(len(pending) + 50):]
+                ada = {self._kunci(r) for r in tail}
+                rows = [e["row"] for e in pending if not (e.get("cek") and self._kunci(e["row"]) in ada)]
+            try:
+                if rows:
+                    self._append(target, rows)
+            except Exception as e:
+                if may_have_applied(e):
+                    self._selesai(len(pending), cek=True)
+                raise
+            # simpan_laporan hanya menambah di belakang, jadi n entri terdepan = yang barusan dikirim
+            self._selesai(len(pending))
+        if rows and self.on_terkirim:
+            self.on_terkirim(len(rows))
+        return len(rows)
+
+    def _loop_kirim(self) -> None:
+        while True:
+            self._ada_kiriman.wait(self.interval)
+            self._ada_kiriman.clear()
+            try:
+                self.kirim_outbox()
+            except Exception as e:
+                print(f" Gagal mengirim outbox ke Google Sheet: {e}")
+
+    def simpan_laporan(self, data: dict) -> bool:
+        """
+        Masukkan satu baris laporan ke outbox lalu langsung kembali (True); pengiriman ke
+        sheet dikerjakan thread latar (`kirim_outbox`). Gagal menulis outbox -> exception.
+        """
+        row = [
+            data.get("tanggal", datetime.now().strftime("%Y-%m-%d")),
+            data.get("jam", datetime.now().strftime("%H:%M")),
+            data.get("nama", ""),
+            data.get("lokasi", ""),
+            data.get("obyek", ""),
+            data.get("air", ""),
+            data.get("mobil", "")
+        ]
+        with self._outbox_lock:
+            os.makedirs(os.path.dirname(self.outbox_path), exist_ok=True)
+            with open(self.outbox_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"row": row, "cek": False}, ensure_ascii=False) + "\n")
+        self._ada_kiriman.set()
+        return True
@@ -0,0 +1,111 @@
+# core/obyek.py
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# Satu-satunya tabel kata kunci obyek. Urutan = prioritas: kalau teks cocok dengan beberapa
+# kategori, yang paling atas menang (sama dengan rantai if di std_obyek lama di cleaning.py).
+KEYWORDS: List[Tuple[str, Sequence[str]]] = [
+    ("rumah", ["rumah", "kontrakan", "kos", "asrama"]),
+    ("toko", ["toko", "ruko", "counter", "kios", "cafe", "kafe", "warung", "resto", "kedai"]),
+    ("pasar", ["pasar"]),
+    ("pabrik", ["pabrik", "industri", "gudang"]),
+    ("instalasi_listrik", ["panel listrik", "gardu", "trafo", "kabel listrik", "listrik"]),
+    ("kantor", ["kantor", "instansi", "sekolah", "kampus"]),
+]
+DEFAULT = "lainnya"
+
+
+class ObyekNormalizer:
+    """
+    Teks obyek bebas -> kategori standar dalam SATU lintasan karakter.
+
+    Semua kata kunci dikompilasi menjadi automaton Aho-Corasick (trie + failure link);
+    tiap node menyimpan prioritas kategori terbaik yang berakhir di situ, jadi biaya
+    per teks ~ panjang teks, tidak tergantung jumlah kata kunci. Hasil per string
+    di-memo (input form & arsip banyak yang berulang).
+    """
+
+    def __init__(self, table: Iterable[Tuple[str, Sequence[str]]] = KEYWORDS,
+                 default: str = DEFAULT, memo_size: int = 65536):
+        self.categories: List[str] = []
+        self.default = default
+        self._goto: List[dict] = [{}]
+        self._out: List[int] = [-1]     # prioritas terbaik (indeks kategori) yang cocok di node ini, -1 = tidak ada
+        for prio, (cat, words) in enumerate(table):
+            self.categories.append(cat)
+            for w in words:
+                self._add(w.lower(), prio)
+        self._fail = self._build_fail()
+        self.normalize = lru_cache(maxsize=memo_size)(self._normalize)
+
+    def _add(self, word: str, prio: int) -> None:
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._out.append(-1)
+            node = nxt
+        if self._out[node] == -1 or prio < self._out[node]:
+            self._out[node] = prio
+
+    def _build_fail(self) -> List[int]:
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                f = fail[node]
+                while f and ch not in self._goto[f]:
+                    f = fail[f]
+                fail[nxt] = self._goto[f].get(ch, 0) if self._goto[f].get(ch, 0) != nxt else 0
+                # gabungkan output suffix supaya cukup cek satu node per karakter
+                o = self._out[fail[nxt]]
+                if o != -1 and (self._out[nxt] == -1 or o < self._out[nxt]):
+                    self._out[nxt] = o
+                queue.append(nxt)
+        return fail
+
+    def match(self, text: str) -> Optional[int]:
+        """Prioritas kategori terbaik yang muncul di `text` (None kalau tidak ada)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node, best = 0, None
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            o = out[node]
+            if o != -1 and (best is None or o < best):
+                best = o
+                if best == 0:
+                    break
+        return best
+
+    def _normalize(self, text) -> str:
+        if not isinstance(text, str):
+            return self.default
+        prio = self.match(text.lower())
+        return self.default if prio is None else self.categories[prio]
+
+    def normalize_series(self, s):
+        """pandas Series -> Series kategori; tiap string unik hanya diproses sekali."""
+        uniq = {v: self.normalize(v) for v in s.dropna().unique() if isinstance(v, str)}
+        return s.map(lambda v: uniq.get(v, self.default))
+
+
+_default: Optional[ObyekNormalizer] = None
+
+
+def default_normalizer() -> ObyekNormalizer:
+    global _default
+    if _default is None:
+        _default = ObyekNormalizer()
+    return _default
+
+
+def normalize_obyek(text) -> str:
+    """Kategori standar obyek (rumah/toko/pasar/pabrik/instalasi_listrik/kantor/lainnya)."""
+    return default_normalizer().normalize(text)
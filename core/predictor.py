@@ -4,26 +4,44 @@ import joblib
 import numpy as np
 import pandas as pd
 
+from core.features import standarkan
+
 class FirePredictor:
     def __init__(self, model_path: str):
         
       
         self.model_bundle = joblib.load(model_path)
-        self.model_air = self.model_bundle['model_air']
-        self.model_mobil = self.model_bundle['model_mobil']
+        # bundle multi-output: 1 model ('model') memprediksi air & mobil dalam satu traversal
+        self.model = self.model_bundle.get('model')
+        self.model_air = self.model_bundle.get('model_air')
+        self.model_mobil = self.model_bundle.get('model_mobil')
+        if self.model is None and (self.model_air is None or self.model_mobil is None):
+            raise KeyError("Bundle harus berisi 'model' atau 'model_air' + 'model_mobil'")
+        targets = self.model_bundle.get('targets', ['air', 'mobil'])
+        self._idx_air, self._idx_mobil = targets.index('air'), targets.index('mobil')
         self.encoder = self.model_bundle['encoder']
         self.features = self.model_bundle['features']
+        self._known = {f: set(map(str, c)) for f, c in zip(self.features, self.encoder.categories_)}
+
+    def _standarkan(self, input_dict: dict) -> dict:
+        # sama persis dengan retraining (training/incremental.py), lihat core/features.py
+        return standarkan(input_dict, self.features, self._known)
 
     def predict(self, input_dict: dict) -> dict:
        
         try:
             
-            input_df = pd.DataFrame([input_dict], columns=self.features)
+            input_df = pd.DataFrame([self._standarkan(input_dict)], columns=self.features)
             encoded = self.encoder.transform(input_df)
 
            
-            pred_air = round(float(self.model_air.predict(encoded)[0]), 2)
-            pred_mobil = round(float(self.model_mobil.predict(encoded)[0]))
+            if self.model is not None:
+                pred = self.model.predict(encoded)[0]
+                pred_air = round(float(pred[self._idx_air]), 2)
+                pred_mobil = round(float(pred[self._idx_mobil]))
+            else:
+                pred_air = round(float(self.model_air.predict(encoded)[0]), 2)
+                pred_mobil = round(float(self.model_mobil.predict(encoded)[0]))
 
             return {
                 "air": pred_air,
@@ -0,0 +1,208 @@
+# core/profiling.py
+import bisect
+import hmac
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+
+from flask import Response, abort, g, jsonify, request
+
+# batas atas bucket histogram (ms); bucket terakhir = lebih dari itu
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class RouteStats:
+    """Histogram bergulir per route: `window` sampel terakhir + hitungan bucket kumulatif."""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._window = window
+        self._routes: dict = {}
+
+    def add(self, route: str, wall_ms: float, cpu_ms, alloc_kb) -> None:
+        with self._lock:
+            r = self._routes.get(route)
+            if r is None:
+                r = {"wall": deque(maxlen=self._window), "cpu": deque(maxlen=self._window),
+                     "alloc": deque(maxlen=self._window), "buckets": [0] * (len(BUCKETS_MS) + 1), "count": 0}
+                self._routes[route] = r
+            r["wall"].append(wall_ms)
+            if cpu_ms is not None:
+                r["cpu"].append(cpu_ms)
+            if alloc_kb is not None:
+                r["alloc"].append(alloc_kb)
+            r["buckets"][bisect.bisect_left(BUCKETS_MS, wall_ms)] += 1
+            r["count"] += 1
+
+    def summary(self) -> dict:
+        # tanpa numpy: modul ini diimpor main.py saat startup (lihat tools/bench_startup.py)
+        def pct(values):
+            if not values:
+                return None
+            a = sorted(values)
+            rank = lambda q: round(a[min(len(a) - 1, max(0, math.ceil(q / 100 * len(a)) - 1))], 2)
+            return {"p50": rank(50), "p95": rank(95), "p99": rank(99), "max": round(a[-1], 2)}
+        with self._lock:
+            snap = {k: {"wall": list(v["wall"]), "cpu": list(v["cpu"]), "alloc": list(v["alloc"]),
+                        "buckets": list(v["buckets"]), "count": v["count"]} for k, v in self._routes.items()}
+        labels = [f"<={b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        return {route: {
+            "count": r["count"],
+            "wall_ms": pct(r["wall"]),
+            "cpu_ms": pct(r["cpu"]),
+            "alloc_kb": pct(r["alloc"]),
+            "histogram_ms": dict(zip(labels, r["buckets"])),
+        } for route, r in snap.items()}
+
+
+class StackSampler:
+    """
+    Sampling profiler: thread latar membaca `sys._current_frames()` tiap `interval` detik
+    untuk thread request yang sedang diprofil, lalu menghitung stack dalam format collapsed
+    (`route;modul:fungsi;... jumlah`) yang bisa langsung dibaca flamegraph.pl / speedscope.
+    Thread hanya hidup selama ada request yang diprofil.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._remaining = 0
+        self._active: dict = {}      # thread id -> label route
+        self._stacks = Counter()
+        self._thread = None
+
+    def arm(self, n: int) -> None:
+        with self._lock:
+            self._remaining = max(0, int(n))
+            self._stacks = Counter()
+
+    @property
+    def remaining(self) -> int:
+        return self._remaining
+
+    def begin(self, label: str) -> bool:
+        if not self._remaining:   # jalur idle: satu pembacaan atribut
+            return False
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            self._active[threading.get_ident()] = label
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        return True
+
+    def end(self, tid: int) -> None:
+        with self._lock:
+            self._active.pop(tid, None)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                active = dict(self._active)
+                if not active and not self._remaining:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            for tid, label in active.items():
+                frame = frames.get(tid)
+                if frame is None or tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                key = ";".join([label] + stack[::-1])
+                with self._lock:
+                    self._stacks[key] += 1
+            time.sleep(self.interval)
+
+    def collapsed(self) -> str:
+        with self._lock:
+            items = self._stacks.most_common()
+        return "".join(f"{stack} {n}\n" for stack, n in items)
+
+
+def init_profiling(app, token: str | None = None, window: int = 1024, interval: float = 0.005) -> None:
+    """
+    Catat wall time, CPU time (thread) dan alokasi memori per route ke histogram bergulir.
+    Memori hanya diukur kalau tracemalloc aktif (FIREAI_PROFILE_MEMORY=1), supaya saat
+    idle biayanya cuma dua pembacaan jam per request.
+
+    Endpoint (hanya kalau `token` / FIREAI_PROFILE_TOKEN diisi; header `X-Profile-Token`):
+      GET  /debug/metrics            -> ringkasan histogram per route (JSON)
+      POST /debug/profile?n=20       -> profil N request berikutnya dengan sampling profiler
+      GET  /debug/profile            -> dump collapsed stack (flame graph)
+    """
+    token = token or os.getenv("FIREAI_PROFILE_TOKEN") or None
+    if os.getenv("FIREAI_PROFILE_MEMORY") == "1" and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    stats = RouteStats(window)
+    sampler = StackSampler(interval)
+    app.extensions["profiling"] = {"stats": stats, "sampler": sampler}
+
+    @app.before_request
+    def _prof_start():
+        g._prof = (time.perf_counter(), time.thread_time(),
+                   tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+                   threading.get_ident())
+        if sampler.remaining and not request.path.startswith("/debug/"):
+            rule = request.url_rule.rule if request.url_rule else request.path
+            if sampler.begin(f"{request.method} {rule}"):
+                g._prof_sampled = True
+
+    @app.after_request
+    def _prof_finish(resp):
+        start = g.pop("_prof", None)
+        if start is None:
+            return resp
+        sampled = g.pop("_prof_sampled", False)
+        route = f"{request.method} {request.url_rule.rule if request.url_rule else '<404>'}"
+        t0, c0, m0, tid = start
+
+        def done():
+            # dipanggil server setelah body (termasuk respons streaming) selesai dikirim
+            alloc = None
+            if m0 is not None and tracemalloc.is_tracing():
+                alloc = (tracemalloc.get_traced_memory()[0] - m0) / 1024
+            stats.add(route, (time.perf_counter() - t0) * 1000,
+                      (time.thread_time() - c0) * 1000 if threading.get_ident() == tid else None,
+                      alloc)
+            if sampled:
+                sampler.end(tid)
+
+        resp.call_on_close(done)
+        return resp
+
+    @app.teardown_request
+    def _prof_teardown(exc):
+        # view melempar exception -> after_request tidak jalan; pastikan sampler dilepas
+        if g.pop("_prof_sampled", False):
+            sampler.end(threading.get_ident())
+
+    def _authorized():
+        if not token:
+            abort(404)
+        if not hmac.compare_digest(request.headers.get("X-Profile-Token", ""), token):
+            abort(403)
+
+    @app.get("/debug/metrics")
+    def debug_metrics():
+        _authorized()
+        return jsonify(stats.summary())
+
+    @app.route("/debug/profile", methods=["GET", "POST"])
+    def debug_profile():
+        _authorized()
+        if request.method == "POST":
+            n = request.args.get("n", default=20, type=int)
+            sampler.arm(n)
+            return jsonify({"armed": n, "interval_s": sampler.interval})
+        return Response(sampler.collapsed(), mimetype="text/plain")
@@ -0,0 +1,296 @@
+# core/rollups.py
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from core.obyek import default_normalizer
+
+HARI = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+
+
+def _key(s: pd.Series) -> pd.Series:
+    return s.fillna("Lainnya").astype(str).str.strip().str.lower()
+
+
+class HeatmapIndex:
+    """
+    Rollup hari (Senin..Minggu) x jam (0..23) yang di-update inkremental.
+
+    Per kombinasi (kecamatan, kategori obyek standar) disimpan array int64 berukuran 7x24:
+    jumlah kejadian, jumlah Air (dalam 1/100 m³ supaya tetap integer) dan Mobil,
+    serta banyaknya nilai Air/Mobil yang terisi (untuk rata-rata). Jumlah sel terbatas
+    (kecamatan x kategori), tidak ikut bertambah dengan variasi/salah ketik teks obyek;
+    filter teks obyek bebas dijawab dari snapshot (`covers` False, lihat /api/heatmap).
+    Dipasang sebagai listener `SheetReader.subscribe`: baris baru cukup ditambahkan,
+    query tidak pernah menghitung ulang dari DataFrame.
+    """
+
+    FIELDS = ("count", "air_sum", "air_n", "mobil_sum", "mobil_n")
+
+    def __init__(self):
+        self._cells: dict = {}
+        self._lock = threading.Lock()
+        norm = default_normalizer()
+        self._categories = set(norm.categories) | {norm.default}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "HeatmapIndex":
+        """Index sekali pakai dari DataFrame (mis. snapshot yang sudah difilter)."""
+        idx = cls()
+        idx.on_snapshot(df, df, True)
+        return idx
+
+    def on_snapshot(self, new_rows: pd.DataFrame, snapshot: pd.DataFrame, reset: bool) -> None:
+        with self._lock:
+            if reset:
+                self._cells = {}
+            self._add(new_rows)
+
+    def _add(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        dt = df["Waktu_dt"]
+        ok = dt.notna().to_numpy()
+        if not ok.any():
+            return
+        df, dt = df[ok], dt[ok]
+
+        slot = (dt.dt.dayofweek.to_numpy() * 24 + dt.dt.hour.to_numpy()).astype(np.int64)
+        air = pd.to_numeric(df["Air"], errors="coerce").to_numpy(dtype=np.float64)
+        mobil = pd.to_numeric(df["Mobil"], errors="coerce").to_numpy(dtype=np.float64)
+        air_ok, mobil_ok = ~np.isnan(air), ~np.isnan(mobil)
+        air_c = np.where(air_ok, np.round(air * 100), 0).astype(np.int64)
+        mobil_i = np.where(mobil_ok, np.round(mobil), 0).astype(np.int64)
+
+        if "Kategori" in df.columns:
+            kategori = df["Kategori"].fillna("lainnya").astype(str)
+        else:
+            kategori = default_normalizer().normalize_series(df["Obyek"])
+        groups = pd.DataFrame({"k": _key(df["Kecamatan"]).to_numpy(), "c": kategori.to_numpy()})
+        for cell_key, idx in groups.groupby(["k", "c"]).indices.items():
+            cell = self._cells.get(cell_key)
+            if cell is None:
+                cell = {f: np.zeros(7 * 24, dtype=np.int64) for f in self.FIELDS}
+                self._cells[cell_key] = cell
+            s = slot[idx]
+            np.add.at(cell["count"], s, 1)
+            np.add.at(cell["air_sum"], s, air_c[idx])
+            np.add.at(cell["air_n"], s, air_ok[idx].astype(np.int64))
+            np.add.at(cell["mobil_sum"], s, mobil_i[idx])
+            np.add.at(cell["mobil_n"], s, mobil_ok[idx].astype(np.int64))
+
+    def covers(self, obyek: Optional[str]) -> bool:
+        """
+        True kalau filter `obyek` bisa dijawab dari sel: kosong atau nama kategori standar.
+        Untuk nama kategori, "teks asli sama ATAU kategori sama" (SheetReader._apply_filters)
+        = "kategori sama", karena teks yang persis nama kategori distandarkan ke kategori itu.
+        """
+        return not obyek or str(obyek).strip().lower() in self._categories
+
+    def query(self, kecamatan: Optional[str] = None, obyek: Optional[str] = None) -> dict:
+        """`obyek` = kategori standar (lihat `covers`); teks bebas -> ValueError."""
+        kec = str(kecamatan).strip().lower() if kecamatan else None
+        oby = str(obyek).strip().lower() if obyek else None
+        if not self.covers(oby):
+            raise ValueError(f"obyek {obyek!r} bukan kategori standar; hitung dari snapshot (from_frame)")
+        tot = {f: np.zeros(7 * 24, dtype=np.int64) for f in self.FIELDS}
+        with self._lock:
+            for (k, c), cell in self._cells.items():
+                if (kec and k != kec) or (oby and c != oby):
+                    continue
+                for f in self.FIELDS:
+                    tot[f] += cell[f]
+
+        def avg(total, n, scale):
+            with np.errstate(invalid="ignore", divide="ignore"):
+                v = np.round(total / scale / n, 2)
+            return [[None if n[d, h] == 0 else float(v[d, h]) for h in range(24)] for d in range(7)]
+
+        shaped = {f: a.reshape(7, 24) for f, a in tot.items()}
+        return {
+            "days": HARI,
+            "hours": list(range(24)),
+            "count": shaped["count"].tolist(),
+            "avg_air": avg(shaped["air_sum"], shaped["air_n"], 100.0),
+            "avg_mobil": avg(shaped["mobil_sum"], shaped["mobil_n"], 1.0),
+            "total": int(tot["count"].sum()),
+        }
+
+
+class _PrefixSeries:
+    """
+    Kejadian satu kecamatan urut waktu + prefix sum tiap metrik.
+    `cum[f][i]` = total metrik f untuk i kejadian pertama, jadi jumlah jendela [lo, hi)
+    = cum[hi] - cum[lo]. Buffer tumbuh 2x sehingga append amortized O(baris baru).
+    """
+
+    FIELDS = ("count", "air_sum", "air_n", "mobil_sum", "mobil_n")
+
+    def __init__(self):
+        self.n = 0
+        self.t = np.empty(64, dtype=np.int64)
+        self.cum = {f: np.zeros(65, dtype=np.int64) for f in self.FIELDS}
+
+    def _reserve(self, n: int) -> None:
+        cap = len(self.t)
+        if n <= cap:
+            return
+        while cap < n:
+            cap *= 2
+        t = np.empty(cap, dtype=np.int64)
+        t[:self.n] = self.t[:self.n]
+        self.t = t
+        for f, a in self.cum.items():
+            c = np.zeros(cap + 1, dtype=np.int64)
+            c[:self.n + 1] = a[:self.n + 1]
+            self.cum[f] = c
+
+    def values(self) -> tuple:
+        """Array mentah (waktu, nilai per metrik) - dipakai saat harus disusun ulang."""
+        return self.t[:self.n].copy(), {f: np.diff(a[:self.n + 1]) for f, a in self.cum.items()}
+
+    def extend(self, t: np.ndarray, vals: dict) -> None:
+        """Tambah kejadian yang sudah urut dan tidak lebih awal dari kejadian terakhir."""
+        m = len(t)
+        if not m:
+            return
+        self._reserve(self.n + m)
+        self.t[self.n:self.n + m] = t
+        for f in self.FIELDS:
+            a = self.cum[f]
+            a[self.n + 1:self.n + m + 1] = a[self.n] + np.cumsum(vals[f])
+        self.n += m
+
+    def window(self, start: int, end: int) -> dict:
+        t = self.t[:self.n]
+        lo = int(np.searchsorted(t, start, side="left"))
+        hi = int(np.searchsorted(t, end, side="right"))
+        return {f: int(a[hi] - a[lo]) for f, a in self.cum.items()}
+
+
+class DemandIndex:
+    """
+    Kebutuhan sumber daya (prediksi Air & Mobil) per kecamatan dalam jendela bergulir.
+
+    Per kecamatan disimpan kejadian urut waktu + prefix sum (lihat `_PrefixSeries`);
+    query satu jendela = dua `searchsorted` -> O(log n), berapa pun panjang jendelanya.
+    Dipasang sebagai listener `SheetReader.subscribe` seperti `HeatmapIndex`: baris baru
+    yang lebih baru dari data terakhir cukup di-append; baris susulan yang lebih lama
+    membuat kecamatan itu disusun ulang (jarang, sheet praktis urut waktu).
+    """
+
+    DEFAULT_WINDOWS = ("24h", "7d", "30d")
+    MAX_WINDOWS = 8
+
+    def __init__(self):
+        self._series: dict = {}
+        self._labels: dict = {}      # kunci huruf kecil -> nama kecamatan seperti di sheet
+        self._lock = threading.Lock()
+
+    def on_snapshot(self, new_rows: pd.DataFrame, snapshot: pd.DataFrame, reset: bool) -> None:
+        with self._lock:
+            if reset:
+                self._series, self._labels = {}, {}
+            self._add(new_rows)
+
+    def _add(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        dt = df["Waktu_dt"]
+        ok = dt.notna().to_numpy()
+        if not ok.any():
+            return
+        df, dt = df[ok], dt[ok]
+
+        t = dt.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        air = pd.to_numeric(df["Air"], errors="coerce").to_numpy(dtype=np.float64)
+        mobil = pd.to_numeric(df["Mobil"], errors="coerce").to_numpy(dtype=np.float64)
+        air_ok, mobil_ok = ~np.isnan(air), ~np.isnan(mobil)
+        vals = {
+            "count": np.ones(len(t), dtype=np.int64),
+            "air_sum": np.where(air_ok, np.round(air * 100), 0).astype(np.int64),   # 1/100 m³
+            "air_n": air_ok.astype(np.int64),
+            "mobil_sum": np.where(mobil_ok, np.round(mobil), 0).astype(np.int64),
+            "mobil_n": mobil_ok.astype(np.int64),
+        }
+
+        names = df["Kecamatan"].fillna("Lainnya").astype(str).str.strip()
+        keys = names.str.lower().to_numpy()
+        for key, idx in pd.Series(keys).groupby(keys).indices.items():
+            self._labels.setdefault(key, names.iloc[idx[0]])
+            order = idx[np.argsort(t[idx], kind="stable")]
+            tt, vv = t[order], {f: v[order] for f, v in vals.items()}
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _PrefixSeries()
+            elif series.n and tt[0] < series.t[series.n - 1]:
+                old_t, old_v = series.values()
+                merged = np.argsort(np.concatenate([old_t, tt]), kind="stable")
+                tt = np.concatenate([old_t, tt])[merged]
+                vv = {f: np.concatenate([old_v[f], vv[f]])[merged] for f in vv}
+                series = self._series[key] = _PrefixSeries()
+            series.extend(tt, vv)
+
+    @staticmethod
+    def parse_windows(spec) -> list:
+        """'24h,7d,30d' -> [(label, nanodetik)]; ValueError kalau format tidak dikenal."""
+        labels = [w.strip() for w in (spec or ",".join(DemandIndex.DEFAULT_WINDOWS)).split(",") if w.strip()]
+        if not labels or len(labels) > DemandIndex.MAX_WINDOWS:
+            raise ValueError(f"windows harus berisi 1..{DemandIndex.MAX_WINDOWS} jendela, mis. 24h,7d,30d")
+        out = []
+        for w in labels:
+            try:
+                td = pd.Timedelta(w)
+            except ValueError:
+                raise ValueError(f"jendela tidak dikenal: {w!r} (contoh: 24h, 7d, 30d)") from None
+            if td <= pd.Timedelta(0):
+                raise ValueError(f"jendela harus positif: {w!r}")
+            out.append((w, int(td.value)))
+        return out
+
+    def query(self, windows=None, kecamatan: Optional[str] = None, at=None) -> dict:
+        """
+        Jumlah & rata-rata prediksi Air (m³) / Mobil (unit) per kecamatan untuk jendela
+        (at - w, at]. `at` default = sekarang (waktu lokal, sama seperti kolom Waktu).
+        `per_day` = jumlah dibagi panjang jendela dalam hari (moving average harian).
+        """
+        wins = self.parse_windows(windows)
+        end = pd.Timestamp(at) if at is not None else pd.Timestamp.now()
+        if pd.isna(end):
+            raise ValueError("parameter at bukan tanggal yang valid")
+        if end.tz is not None:
+            end = end.tz_localize(None)
+        end_ns = int(end.value)
+        kec = str(kecamatan).strip().lower() if kecamatan else None
+
+        def row(sums: dict, ns: int) -> dict:
+            days = ns / 86_400e9
+            return {
+                "count": sums["count"],
+                "air_sum": round(sums["air_sum"] / 100.0, 2),
+                "mobil_sum": sums["mobil_sum"],
+                "avg_air": round(sums["air_sum"] / 100.0 / sums["air_n"], 2) if sums["air_n"] else None,
+                "avg_mobil": round(sums["mobil_sum"] / sums["mobil_n"], 2) if sums["mobil_n"] else None,
+                "air_per_day": round(sums["air_sum"] / 100.0 / days, 2),
+                "mobil_per_day": round(sums["mobil_sum"] / days, 2),
+            }
+
+        per_kec, total = {}, {w: dict.fromkeys(_PrefixSeries.FIELDS, 0) for w, _ in wins}
+        with self._lock:
+            for key, series in self._series.items():
+                if kec and key != kec:
+                    continue
+                sums = {w: series.window(end_ns - ns + 1, end_ns) for w, ns in wins}
+                per_kec[self._labels[key]] = {w: row(sums[w], ns) for w, ns in wins}
+                for w, _ in wins:
+                    for f, v in sums[w].items():
+                        total[w][f] += v
+
+        return {
+            "at": end.isoformat(),
+            "windows": [w for w, _ in wins],
+            "kecamatan": dict(sorted(per_kec.items(), key=lambda kv: -kv[1][wins[0][0]]["air_sum"])),
+            "total": {w: row(total[w], ns) for w, ns in wins},
+        }
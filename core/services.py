@@ -0,0 +1,114 @@
+# core/services.py
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyService(Generic[T]):
+    """
+    Handle untuk komponen berat (model, klien Google Sheet, Twilio).
+
+    Modul berat baru di-import dan koneksi baru dibuat saat `start()` (di thread latar)
+    atau saat `get()` pertama kali dipanggil. `get()` menunggu sampai objek siap;
+    kalau inisialisasi gagal, error yang sama dilempar ulang ke setiap pemanggil sampai
+    jeda `retry_backoff` lewat (dobel tiap gagal, maks `max_backoff`). Setelah itu
+    `start()`/`get()` berikutnya mencoba inisialisasi lagi.
+
+    `warmup(obj)` (opsional) dijalankan setelah objek dibuat, mis. baca sheet pertama.
+    Selama warmup berjalan `get()` sudah bisa dipakai, tetapi `ready` masih False
+    sehingga UI tetap memakai data cache.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T],
+                 warmup: Optional[Callable[[T], object]] = None,
+                 retry_backoff: float = 5.0, max_backoff: float = 300.0):
+        self.name = name
+        self._factory = factory
+        self._warmup = warmup
+        self._value: Optional[T] = None
+        self._error: Optional[BaseException] = None
+        self._done = threading.Event()
+        self._warm = threading.Event()
+        self._lock = threading.Lock()
+        self._started = False
+        self._failures = 0
+        self._failed_at = 0.0
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.init_seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._warm.is_set() and self._error is None
+
+    @property
+    def error(self) -> Optional[str]:
+        """Pesan error inisialisasi (None kalau belum selesai atau berhasil)."""
+        return None if self._error is None else f"{type(self._error).__name__}: {self._error}"
+
+    @property
+    def retry_in(self) -> Optional[float]:
+        """Sisa detik sebelum inisialisasi yang gagal boleh dicoba lagi (None kalau tidak gagal)."""
+        if self._error is None:
+            return None
+        backoff = min(self.retry_backoff * 2 ** (self._failures - 1), self.max_backoff)
+        return max(0.0, self._failed_at + backoff - time.monotonic())
+
+    def _reset_if_due(self) -> None:
+        # dipanggil dengan self._lock dipegang; _warm di-set paling akhir oleh _init yang gagal
+        if self._error is not None and self._warm.is_set() and not self.retry_in:
+            self._error = None
+            self._done.clear()
+            self._warm.clear()
+            self._started = False
+
+    def start(self) -> "LazyService[T]":
+        """Mulai inisialisasi di thread latar (tidak memblokir)."""
+        with self._lock:
+            self._reset_if_due()
+            if self._started:
+                return self
+            self._started = True
+        threading.Thread(target=self._init, name=f"init-{self.name}", daemon=True).start()
+        return self
+
+    def get(self) -> T:
+        with self._lock:
+            self._reset_if_due()
+            run_here = not self._started
+            self._started = True
+        if run_here:
+            self._init()
+        self._done.wait()
+        if self._error is not None:
+            raise RuntimeError(f"{self.name} gagal diinisialisasi: {self._error}") from self._error
+        return self._value
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Mulai (bila belum) lalu tunggu sampai inisialisasi + warmup selesai."""
+        self.start()
+        return self._warm.wait(timeout)
+
+    def _init(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            self._value = self._factory()
+        except BaseException as e:
+            print(f" Gagal inisialisasi {self.name}: {e}")
+            self._failures += 1
+            self._failed_at = time.monotonic()
+            self._error = e
+        else:
+            self._failures = 0
+        finally:
+            self._done.set()
+
+        if self._error is None and self._warmup is not None:
+            try:
+                self._warmup(self._value)
+            except Exception as e:
+                print(f" Warmup {self.name} gagal: {e}")
+        self.init_seconds = time.perf_counter() - t0
+        self._warm.set()
@@ -0,0 +1,189 @@
+# core/sheets_quota.py
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+WINDOW = 60.0   # kuota Sheets API dihitung per menit
+
+
+class QuotaExhausted(Exception):
+    """Panggilan ditolak scheduler (budget habis / sedang cooldown) tanpa menyentuh API."""
+
+
+def _status_of(exc) -> Optional[int]:
+    # gspread.exceptions.APIError membawa `response` (requests.Response); tanpa import gspread
+    resp = getattr(exc, "response", None)
+    status = getattr(resp, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def may_have_applied(exc) -> bool:
+    """
+    True kalau panggilan yang gagal mungkin sudah dijalankan server (5xx / koneksi putus
+    setelah request terkirim). Tulis seperti append_row tidak idempoten, jadi hasil seperti
+    ini tidak boleh langsung diulang tanpa mengecek sheet lebih dulu.
+    """
+    status = _status_of(exc)
+    if status is not None:
+        return status >= 500
+    return isinstance(exc, OSError)
+
+
+def _retry_after(exc) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class SheetsScheduler:
+    """
+    Penjadwal terpusat untuk semua panggilan Google Sheets (baca SheetReader & tulis logger).
+
+    - Budget: jendela geser 60 detik, maksimal `per_minute` panggilan. `write_reserve`
+      slot terakhir hanya boleh dipakai tulis, dan selama ada tulis yang menunggu,
+      baca dashboard langsung ditolak (`QuotaExhausted`) -> pemanggil memakai snapshot lama.
+    - Tulis menunggu budget (maks. `max_wait` detik), baca tidak pernah menunggu.
+    - Baca: 429 / 5xx / gangguan jaringan diulang dengan exponential backoff + jitter
+      (header Retry-After dihormati). Tulis hanya diulang pada 429 (pasti ditolak);
+      5xx / jaringan langsung dilempar karena barisnya mungkin sudah masuk
+      (`may_have_applied`, logger mengecek sheet sebelum mengirim ulang).
+      429 juga memasang cooldown global supaya panggilan lain tidak ikut menghabiskan kuota.
+    """
+
+    def __init__(self, per_minute: Optional[int] = None, write_reserve: Optional[int] = None,
+                 read_retries: int = 2, write_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 32.0, max_wait: float = 90.0):
+        self.per_minute = int(per_minute or os.getenv("GSHEET_QUOTA_PER_MIN", "60"))
+        reserve = write_reserve if write_reserve is not None else os.getenv("GSHEET_WRITE_RESERVE", "10")
+        self.write_reserve = max(0, min(int(reserve), self.per_minute - 1))
+        self.read_retries = read_retries
+        self.write_retries = write_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._calls: deque = deque()         # waktu (monotonic) tiap panggilan dalam jendela
+        self._cooldown_until = 0.0
+        self._writers_waiting = 0
+        self._counters = {
+            "read": 0, "write": 0, "ok": 0, "retries": 0,
+            "throttled": 0, "server_errors": 0, "network_errors": 0,
+            "reads_rejected": 0, "writes_timed_out": 0, "failed": 0,
+            "wait_seconds": 0.0,
+        }
+
+    # === Budget ===
+    def _trim(self, now: float) -> None:
+        while self._calls and now - self._calls[0] >= WINDOW:
+            self._calls.popleft()
+
+    def _acquire(self, kind: str, deadline: float) -> None:
+        with self._cond:
+            if kind == "write":
+                self._writers_waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._trim(now)
+                    limit = self.per_minute if kind == "write" else self.per_minute - self.write_reserve
+                    wait = max(0.0, self._cooldown_until - now)
+                    if len(self._calls) >= limit:
+                        wait = max(wait, self._calls[len(self._calls) - limit] + WINDOW - now)
+                    if kind == "read" and self._writers_waiting:
+                        wait = max(wait, 1e-3)
+                    if wait <= 0:
+                        self._calls.append(now)
+                        self._counters[kind] += 1
+                        return
+                    if kind == "read":
+                        self._counters["reads_rejected"] += 1
+                        raise QuotaExhausted(f"kuota Sheets: baca ditunda, coba lagi dalam {wait:.1f} detik")
+                    if now + wait > deadline:
+                        self._counters["writes_timed_out"] += 1
+                        raise QuotaExhausted(f"budget tulis tidak tersedia dalam {self.max_wait:.0f} detik")
+                    self._counters["wait_seconds"] += wait
+                    self._cond.wait(wait)
+            finally:
+                if kind == "write":
+                    self._writers_waiting -= 1
+                    self._cond.notify_all()
+
+    def _backoff(self, attempt: int, exc) -> float:
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(cap / 2, cap)   # jitter: klien paralel tidak retry bersamaan
+        hinted = _retry_after(exc)
+        return max(delay, hinted) if hinted is not None else delay
+
+    # === API ===
+    def call(self, fn, *args, kind: str = "read", **kwargs):
+        """Jalankan `fn(*args, **kwargs)` di bawah budget kuota; `kind` = "read" | "write"."""
+        retries = self.write_retries if kind == "write" else self.read_retries
+        deadline = time.monotonic() + self.max_wait
+        attempt = 0
+        while True:
+            self._acquire(kind, deadline)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                status = _status_of(e)
+                if status == 429:
+                    reason = "throttled"
+                elif status is not None and status >= 500:
+                    reason = "server_errors"
+                elif status is None and isinstance(e, OSError):
+                    reason = "network_errors"   # requests.ConnectionError/Timeout turunan OSError
+                else:
+                    reason = None
+                retryable = reason == "throttled" if kind == "write" else reason is not None
+                delay = self._backoff(attempt, e) if reason else 0.0
+                with self._cond:
+                    if reason:
+                        self._counters[reason] += 1
+                    if reason == "throttled":
+                        self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+                    give_up = (not retryable or attempt >= retries
+                               or time.monotonic() + delay > deadline)
+                    self._counters["failed" if give_up else "retries"] += 1
+                if give_up:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            with self._cond:
+                self._counters["ok"] += 1
+            return result
+
+    def stats(self) -> dict:
+        """Counter untuk monitoring (lihat /api/sheets/status)."""
+        with self._cond:
+            now = time.monotonic()
+            self._trim(now)
+            out = dict(self._counters)
+            out.update({
+                "per_minute": self.per_minute,
+                "write_reserve": self.write_reserve,
+                "used_last_minute": len(self._calls),
+                "cooldown_s": round(max(0.0, self._cooldown_until - now), 2),
+                "writers_waiting": self._writers_waiting,
+            })
+        out["wait_seconds"] = round(out["wait_seconds"], 2)
+        return out
+
+
+_default: Optional[SheetsScheduler] = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler() -> SheetsScheduler:
+    """Satu scheduler per proses: kuota Sheets dihitung per akun layanan, bukan per objek."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = SheetsScheduler()
+        return _default
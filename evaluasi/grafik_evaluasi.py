@@ -1,45 +1,97 @@
+import argparse
+import json
+
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import numpy as np
 
-# Data evaluasi
-metrics = ['MAE', 'MSE', 'R²']
-air_dummy = [4.02, 119.43, 0.80]
-air_real = [21.71, 2612.80, -0.08]
-mobil_dummy = [0.37, 0.98, 0.80]
-mobil_real = [1.95, 6.62, -0.04]
-
-x = np.arange(len(metrics))  
-width = 0.2  
-
-fig, ax = plt.subplots(figsize=(10, 6))
+# Grafik dibuat dari report tools/bench_model.py (tidak ada angka yang di-hardcode lagi)
+# Contoh:
+#   python tools/bench_model.py --out model/benchmark_report.json
+#   python evaluasi/grafik_evaluasi.py --report model/benchmark_report.json
 
+METRICS = [("MAE", "MAE"), ("MSE", "MSE"), ("R2", "R²")]
 
-rects1 = ax.bar(x - width*1.5, air_dummy, width, label='Air - Dummy')
-rects2 = ax.bar(x - width/2, air_real, width, label='Air - Real')
-rects3 = ax.bar(x + width/2, mobil_dummy, width, label='Mobil - Dummy')
-rects4 = ax.bar(x + width*1.5, mobil_real, width, label='Mobil - Real')
 
-# Label dan tampilan
-ax.set_ylabel('Nilai')
-ax.set_title('Gambar 5.8 Grafik Perbandingan Evaluasi Model AI (Dummy vs Real)')
-ax.set_xticks(x)
-ax.set_xticklabels(metrics)
-ax.legend()
-ax.grid(axis='y', linestyle='--', alpha=0.7)
+def load_series(report):
+    """{label: variant} untuk varian yang punya metrik akurasi."""
+    series = {}
+    for name, res in report["bundles"].items():
+        for label, v in res["variants"].items():
+            if "R2_air" not in v:
+                continue
+            series[name if label == "default" else f"{name}:{label}"] = v
+    return series
 
 
-def autolabel(rects):
+def autolabel(ax, rects):
     for rect in rects:
         height = rect.get_height()
         ax.annotate(f'{height:.2f}',
                     xy=(rect.get_x() + rect.get_width() / 2, height),
                     xytext=(0, 4),
                     textcoords="offset points",
-                    ha='center', va='bottom')
+                    ha='center', va='bottom', fontsize=8)
+
+
+def grafik_akurasi(series, out):
+    labels = list(series)
+    bars = [(f"Air - {l}", "air", l) for l in labels] + [(f"Mobil - {l}", "mobil", l) for l in labels]
+    x = np.arange(len(METRICS))
+    width = 0.8 / max(len(bars), 1)
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for i, (legend, target, label) in enumerate(bars):
+        values = [series[label][f"{m}_{target}"] for m, _ in METRICS]
+        rects = ax.bar(x - 0.4 + width * (i + 0.5), values, width, label=legend)
+        autolabel(ax, rects)
+
+    # Label dan tampilan
+    ax.set_ylabel('Nilai')
+    ax.set_title('Gambar 5.8 Grafik Perbandingan Evaluasi Model AI')
+    ax.set_xticks(x)
+    ax.set_xticklabels([t for _, t in METRICS])
+    ax.legend()
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.savefig(out, dpi=300)
+    plt.close(fig)
+
+
+def grafik_latensi(report, out):
+    rows = [(name if label == "default" else f"{name}:{label}", v)
+            for name, res in report["bundles"].items() for label, v in res["variants"].items()]
+    y = np.arange(len(rows))
+
+    fig, ax = plt.subplots(figsize=(10, max(3, 0.6 * len(rows) + 1)))
+    ax.barh(y - 0.2, [v["single_p50_ms"] for _, v in rows], 0.4, label="1 baris p50 (ms)")
+    ax.barh(y + 0.2, [v["single_p99_ms"] for _, v in rows], 0.4, label="1 baris p99 (ms)")
+    ax.set_yticks(y)
+    ax.set_yticklabels([r for r, _ in rows])
+    ax.set_xlabel('Latensi (ms)')
+    ax.set_title('Latensi Prediksi per Model')
+    ax.legend()
+    ax.grid(axis='x', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.savefig(out, dpi=200)
+    plt.close(fig)
 
-for rect_group in [rects1, rects2, rects3, rects4]:
-    autolabel(rect_group)
 
-plt.tight_layout()
-plt.savefig('gambar_5_8_evaluasi.png', dpi=300)
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Grafik evaluasi dari report benchmark model.")
+    ap.add_argument("--report", default="model/benchmark_report.json")
+    ap.add_argument("--out", default="evaluasi/gambar_5_8_evaluasi.png")
+    ap.add_argument("--out-latency", default="evaluasi/grafik_latensi.png")
+    args = ap.parse_args()
 
+    with open(args.report, encoding="utf-8") as f:
+        report = json.load(f)
+    series = load_series(report)
+    if series:
+        grafik_akurasi(series, args.out)
+        print(f"✅ {args.out}")
+    else:
+        print(" Gagal membuat grafik akurasi: report tidak berisi metrik akurasi")
+    grafik_latensi(report, args.out_latency)
+    print(f"✅ {args.out_latency}")
@@ -1,82 +1,340 @@
 # main.py (Flask backend + pywebview)
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory
-from core.data_source import SheetReader
-from core.predictor import FirePredictor
-from core.logger import GoogleSheetLogger
-from core.notifier import WhatsAppNotifier
+from flask import (Flask, Response, render_template, stream_template, request, redirect, url_for, flash,
+                   get_flashed_messages, jsonify, send_from_directory, session)
+from core.idempotency import PENDING, IdempotencyIndex
+from core.http_cache import conditional_get, init_static_cache
+from core.compression import init_compression
+from core.profiling import init_profiling
+from core.broadcaster import Broadcaster
+from core.features import fitur_laporan
+from core.services import LazyService
+from core.sheets_quota import default_scheduler
 from datetime import datetime
+import json
 import os
 
+# Catatan: pandas/sklearn/gspread/twilio TIDAK di-import di sini.
+# Semua komponen berat dibungkus LazyService dan diinisialisasi di thread latar,
+# jadi `import main` ringan dan UI bisa langsung menyajikan cache dashboard dari disk.
+
 app = Flask(__name__)
 app.secret_key = "fireai-secret"
+# dashboard di-stream (shell + grafik dulu, baris tabel menyusul) & respons dikompres
+app.config["DASHBOARD_STREAMING"] = os.getenv("DASHBOARD_STREAMING", "1") == "1"
+app.config["COMPRESS_RESPONSES"] = os.getenv("COMPRESS_RESPONSES", "1") == "1"
+init_compression(app)
+init_static_cache(app, prefix="css/")
+init_profiling(app)   # /debug/metrics & /debug/profile aktif bila FIREAI_PROFILE_TOKEN diisi
 
 # Init komponen
 base_dir = os.path.dirname(__file__)
 model_path = os.path.join(base_dir, "model", "trained_model_Dummy.pkl")
-predictor = FirePredictor(model_path)
-logger = GoogleSheetLogger(sheet_name=os.getenv("GSHEET_NAME","PrediksiKebakaran"))
-notifier = WhatsAppNotifier()
-sr = SheetReader()
 
-# Helpers ringkas
+def _buat_predictor():
+    from core.predictor import FirePredictor
+    return FirePredictor(model_path)
+
+def _laporan_terkirim(n):
+    if sr.ready:
+        sr.get().invalidate()   # baris baru -> snapshot & ETag berikutnya ikut berubah
+
+def _buat_logger():
+    from core.logger import GoogleSheetLogger
+    return GoogleSheetLogger(sheet_name=os.getenv("GSHEET_NAME","PrediksiKebakaran"),
+                             on_terkirim=_laporan_terkirim)
+
+def _buat_notifier():
+    from core.notifier import WhatsAppNotifier
+    return WhatsAppNotifier()
+
+def _buat_heatmap():
+    from core.rollups import HeatmapIndex
+    return HeatmapIndex()
+
+def _buat_demand():
+    from core.rollups import DemandIndex
+    return DemandIndex()
+
+def _buat_sheet_reader(sheet=None):
+    from core.data_source import SheetReader
+    reader = SheetReader(sheet=sheet)
+    reader.subscribe(heatmap.get().on_snapshot)
+    reader.subscribe(demand.get().on_snapshot)
+    reader.subscribe(_siarkan_snapshot)
+    reader.subscribe(_simpan_cache_dashboard)
+    broadcaster.start_poller(reader.get_dataframe, interval=max(reader.cache_ttl, 5.0))
+    return reader
+
+predictor = LazyService("predictor", _buat_predictor)
+logger = LazyService("logger", _buat_logger)
+notifier = LazyService("notifier", _buat_notifier)
+heatmap = LazyService("heatmap", _buat_heatmap)   # rollup hari x jam, diisi listener SheetReader
+demand = LazyService("demand", _buat_demand)      # prefix sum Air/Mobil per kecamatan, listener SheetReader
+# baca sheet pertama dilakukan di thread latar (warmup), bukan di request pertama
+sr = LazyService("sheet_reader", _buat_sheet_reader, warmup=lambda reader: reader.get_dataframe())
+
+def start_services():
+    """Mulai semua inisialisasi berat di latar (idempoten)."""
+    for svc in (sr, predictor, logger, notifier):
+        svc.start()
+
+# Indeks anti submit ganda (klik dobel / retry POST browser)
+cache_dir = os.getenv("FIREAI_CACHE_DIR", os.path.join(base_dir, "cache"))
+idem = IdempotencyIndex(
+    path=os.path.join(cache_dir, "idempotency.json"),
+    ttl=int(os.getenv("IDEMPOTENCY_WINDOW", "600")),
+    content_window=int(os.getenv("IDEMPOTENCY_CONTENT_WINDOW", "30")),
+)
+
+# Jumlah baris tabel per halaman (awal render & /api/laporan)
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "50"))
+
+# Cache dashboard di disk: disajikan selama SheetReader belum siap (awal startup)
+dashboard_cache_path = os.path.join(cache_dir, "dashboard.json")
+
+# Helpers ringkas (di-memo per versi snapshot)
 def get_kawasan_count():
-    df = sr.get_dataframe()
+    return sr.get().memo("kawasan_count", (), _kawasan_count)
+
+def _kawasan_count():
+    df = sr.get().get_dataframe()
     if df.empty: return {}
     vc = (df["Kawasan"].fillna("Lainnya").astype(str).str.strip().value_counts())
     return vc.to_dict()
 
 def get_bulanan_count():
-    df = sr.get_dataframe()
+    return sr.get().memo("bulanan_count", (), _bulanan_count)
+
+def _bulanan_count():
+    df = sr.get().get_dataframe()
     if df.empty or "Waktu_dt" not in df.columns: return {}
     df = df.dropna(subset=["Waktu_dt"])
-    df["BulanLabel"] = df["Waktu_dt"].dt.strftime("%Y-%m")
-    vc = df["BulanLabel"].value_counts().sort_index()
+    vc = df["Waktu_dt"].dt.strftime("%Y-%m").value_counts().sort_index()
     return vc.to_dict()
 
 def get_kecamatan_count():
-    df = sr.get_dataframe()
+    return sr.get().memo("kecamatan_count", (), _kecamatan_count)
+
+def _kecamatan_count():
+    df = sr.get().get_dataframe()
     if df.empty: return {}
     vc = df["Kecamatan"].fillna("Lainnya").astype(str).str.strip().value_counts()
     return vc.to_dict()
 
 def get_kecamatan_options():
-    df = sr.get_dataframe()
+    return sr.get().memo("kecamatan_options", (), _kecamatan_options)
+
+def _kecamatan_options():
+    df = sr.get().get_dataframe()
     if df.empty: return []
     return sorted([k for k in df["Kecamatan"].dropna().astype(str).unique()])
 
+def _siarkan_snapshot(new_rows, snapshot, reset):
+    """Listener SheetReader: kirim baris baru + delta hitungan ke semua klien /api/stream."""
+    from core.data_source import records_json
+    reader = sr.get()
+    if reset:
+        broadcaster.publish("reset", {
+            "version": reader.version,
+            "kecamatan": {k: int(v) for k, v in get_kecamatan_count().items()},
+            "bulan": {k: int(v) for k, v in get_bulanan_count().items()},
+        })
+        return
+    if new_rows.empty:
+        return
+    kec = new_rows["Kecamatan"].fillna("Lainnya").astype(str).str.strip().value_counts()
+    bln = new_rows["Waktu_dt"].dropna().dt.strftime("%Y-%m").value_counts()
+    broadcaster.publish("laporan", {
+        "version": reader.version,
+        "rows": records_json(new_rows),
+        "delta": {
+            "kecamatan": {k: int(v) for k, v in kec.items()},
+            "bulan": {k: int(v) for k, v in bln.items()},
+        },
+    })
+
+def _data_dashboard():
+    reader = sr.get()
+    halaman = reader.get_page(limit=PAGE_SIZE)   # hanya halaman pertama; sisanya via /api/laporan
+    return {
+        "laporan": halaman["rows"],
+        "next_cursor": halaman["next_cursor"],
+        "pie_data": {k: int(v) for k, v in get_kecamatan_count().items()},      # ganti: per kecamatan
+        "bar_data": {k: int(v) for k, v in get_bulanan_count().items()},        # tetap
+        "kecamatan_opts": get_kecamatan_options(),
+    }
+
+def _simpan_cache_dashboard(new_rows, snapshot, reset):
+    """Listener SheetReader: tulis data dashboard terbaru ke disk untuk startup berikutnya."""
+    try:
+        data = _data_dashboard()
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = dashboard_cache_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp, dashboard_cache_path)
+    except Exception as e:
+        print(f" Gagal menyimpan cache dashboard: {e}")
+
+def _baca_cache_dashboard():
+    try:
+        with open(dashboard_cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {"laporan": [], "next_cursor": None, "pie_data": {}, "bar_data": {}, "kecamatan_opts": []}
+
+# Live feed: satu broadcaster + satu poller untuk semua klien SSE
+broadcaster = Broadcaster()
+
+def _snapshot_tag():
+    # selama SheetReader belum siap, halaman dari cache disk tidak diberi ETag
+    # tanpa refresh: revalidasi 304 tidak boleh memicu baca sheet (poller yang menjaga versi tetap baru)
+    return sr.get().cached_tag() if sr.ready and not sr.get().unavailable else None
+
+def _ada_flash():
+    # halaman dengan pesan flash tidak boleh dijawab 304 (pesannya akan hilang)
+    return "_flashes" in session
+
+@app.before_request
+def _mulai_layanan():
+    # untuk server WSGI eksternal (mis. `waitress-serve main:app`) yang tidak lewat main()
+    start_services()
+
 @app.route("/", methods=["GET","POST"])
+@conditional_get(_snapshot_tag, skip_if=_ada_flash)
 def index():
     hasil = None
     if request.method == "POST":
         try:
-            hasil = predictor.predict(request.form)
+            hasil = predictor.get().predict(request.form)
         except Exception as e:
             flash(f"Gagal memproses prediksi: {e}", "error")
 
-    df = sr.get_dataframe()
-    laporan = df.to_dict(orient="records") if not df.empty else []
-    pie_data = get_kecamatan_count()      # ganti: per kecamatan
-    bar_data = get_bulanan_count()        # tetap
-    kecamatan_opts = get_kecamatan_options()
+    # sheet belum pernah terbaca (mis. kuota habis saat startup) -> tetap pakai cache disk
+    memuat = not sr.ready or sr.get().unavailable
+    data = _baca_cache_dashboard() if memuat else _data_dashboard()
+    rows = data.pop("laporan")
 
-    return render_template("dashboard.html",
-                           hasil=hasil, laporan=laporan,
-                           pie_data=pie_data, bar_data=bar_data,
-                           kecamatan_opts=kecamatan_opts)
+    render = stream_template if app.config["DASHBOARD_STREAMING"] else render_template
+    return render("dashboard.html", hasil=hasil, memuat=memuat,
+                  flashes=get_flashed_messages(with_categories=True),
+                  laporan=(row for row in rows), **data)
+
+@app.route("/api/ready")
+def api_ready():
+    # dipoll halaman "memuat": murah, tidak menunggu inisialisasi maupun membaca sheet
+    sr.start()   # inisialisasi yang gagal dicoba lagi di latar begitu jeda backoff lewat
+    if sr.error:
+        return jsonify({"ready": False, "error": sr.error, "retry_after": sr.retry_in}), 503
+    if not sr.ready:
+        return jsonify({"ready": False})
+    reader = sr.get()
+    if reader.unavailable:
+        # sheet belum pernah terbaca (kuota habis / baca gagal): jangan reload dulu.
+        # cached_tag() memicu paling banyak satu baca latar per TTL, berapa pun klien yang poll.
+        reader.cached_tag()
+        cooldown = default_scheduler().stats()["cooldown_s"]
+        return jsonify({"ready": False, "retry_after": max(cooldown, reader.cache_ttl),
+                        "last_error": reader.last_error})
+    return jsonify({"ready": True})
 
 @app.route("/api/stats")
+@conditional_get(_snapshot_tag)
 def api_stats():
     period  = request.args.get("period","month")     # day|month|year
     kec     = request.args.get("kecamatan")          # baru
     alamat  = request.args.get("alamat")             # baru (substring)
     obyek   = request.args.get("obyek")              # opsional lama
+    dari    = request.args.get("from")               # YYYY-MM-DD[ HH:MM], inklusif
+    sampai  = request.args.get("to")
 
-    agg = sr.aggregate(by=period, kecamatan=kec, alamat_contains=alamat, obyek=obyek)
+    try:
+        agg = sr.get().aggregate(by=period, kecamatan=kec, alamat_contains=alamat, obyek=obyek,
+                                 date_from=dari, date_to=sampai)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify({
         "labels": agg["label"].astype(str).tolist(),
         "values": agg["count"].astype(int).tolist()
     })
 
+@app.route("/api/stats/pivot")
+@conditional_get(_snapshot_tag)
+def api_stats_pivot():
+    # contoh: /api/stats/pivot?rows=kecamatan&cols=month&sums=air,mobil&obyek=rumah
+    sums = [x for x in (request.args.get("sums") or "").split(",") if x.strip()]
+    try:
+        pv = sr.get().pivot(
+            rows=request.args.get("rows", "kecamatan"),
+            cols=request.args.get("cols", "month"),
+            sums=tuple(x.strip() for x in sums),
+            kecamatan=request.args.get("kecamatan") or None,
+            alamat_contains=request.args.get("alamat") or None,
+            obyek=request.args.get("obyek") or None,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(pv)
+
+@app.route("/api/heatmap")
+@conditional_get(_snapshot_tag)
+def api_heatmap():
+    # matriks 7 (Senin..Minggu) x 24 jam: jumlah kejadian + rata-rata prediksi Air/Mobil
+    reader = sr.get()
+    reader.get_dataframe()   # pastikan rollup sudah menerima baris terbaru
+    kec, oby = request.args.get("kecamatan") or None, request.args.get("obyek") or None
+    hm = heatmap.get()
+    if hm.covers(oby):
+        return jsonify(hm.query(kecamatan=kec, obyek=oby))
+    # teks obyek bebas (bukan kategori): dari snapshot, di-memo per versi
+    return jsonify(reader.memo("heatmap", (kec, oby.strip().lower()),
+                               lambda: hm.from_frame(reader.filtered(obyek=oby)).query(kecamatan=kec)))
+
+@app.route("/api/demand")
+def api_demand():
+    # contoh: /api/demand?windows=24h,7d,30d&kecamatan=Coblong
+    # tanpa ETag: jendela bergeser mengikuti jam walau snapshot tidak berubah
+    sr.get().get_dataframe()   # pastikan indeks sudah menerima baris terbaru
+    try:
+        out = demand.get().query(
+            windows=request.args.get("windows") or None,
+            kecamatan=request.args.get("kecamatan") or None,
+            at=request.args.get("at") or None,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(out)
+
+@app.route("/api/laporan")
+@conditional_get(_snapshot_tag)
+def api_laporan():
+    try:
+        page = sr.get().get_page(
+            limit=request.args.get("limit", PAGE_SIZE, type=int),
+            cursor=request.args.get("cursor") or None,
+            sort=request.args.get("sort", "waktu"),       # waktu|air|mobil
+            order=request.args.get("order", "desc"),      # asc|desc
+            kecamatan=request.args.get("kecamatan") or None,
+            alamat_contains=request.args.get("alamat") or None,
+            obyek=request.args.get("obyek") or None,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(page)
+
+@app.route("/api/sheets/status")
+def api_sheets_status():
+    # counter scheduler kuota Google Sheets + kondisi snapshot (untuk monitoring)
+    out = {"quota": default_scheduler().stats(), "reader": sr.get().status() if sr.ready else None}
+    if logger.ready:
+        out["outbox"] = logger.get().outbox_size()
+    return jsonify(out)
+
+@app.route("/api/stream")
+def api_stream():
+    return Response(broadcaster.stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route("/submit", methods=["POST"])
 def submit():
     nama   = request.form.get("nama")
@@ -87,25 +345,53 @@ def submit():
         flash("Semua field wajib diisi!", "error")
         return redirect(url_for("index"))
 
+    # === cek submit ganda ===
+    token_key = idem.key_for_token(request.form.get("idempotency_key") or request.headers.get("Idempotency-Key"))
+    report_key = idem.key_for_report(nama, lokasi, obyek)
+    store_keys = [token_key, report_key]
+    sebelumnya = idem.begin(store_keys, store_keys)
+    if sebelumnya is PENDING:
+        # submit pertama masih berjalan (prediksi/Sheet/WA lambat) -> jangan proses dua kali
+        if request.accept_mimetypes.accept_html:
+            flash("Laporan yang sama masih diproses, tunggu sebentar lalu muat ulang halaman.", "error")
+            return redirect(url_for("index"))
+        return jsonify({"status": "processing"}), 409, {"Retry-After": "5"}
+    if sebelumnya is not None:
+        # kiriman ganda: tidak diprediksi/dicatat/di-WA lagi, pelapor diberi tahu dan bisa kirim ulang
+        if not request.accept_mimetypes.accept_html:
+            return jsonify({"status": "duplicate", **sebelumnya})
+        flash(f"Laporan yang sama sudah diterima ({sebelumnya['waktu']}): Air {sebelumnya['air']} m³, "
+              f"Mobil {sebelumnya['mobil']} unit, jadi tidak dicatat dua kali. Kalau ini kebakaran baru "
+              f"di lokasi yang sama, kirim ulang setelah {idem.content_window} detik.", "error")
+        return redirect(url_for("index"))
+
+    try:
+        hasil = _proses_laporan(nama, lokasi, obyek)
+    except Exception:
+        idem.release(store_keys)
+        raise
+    if hasil is None:
+        idem.release(store_keys)
+    else:
+        idem.complete(store_keys, hasil)
+    return redirect(url_for("index"))
+
+def _proses_laporan(nama, lokasi, obyek):
+    """Prediksi -> catat ke Sheet -> kirim WA. Kembalikan ringkasan hasil, atau None bila prediksi gagal."""
     now = datetime.now()
     bulan = now.month
 
     try:
-        hasil = predictor.predict({
-            "lokasi": lokasi,
-            "kawasan": "umum",
-            "obyek": obyek.strip().lower(),
-            "bulan": int(bulan),
-        })
+        hasil = predictor.get().predict(fitur_laporan(lokasi, obyek, bulan))
     except Exception as e:
         app.logger.exception("Exception saat memanggil predictor.predict")
         flash(f"Gagal memproses prediksi: {e}", "error")
-        return redirect(url_for("index"))
+        return None
 
     # === tangani error dari predictor ===
     if isinstance(hasil, dict) and "error" in hasil:
         flash(f"Gagal prediksi: {hasil['error']}", "error")
-        return redirect(url_for("index"))
+        return None
 
     #validasi format hasil
     if (not isinstance(hasil, dict)
@@ -113,7 +399,7 @@ def submit():
         or "mobil" not in hasil):
         app.logger.error("Format hasil prediksi tidak sesuai: %r", hasil)
         flash("Format hasil prediksi tidak valid.", "error")
-        return redirect(url_for("index"))
+        return None
 
     try:
         air = float(hasil["air"])
@@ -121,17 +407,18 @@ def submit():
     except Exception as e:
         app.logger.exception("Tipe hasil prediksi tidak bisa dikonversi: %r", hasil)
         flash(f"Prediksi tidak dapat dibaca: {e}", "error")
-        return redirect(url_for("index"))
+        return None
     air, mobil = hasil["air"], hasil["mobil"]
 
     try:
-        logger.simpan_laporan({
+        # masuk antrean (outbox) lalu dikirim ke sheet di latar; lihat _laporan_terkirim
+        logger.get().simpan_laporan({
             "tanggal": now.strftime("%Y-%m-%d %H:%M"),
             "nama": nama, "lokasi": lokasi, "obyek": obyek,
             "bulan": bulan, "air": air, "mobil": mobil
         })
     except Exception as e:
-        flash(f"Gagal mencatat ke Google Sheet: {e}", "error")
+        flash(f"Gagal mencatat laporan: {e}", "error")
 
     pesan = (
         "*Laporan Kebakaran Masuk*\n"
@@ -143,25 +430,63 @@ def submit():
         f"Waktu        : {now.strftime('%Y-%m-%d %H:%M')}"
     )
     try:
-        notifier.kirim_pesan(pesan)
+        notifier.get().kirim_pesan(pesan)
     except Exception as e:
         flash(f"Gagal kirim ke WhatsApp: {e}", "error")
 
     flash(f"Prediksi berhasil: Air {air} m³, Mobil {mobil} unit", "success")
-    return redirect(url_for("index"))
+    return {"air": air, "mobil": mobil, "waktu": now.strftime("%Y-%m-%d %H:%M")}
 
 @app.route("/favicon.ico")
 def favicon():
     return send_from_directory("static","favicon.ico", mimetype="image/x-icon")
 
-if __name__ == "__main__":
+def serve(host="127.0.0.1", port=5000, server="dev", threads=16,
+          connection_limit=200, channel_timeout=120):
+    """
+    Jalankan `app` di server dev Flask atau di WSGI server produksi (waitress, multi-thread).
+    `channel_timeout` = batas idle koneksi keep-alive (detik).
+    Produksi sengaja satu proses: snapshot, indeks idempotensi & broadcaster SSE ada di memori.
+    Tiap klien /api/stream memegang satu thread, jadi `threads` harus > jumlah dashboard terbuka.
+    """
+    if server == "prod":
+        from waitress import serve as waitress_serve
+        waitress_serve(app, host=host, port=port, threads=threads,
+                       connection_limit=connection_limit, channel_timeout=channel_timeout,
+                       ident="fireai")
+    else:
+        app.run(host=host, port=port, threaded=True, use_reloader=False)
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Command Center Dashboard (Flask + pywebview).")
+    ap.add_argument("--server", choices=["dev", "prod"], default=os.getenv("FIREAI_SERVER", "dev"),
+                    help="dev = server bawaan Flask, prod = waitress multi-thread.")
+    ap.add_argument("--headless", action="store_true", default=os.getenv("FIREAI_HEADLESS") == "1",
+                    help="Tanpa jendela pywebview; server jalan di foreground.")
+    ap.add_argument("--host", default=os.getenv("FIREAI_HOST", "127.0.0.1"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("FIREAI_PORT", "5000")))
+    ap.add_argument("--threads", type=int, default=int(os.getenv("FIREAI_THREADS", "16")),
+                    help="Jumlah worker thread (mode prod).")
+    ap.add_argument("--connection-limit", type=int, default=200, help="Maks. koneksi terbuka (mode prod).")
+    ap.add_argument("--keepalive", type=int, default=120, help="Timeout idle keep-alive, detik (mode prod).")
+    args = ap.parse_args()
+
+    start_services()
+    kwargs = dict(host=args.host, port=args.port, server=args.server, threads=args.threads,
+                  connection_limit=args.connection_limit, channel_timeout=args.keepalive)
+    if args.headless:
+        serve(**kwargs)
+        return
+
     from threading import Thread
     import webview
 
-    def start_flask():
-        app.run()
-
-    t = Thread(target=start_flask, daemon=True)
+    t = Thread(target=serve, kwargs=kwargs, daemon=True)
     t.start()
-    webview.create_window("Command Center Dashboard", "http://127.0.0.1:5000", width=1100, height=720)
+    host = "127.0.0.1" if args.host in ("0.0.0.0", "") else args.host
+    webview.create_window("Command Center Dashboard", f"http://{host}:{args.port}", width=1100, height=720)
     webview.start()
+
+if __name__ == "__main__":
+    main()
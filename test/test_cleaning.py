@@ -0,0 +1,36 @@
+# test/test_cleaning.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import cleaning  # noqa: E402
+
+
+@pytest.fixture
+def src(tmp_path):
+    rows = [{"lokasi": f"Jl. {i}, Kecamatan {['Coblong', 'Andir'][i % 2]}", "kawasan": "Pemukiman",
+             "obyek": ["Rumah", "Toko", "Pabrik"][i % 3], "air": 5 + i, "mobil": 1 + i % 3,
+             "jam": i % 24, "bulan": 1 + i % 12} for i in range(30)]
+    path = tmp_path / "real.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def buat(src, tmp_path, name, **kw):
+    out = str(tmp_path / name)
+    cleaning.main(src, out, target_size=500, **kw)
+    with open(out, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_seed_sama_hasil_sama_berapa_pun_chunk_size(src, tmp_path, monkeypatch):
+    monkeypatch.setattr(cleaning, "DUMMY_BLOCK", 64)        # beberapa blok untuk 470 baris dummy
+    a = buat(src, tmp_path, "a.csv", seed=7, chunk_size=1)
+    b = buat(src, tmp_path, "b.csv", seed=7, chunk_size=200)
+    c = buat(src, tmp_path, "c.csv", seed=7, chunk_size=10_000)
+    assert a == b == c
+    assert len(a.splitlines()) == 501                        # header + target_size
+    assert buat(src, tmp_path, "d.csv", seed=8, chunk_size=200) != a
@@ -0,0 +1,39 @@
+# test/test_compression.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+pytest.importorskip("flask")
+
+from core import compression  # noqa: E402
+
+
+@pytest.fixture
+def dengan_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+
+
+@pytest.mark.parametrize("accept, enc", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip;q=0, br;q=0", None),
+    ("gzip;q=0", None),
+    ("br;q=0.5, gzip;q=0.9", "gzip"),
+    ("*", "br"),
+    ("*;q=0", None),
+    ("br;q=0, *", "gzip"),
+    ("identity", None),
+    ("", None),
+    (None, None),
+])
+def test_pilih_encoding_menghormati_q(dengan_brotli, accept, enc):
+    assert compression._pick_encoding(accept) == enc
+
+
+def test_tanpa_brotli_hanya_gzip(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert compression._pick_encoding("br") is None
+    assert compression._pick_encoding("br, gzip;q=0.1") == "gzip"
+    assert compression._pick_encoding("gzip;q=0") is None
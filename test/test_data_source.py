@@ -0,0 +1,175 @@
+# test/test_data_source.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("gspread")
+pytest.importorskip("oauth2client")
+
+from core.data_source import (SheetReader, _decode_cursor, _encode_cursor, _parse_datetime_series,  # noqa: E402
+                              parse_date_range)
+
+
+class FakeSheet:
+    """Worksheet di memori (cukup get_all_records) supaya SheetReader bisa dites tanpa Google."""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def get_all_records(self):
+        return [dict(r) for r in self.rows]
+
+
+def laporan(i, tanggal, alamat="Jl. Contoh, Coblong, Bandung", obyek="rumah"):
+    return {"Tanggal": tanggal, "Pukul": tanggal[11:16] or "00:00", "Nama Pelapor": f"P{i}",
+            "Alamat": alamat, "Obyek": obyek, "Air": 10.0 + i, "Mobil": 1 + i % 3}
+
+
+def reader_for(sheet):
+    reader = SheetReader(sheet=sheet)
+    reader.cache_ttl = 0
+    return reader
+
+
+# === Cursor ===
+def test_cursor_round_trip():
+    for key, rid in [(1.5e18, 7), (-3.25, 0), (float("inf"), 12), (float("-inf"), 3)]:
+        assert _decode_cursor(_encode_cursor(key, rid)) == (key, rid)
+
+
+@pytest.mark.parametrize("cursor", ["", "bukan-base64!", "WzEsMiwzXQ=="])
+def test_cursor_rusak_ditolak(cursor):
+    with pytest.raises(ValueError):
+        _decode_cursor(cursor)
+
+
+def test_halaman_tidak_bergeser_saat_ada_baris_baru():
+    rows = [laporan(i, f"2024-01-{i + 1:02d} 08:00") for i in range(10)]
+    sheet = FakeSheet(rows)
+    reader = reader_for(sheet)
+
+    first = reader.get_page(limit=4)
+    assert [r["Nama Pelapor"] for r in first["rows"]] == ["P9", "P8", "P7", "P6"]
+
+    sheet.rows.append(laporan(99, "2024-02-01 08:00"))   # lebih baru dari semua baris
+    seen = [r["Nama Pelapor"] for r in first["rows"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = reader.get_page(limit=4, cursor=cursor)
+        seen += [r["Nama Pelapor"] for r in page["rows"]]
+        cursor = page["next_cursor"]
+    assert seen == [f"P{i}" for i in range(9, -1, -1)]
+
+
+def test_tanggal_iso_tidak_dibaca_day_first():
+    import pandas as pd
+    s = pd.Series(["2024-01-01 08:00", "2024-02-01 08:00", "13/02/2024 07:30", "2024-03-05T10:00:00.5", None])
+    got = _parse_datetime_series(s)
+    assert got.tolist()[:4] == [pd.Timestamp("2024-01-01 08:00"), pd.Timestamp("2024-02-01 08:00"),
+                                pd.Timestamp("2024-02-13 07:30"), pd.Timestamp("2024-03-05 10:00:00.5")]
+    assert pd.isna(got.iloc[4])
+
+
+# === Listener snapshot ===
+def test_listener_menerima_baris_baru_tanpa_memegang_lock():
+    sheet = FakeSheet([laporan(i, f"2024-01-{i + 1:02d} 08:00") for i in range(3)])
+    reader = reader_for(sheet)
+    events, lock_bebas = [], []
+
+    def listener(new_rows, snapshot, reset):
+        events.append((len(new_rows), len(snapshot), reset))
+        def coba():
+            ok = reader._lock.acquire(timeout=1)
+            if ok:
+                reader._lock.release()
+            lock_bebas.append(ok)
+        t = threading.Thread(target=coba)
+        t.start()
+        t.join()
+
+    reader.subscribe(listener)
+    reader.get_dataframe()
+    sheet.rows.append(laporan(3, "2024-01-04 08:00"))
+    reader.get_dataframe()
+    reader.get_dataframe()   # isi sama -> versi tidak naik, listener tidak dipanggil
+
+    assert events == [(3, 3, True), (1, 4, False)]
+    assert lock_bebas == [True, True]
+    assert reader.version == 2
+
+
+def test_parse_date_range_tanggal_saja_sampai_akhir_hari():
+    import pandas as pd
+    start, end = parse_date_range("2024-01-01", "2024-03-31")
+    assert start == pd.Timestamp("2024-01-01")
+    assert end == pd.Timestamp("2024-04-01")          # eksklusif -> 31 Maret 23:59:59 ikut
+
+
+def test_parse_date_range_dengan_jam_inklusif():
+    import pandas as pd
+    start, end = parse_date_range(None, "2024-03-31T12:00:00")
+    assert start is None
+    assert end == pd.Timestamp("2024-03-31 12:00:00") + pd.Timedelta(microseconds=1)
+    assert parse_date_range("", "  ") == (None, None)
+
+
+@pytest.mark.parametrize("dari, sampai", [
+    ("bukan-tanggal", None),
+    (None, "2024-13-45"),
+    ("2024-03-02", "2024-03-01"),
+])
+def test_parse_date_range_tidak_valid(dari, sampai):
+    with pytest.raises(ValueError):
+        parse_date_range(dari, sampai)
+
+
+# === Shard per tahun ===
+class FakeYearSheet(FakeSheet):
+    def __init__(self, title, rows):
+        super().__init__(rows)
+        self.title = title
+        self.reads = 0
+
+    def get_all_records(self):
+        self.reads += 1
+        return super().get_all_records()
+
+
+class FakeSpreadsheet:
+    def __init__(self, sheets):
+        self.sheets = sheets
+        self.sheet1 = sheets[0]
+
+    def worksheets(self):
+        return list(self.sheets)
+
+
+def test_sheet_tunggal_mengabaikan_gsheet_shards_dari_env(monkeypatch):
+    monkeypatch.setenv("GSHEET_SHARDS", "year")
+    reader = reader_for(FakeSheet([laporan(0, "2024-01-01 08:00")]))
+    assert reader.shard_mode == "" and len(reader.get_dataframe()) == 1
+    with pytest.raises(ValueError):
+        SheetReader(sheet=FakeSheet([]), shards="year")
+
+
+def test_shard_tahun_lalu_dibaca_ulang_setelah_ttl():
+    from datetime import datetime
+    tahun = datetime.now().year
+    lama = FakeYearSheet(str(tahun - 1), [{**laporan(0, f"{tahun - 1}-12-30 08:00"), "Air Realisasi": ""}])
+    kini = FakeYearSheet(str(tahun), [laporan(1, f"{tahun}-01-02 08:00")])
+    reader = SheetReader(spreadsheet=FakeSpreadsheet([lama, kini]), shards="year")
+    reader.cache_ttl = 0
+    assert reader.get_dataframe()["Air Realisasi"].isna().all()
+
+    lama.rows[0]["Air Realisasi"] = 12.5                 # realisasi diisi setelah tahun berganti
+    reader.invalidate()
+    reader.get_dataframe()
+    assert lama.reads == 1                               # masih dalam closed_shard_ttl: dari cache
+    reader.closed_shard_ttl = 0
+    reader.invalidate()
+    df = reader.get_dataframe()
+    assert lama.reads == 2 and df["Air Realisasi"].tolist()[0] == 12.5
@@ -0,0 +1,30 @@
+# test/test_features.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.features import KAWASAN_DEFAULT, fitur_laporan, standarkan
+
+
+def test_fitur_laporan_sama_dengan_isian_submit():
+    row = fitur_laporan("Jl. Dago No.5, Coblong", "  Rumah Tinggal ", 7)
+    assert row == {"lokasi": "Jl. Dago No.5, Coblong", "kawasan": KAWASAN_DEFAULT,
+                   "obyek": "rumah tinggal", "bulan": 7}
+
+
+def test_standarkan_obyek_tidak_dikenal_ke_kategori():
+    features = ["lokasi", "kawasan", "obyek", "obyek_standar", "bulan"]
+    known = {"obyek": {"rumah", "toko"}}
+    row = standarkan(fitur_laporan("x", "Rumah Tinggal", 1), features, known)
+    assert row["obyek"] == "rumah" and row["obyek_standar"] == "rumah"
+
+
+def test_standarkan_obyek_dikenal_tidak_diubah():
+    known = {"obyek": {"rumah tinggal", "rumah"}}
+    row = standarkan(fitur_laporan("x", "Rumah Tinggal", 1), ["obyek"], known)
+    assert row["obyek"] == "rumah tinggal"
+    assert "obyek_standar" not in row
+
+
+def test_standarkan_tetap_unknown_kalau_kategori_juga_tidak_dikenal():
+    row = standarkan(fitur_laporan("x", "Kendaraan", 1), ["obyek"], {"obyek": {"rumah"}})
+    assert row["obyek"] == "kendaraan"
@@ -0,0 +1,92 @@
+# test/test_idempotency.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+
+from core.idempotency import PENDING, IdempotencyIndex
+
+
+HASIL = {"air": 10.5, "mobil": 2, "waktu": "2024-01-01 10:00"}
+
+
+def test_token_ulang_mengembalikan_hasil_tersimpan():
+    idem = IdempotencyIndex(ttl=60)
+    keys = [idem.key_for_token("abc")]
+    assert idem.begin(keys, keys) is None
+    idem.complete(keys, HASIL)
+    assert idem.begin(keys, keys) == HASIL
+
+
+def test_isi_laporan_dinormalisasi():
+    idem = IdempotencyIndex(ttl=60)
+    a = idem.key_for_report("Budi", "Jl. Sukabumi  No.5", "Rumah")
+    b = idem.key_for_report("budi", "jl sukabumi no 5", "rumah")
+    assert a == b
+    assert IdempotencyIndex(content_window=0).key_for_report("budi", "x", "rumah") is None
+
+
+def test_isi_sama_hanya_ditahan_sebentar():
+    # kebakaran kedua dari pelapor & alamat yang sama (token baru) tidak boleh tertelan lama
+    idem = IdempotencyIndex(ttl=600, content_window=30)
+    pertama = [idem.key_for_token("t1"), idem.key_for_report("Budi", "Jl. A", "rumah")]
+    assert idem.begin(pertama, pertama) is None
+    idem.complete(pertama, HASIL)
+
+    kedua = [idem.key_for_token("t2"), idem.key_for_report("Budi", "Jl. A", "rumah")]
+    assert idem.begin(kedua, kedua) == HASIL                  # klik dobel dalam 30 detik
+    idem._entries[kedua[1]]["expires"] = time.time() - 1      # lewat content_window
+    assert idem.begin(kedua, kedua) is None
+    assert idem.begin([pertama[0]], [pertama[0]]) == HASIL    # token lama tetap berlaku `ttl`
+
+
+def test_kunci_isi_kedaluwarsa_lebih_dulu_dari_token():
+    idem = IdempotencyIndex(ttl=600, content_window=30)
+    keys = [idem.key_for_token("t"), idem.key_for_report("Budi", "Jl. A", "rumah")]
+    idem.begin(keys, keys)
+    idem.complete(keys, HASIL)
+    sisa_token = idem._entries[keys[0]]["expires"] - time.time()
+    sisa_isi = idem._entries[keys[1]]["expires"] - time.time()
+    assert 590 < sisa_token <= 600 and 20 < sisa_isi <= 30
+
+
+def test_release_membolehkan_submit_ulang():
+    idem = IdempotencyIndex(ttl=60)
+    keys = [idem.key_for_token("x")]
+    assert idem.begin(keys, keys) is None
+    idem.release(keys)
+    assert idem.begin(keys, keys) is None
+
+
+def test_menunggu_request_yang_sedang_berjalan():
+    idem = IdempotencyIndex(ttl=60, wait_timeout=5)
+    keys = [idem.key_for_token("y")]
+    assert idem.begin(keys, keys) is None
+
+    def selesai():
+        time.sleep(0.05)
+        idem.complete(keys, HASIL)
+
+    threading.Thread(target=selesai).start()
+    assert idem.begin(keys, keys) == HASIL
+
+
+def test_timeout_tidak_memproses_ulang():
+    idem = IdempotencyIndex(ttl=60, wait_timeout=0.05)
+    keys = [idem.key_for_token("z")]
+    assert idem.begin(keys, keys) is None
+    assert idem.begin(keys, keys) is PENDING
+    assert idem.begin(keys, keys) is PENDING
+
+
+def test_kedaluwarsa_dan_persisten(tmp_path):
+    path = str(tmp_path / "idem.json")
+    idem = IdempotencyIndex(path=path, ttl=60)
+    keys = [idem.key_for_token("p")]
+    idem.begin(keys, keys)
+    idem.complete(keys, HASIL)
+    assert IdempotencyIndex(path=path, ttl=60).begin(keys, keys) == HASIL
+
+    idem._entries[keys[0]]["expires"] = time.time() - 1
+    assert idem.begin(keys, keys) is None
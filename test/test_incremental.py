@@ -0,0 +1,80 @@
+# test/test_incremental.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+joblib = pytest.importorskip("joblib")
+pytest.importorskip("sklearn")
+
+from sklearn.ensemble import RandomForestRegressor  # noqa: E402
+from sklearn.preprocessing import OrdinalEncoder  # noqa: E402
+
+from training.incremental import retrain, state_path  # noqa: E402
+
+FEATURES = ["lokasi", "kawasan", "obyek", "bulan"]
+
+
+class FakeReader:
+    def __init__(self, df):
+        self.df = df
+
+    def get_dataframe(self):
+        return self.df.copy()
+
+
+def sheet(n=40):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Waktu_dt": pd.date_range("2024-01-01", periods=n, freq="6h"),
+        "Alamat": [f"Jl. {i % 5}, Coblong" for i in range(n)],
+        "Obyek": ["rumah", "toko"] * (n // 2),
+        "Air": rng.uniform(1, 20, n),                     # prediksi model, bukan target
+        "Mobil": rng.integers(1, 4, n),
+        "Air Realisasi": rng.uniform(1, 20, n),
+        "Mobil Realisasi": rng.integers(1, 4, n).astype(float),
+    })
+
+
+@pytest.fixture
+def bundle_path(tmp_path):
+    X = pd.DataFrame({"lokasi": ["Jl. 0, Coblong", "Jl. 1, Coblong"] * 5, "kawasan": "umum",
+                      "obyek": ["rumah", "toko"] * 5, "bulan": [1] * 10})
+    enc = OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1).fit(X)
+    Xe, y = enc.transform(X), np.arange(10, dtype=float)
+    bundle = {"features": FEATURES, "encoder": enc,
+              "model_air": RandomForestRegressor(n_estimators=3, random_state=0).fit(Xe, y),
+              "model_mobil": RandomForestRegressor(n_estimators=3, random_state=0).fit(Xe, y)}
+    path = str(tmp_path / "bundle.pkl")
+    joblib.dump(bundle, path)
+    return path
+
+
+def test_realisasi_yang_menyusul_tetap_dilatih(bundle_path):
+    df = sheet()
+    df.loc[10:19, ["Air Realisasi", "Mobil Realisasi"]] = np.nan   # belum diisi petugas
+    reader = FakeReader(df)
+    kw = dict(add_trees=2, min_rows=5, tol=100.0)
+
+    first = retrain(bundle_path, reader, **kw)
+    assert first["published"] and first["rows_usable"] == 30 and first["rows_waiting"] == 10
+    with open(state_path(bundle_path), encoding="utf-8") as f:
+        state = json.load(f)
+    assert state["rows_seen"] == 10 and state["consumed"] == list(range(20, 40))
+
+    reader.df = sheet()                                              # realisasi baris 10..19 terisi
+    second = retrain(bundle_path, reader, **kw)
+    assert second["published"] and second["rows_new"] == 10 and second["rows_usable"] == 10
+    with open(state_path(bundle_path), encoding="utf-8") as f:
+        state = json.load(f)
+    assert state["rows_seen"] == 40 and state["consumed"] == []
+
+
+def test_tanpa_kolom_realisasi_gagal(bundle_path):
+    df = sheet().drop(columns=["Air Realisasi"])
+    with pytest.raises(ValueError, match="realisasi"):
+        retrain(bundle_path, FakeReader(df), min_rows=5)
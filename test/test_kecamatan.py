@@ -0,0 +1,73 @@
+# test/test_kecamatan.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import random
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from core.kecamatan import BKTree, KecamatanResolver, levenshtein  # noqa: E402
+
+NAMA = ["Andir", "Bojongloa Kaler", "Bojongloa Kidul", "Buahbatu", "Cicendo", "Coblong",
+        "Kiaracondong", "Lengkong", "Regol", "Sukajadi", "Sumur Bandung"]
+
+
+def test_levenshtein_dan_batas():
+    assert levenshtein("coblong", "coblong", 2) == 0
+    assert levenshtein("cobong", "coblong", 2) == 1
+    assert levenshtein("kitten", "sitting", 5) == 3
+    assert levenshtein("andir", "kiaracondong", 2) == 3   # berhenti lebih awal: limit + 1
+
+
+def test_bktree_sama_dengan_brute_force():
+    rng = random.Random(7)
+    words = {"".join(rng.choice("abcde") for _ in range(rng.randint(3, 8))) for _ in range(300)}
+    tree = BKTree(words)
+    for _ in range(50):
+        q = "".join(rng.choice("abcde") for _ in range(rng.randint(3, 8)))
+        brute = sorted((levenshtein(q, w, 99), w) for w in words if levenshtein(q, w, 99) <= 2)
+        assert tree.search(q, 2) == brute
+
+
+@pytest.mark.parametrize("alamat, kec", [
+    ("Jl. Sukabumi No.5, Kiara Condong, Bandung", "Kiaracondong"),
+    ("Jl. Dago 12", "Coblong"),                                     # alias
+    ("Bojong Loa Kaler", "Bojongloa Kaler"),                       # terpanjang, lintas spasi
+    ("Jl. Andir Raya No 3, Cicendo", "Cicendo"),                   # yang paling kanan menang
+    ("Jl Sukajadl no 2, Bandung", "Sukajadi"),                     # fuzzy 1 salah ketik
+])
+def test_resolve(alamat, kec):
+    assert KecamatanResolver(NAMA).resolve(alamat) == kec
+
+
+@pytest.mark.parametrize("alamat", [
+    "Jl. Pandiran No 3, Kota",        # 'andir' di dalam kata lain
+    "Gg. Lengkongsari, Kota",         # 'lengkong' di dalam nama jalan/kelurahan
+    "Jl. Regolan, Kota",              # fuzzy 'regol' pendek -> tidak boleh salah ketik
+])
+def test_tidak_cocok_di_dalam_kata_lain(alamat):
+    assert KecamatanResolver(NAMA).resolve(alamat) == "Kota"
+
+
+def test_cache_dibuang_kalau_alias_berubah(tmp_path):
+    path = str(tmp_path / "kecamatan.json")
+    r = KecamatanResolver(NAMA, aliases={"dago": "Coblong"}, cache_path=path)
+    assert r.resolve("Jl. Dago 1") == "Coblong"
+    r.save()
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["entries"] == {"Jl. Dago 1": "Coblong"}
+
+    sama = KecamatanResolver(NAMA, aliases={"dago": "Coblong"}, cache_path=path)
+    assert sama._cache == {"Jl. Dago 1": "Coblong"}
+    beda = KecamatanResolver(NAMA, aliases={"dago": "Cicendo"}, cache_path=path)
+    assert beda._cache == {}
+    assert beda.resolve("Jl. Dago 1") == "Cicendo"
+
+
+def test_cache_format_lama_diabaikan(tmp_path):
+    path = tmp_path / "kecamatan.json"
+    path.write_text(json.dumps({"Jl. X": "Andir"}), encoding="utf-8")
+    assert KecamatanResolver(NAMA, cache_path=str(path))._cache == {}
@@ -0,0 +1,158 @@
+# test/test_logger_outbox.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("gspread")
+pytest.importorskip("oauth2client")
+
+from core.logger import GoogleSheetLogger  # noqa: E402
+from core.sheets_quota import SheetsScheduler  # noqa: E402
+
+
+class ServerError(Exception):
+    def __init__(self, status=503):
+        super().__init__(f"HTTP {status}")
+        self.response = type("R", (), {"status_code": status, "headers": {}})()
+
+
+EPOCH = datetime(1899, 12, 30)
+
+
+class FakeWorksheet:
+    """
+    Worksheet di memori yang meniru USER_ENTERED: teks tanggal/jam/angka disimpan sebagai
+    serial number / angka, ditampilkan (FORMATTED_VALUE) sesuai locale sheet.
+    `gagal_setelah_tulis` = append masuk tapi klien menerima 5xx.
+    """
+
+    def __init__(self, rows=(), locale="iso"):
+        self.locale = locale
+        self.rows = [self._ketik(r) for r in rows]
+        self.gagal_setelah_tulis = 0
+        self.lambat = None                  # threading.Event: append menunggu sampai di-set
+
+    @staticmethod
+    def _ketik(row):
+        out = []
+        for c in row:
+            s = str(c)
+            for fmt, nol in (("%Y-%m-%d %H:%M", EPOCH), ("%Y-%m-%d", EPOCH), ("%H:%M", datetime(1900, 1, 1))):
+                try:
+                    out.append((datetime.strptime(s, fmt) - nol).total_seconds() / 86400)
+                    break
+                except ValueError:
+                    pass
+            else:
+                try:
+                    out.append(float(s))
+                except ValueError:
+                    out.append(s)
+        return out
+
+    def _tampil(self, v, kolom):
+        if not isinstance(v, float):
+            return v
+        if kolom == 0:
+            fmt = "%d/%m/%Y %H:%M:%S" if self.locale == "dmy" else "%Y-%m-%d %H:%M:%S"
+            return (EPOCH + timedelta(days=v)).strftime(fmt)
+        if kolom == 1:
+            return (EPOCH + timedelta(days=v)).strftime("%H:%M:%S")
+        return f"{v:g}".replace(".", ",") if self.locale == "dmy" else f"{v:g}"
+
+    def append_rows(self, rows, value_input_option=None):
+        if self.lambat is not None:
+            self.lambat.wait(5)
+        self.rows += [self._ketik(r) for r in rows]
+        if self.gagal_setelah_tulis:
+            self.gagal_setelah_tulis -= 1
+            raise ServerError()
+
+    def append_row(self, row, value_input_option=None):
+        self.append_rows([row], value_input_option)
+
+    def get_all_values(self, value_render_option=None):
+        if value_render_option == "UNFORMATTED_VALUE":
+            return [list(r) for r in self.rows]
+        return [[self._tampil(v, k) for k, v in enumerate(r)] for r in self.rows]
+
+    def nama(self):
+        return [r[2] for r in self.rows]
+
+
+class FakeSpreadsheet:
+    def __init__(self, ws):
+        self.sheet1 = ws
+
+
+def buat_logger(tmp_path, monkeypatch, ws, interval="0.02", **kw):
+    monkeypatch.setenv("FIREAI_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("GSHEET_OUTBOX_INTERVAL", interval)
+    sched = SheetsScheduler(per_minute=100, write_reserve=0, base_delay=0.001, max_delay=0.002)
+    return GoogleSheetLogger("x", spreadsheet=FakeSpreadsheet(ws), scheduler=sched, **kw)
+
+
+def tunggu(cond, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise AssertionError("timeout")
+        time.sleep(0.01)
+
+
+def laporan(nama):
+    return {"tanggal": "2024-05-01 10:15", "jam": "10:15", "nama": nama, "lokasi": "Jl. Dago",
+            "obyek": "rumah", "air": 12.5, "mobil": 2}
+
+
+def test_simpan_laporan_tidak_menunggu_sheet(tmp_path, monkeypatch):
+    ws = FakeWorksheet()
+    ws.lambat = threading.Event()
+    terkirim = []
+    log = buat_logger(tmp_path, monkeypatch, ws, on_terkirim=terkirim.append)
+    t0 = time.monotonic()
+    assert log.simpan_laporan(laporan("A")) is True
+    assert time.monotonic() - t0 < 0.5
+    assert log.outbox_size() == 1 and ws.rows == []
+    ws.lambat.set()
+    tunggu(lambda: log.outbox_size() == 0)
+    assert ws.nama() == ["A"] and terkirim == [1]
+
+
+@pytest.mark.parametrize("locale", ["iso", "dmy"])
+def test_5xx_tidak_menduplikasi_baris(tmp_path, monkeypatch, locale):
+    ws = FakeWorksheet(locale=locale)
+    ws.gagal_setelah_tulis = 1          # kiriman pertama masuk, tapi klien melihat 503
+    log = buat_logger(tmp_path, monkeypatch, ws)
+    log.simpan_laporan(laporan("A"))
+    tunggu(lambda: log.outbox_size() == 0)
+    assert ws.nama() == ["A"]
+
+
+@pytest.mark.parametrize("locale", ["iso", "dmy"])
+def test_outbox_lama_dicek_sebelum_dikirim_ulang(tmp_path, monkeypatch, locale):
+    lama = ["2024-05-01 10:15", "10:15", "A", "Jl. Dago", "rumah", 12.5, 2]
+    ws = FakeWorksheet([lama], locale=locale)                 # tulis sebelumnya ternyata masuk
+    belum = ["2024-05-01 10:20", "10:20", "B", "Jl. Dago", "rumah", 3, 1]
+    with open(tmp_path / "sheets_outbox.jsonl", "w", encoding="utf-8") as f:
+        f.write(json.dumps(lama) + "\n")                     # format outbox lama (list)
+        f.write(json.dumps({"row": belum, "cek": False}) + "\n")
+    log = buat_logger(tmp_path, monkeypatch, ws)
+    tunggu(lambda: log.outbox_size() == 0)
+    assert ws.nama() == ["A", "B"]
+
+
+def test_laporan_berbeda_waktu_tetap_dikirim(tmp_path, monkeypatch):
+    ws = FakeWorksheet([["2024-05-01 10:15", "10:15", "A", "Jl. Dago", "rumah", 12.5, 2]], locale="dmy")
+    beda = {"row": ["2024-05-01 10:16", "10:16", "A", "Jl. Dago", "rumah", 12.5, 2], "cek": True}
+    with open(tmp_path / "sheets_outbox.jsonl", "w", encoding="utf-8") as f:
+        f.write(json.dumps(beda) + "\n")
+    log = buat_logger(tmp_path, monkeypatch, ws)
+    tunggu(lambda: log.outbox_size() == 0)
+    assert ws.nama() == ["A", "A"]
@@ -0,0 +1,71 @@
+# test/test_obyek.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+import string
+
+import pytest
+
+from core.obyek import DEFAULT, KEYWORDS, ObyekNormalizer, normalize_obyek
+
+
+def std_obyek_lama(obyek):
+    """Rantai if std_obyek di cleaning.py sebelum automaton (referensi)."""
+    s = (obyek or "").lower()
+    if any(k in s for k in ["rumah", "kontrakan", "kos", "asrama"]): return "rumah"
+    if any(k in s for k in ["toko", "ruko", "counter", "kios", "cafe", "kafe", "warung", "resto", "kedai"]): return "toko"
+    if any(k in s for k in ["pasar"]): return "pasar"
+    if any(k in s for k in ["pabrik", "industri", "gudang"]): return "pabrik"
+    if any(k in s for k in ["panel listrik", "gardu", "trafo", "kabel listrik", "listrik"]): return "instalasi_listrik"
+    if any(k in s for k in ["kantor", "instansi", "sekolah", "kampus"]): return "kantor"
+    return "lainnya"
+
+
+@pytest.mark.parametrize("teks", [
+    "Rumah Tinggal", "KOS-KOSAN", "Ruko 2 lantai", "Toko di dalam pasar", "Gudang pabrik tekstil",
+    "Gardu listrik", "Kabel Listrik", "Panel listrik kantor", "Kantor kelurahan", "Sekolah dasar",
+    "Warung kopi rumah", "Kendaraan", "", None, "pasar kos",
+])
+def test_sama_dengan_std_obyek_lama(teks):
+    assert normalize_obyek(teks) == std_obyek_lama(teks)
+
+
+def test_acak_sama_dengan_std_obyek_lama():
+    rng = random.Random(3)
+    kws = [k for _, words in KEYWORDS for k in words]
+    norm = ObyekNormalizer(memo_size=0)
+    for _ in range(3000):
+        parts = [rng.choice(kws) if rng.random() < 0.4 else
+                 "".join(rng.choice(string.ascii_lowercase + " ") for _ in range(rng.randint(1, 8)))
+                 for _ in range(rng.randint(1, 4))]
+        teks = "".join(parts) if rng.random() < 0.5 else " ".join(parts).title()
+        assert norm.normalize(teks) == std_obyek_lama(teks), teks
+
+
+def test_kata_kunci_tumpang_tindih_dan_prioritas():
+    # 'he' < 'she' < 'hers': suffix kata kunci lain harus ikut terdeteksi lewat failure link
+    norm = ObyekNormalizer([("a", ["hers"]), ("b", ["she"]), ("c", ["he"])], memo_size=0)
+    assert norm.normalize("ushers") == "a"
+    assert norm.normalize("ushe") == "b"
+    assert norm.normalize("xhe") == "c"
+    assert norm.normalize("xyz") == DEFAULT
+
+
+def test_bukan_string_jadi_default():
+    assert normalize_obyek(float("nan")) == DEFAULT
+    assert normalize_obyek(12) == DEFAULT
+
+
+def test_memo_per_string():
+    norm = ObyekNormalizer()
+    for _ in range(5):
+        norm.normalize("Rumah Tinggal")
+    info = norm.normalize.cache_info()
+    assert info.misses == 1 and info.hits == 4
+
+
+def test_normalize_series():
+    pd = pytest.importorskip("pandas")
+    s = pd.Series(["Rumah", None, "Toko Kue", "Rumah", 5])
+    assert ObyekNormalizer().normalize_series(s).tolist() == ["rumah", DEFAULT, "toko", "rumah", DEFAULT]
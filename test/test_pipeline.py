@@ -0,0 +1,31 @@
+# test/test_pipeline.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+
+from training.pipeline import fit_all  # noqa: E402
+
+RF = {"name": "rf", "type": "RandomForestRegressor", "params": {"n_estimators": 3, "n_jobs": -1}}
+
+
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 5, size=(40, 3)).astype(float)
+    return X, {"air": rng.uniform(1, 10, 40), "mobil": rng.integers(1, 4, 40).astype(float)}
+
+
+def test_baseline_berurutan_memaksa_n_jobs_internal_1():
+    X, y = data()
+    models, _, _ = fit_all([RF], X, y, jobs=1, inner_jobs=1)
+    assert {m.n_jobs for m in models.values()} == {1}
+
+
+def test_n_jobs_config_dipakai_tanpa_paksaan():
+    X, y = data()
+    models, _, _ = fit_all([RF], X, y, jobs=1)
+    assert {m.n_jobs for m in models.values()} == {-1}
@@ -39,7 +39,13 @@ else:
     }
 
 
-    berhasil = logger.simpan_laporan(data_laporan)
+    logger.simpan_laporan(data_laporan)   # masuk outbox; kirim sekarang, jangan tunggu thread latar
+    try:
+        logger.kirim_outbox()
+        berhasil = logger.outbox_size() == 0
+    except Exception as e:
+        print(" Gagal mengirim outbox:", e)
+        berhasil = False
     if berhasil:
         print(f"✅ Prediksi: {hasil['air']} m³, {hasil['mobil']} mobil. Data berhasil dicatat.")
     else:
@@ -0,0 +1,146 @@
+# test/test_rollups.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("numpy")
+
+from core.rollups import DemandIndex, HeatmapIndex  # noqa: E402
+
+
+def frame(rows):
+    """rows: (waktu, kecamatan, obyek, kategori, air, mobil)"""
+    df = pd.DataFrame(rows, columns=["Waktu", "Kecamatan", "Obyek", "Kategori", "Air", "Mobil"])
+    df["Waktu_dt"] = pd.to_datetime(df["Waktu"])
+    return df
+
+
+ROWS = [
+    ("2024-01-01 08:10", "Coblong", "Rumah Tinggal", "rumah", 10.0, 2),   # Senin 08
+    ("2024-01-01 08:50", "Coblong", "rumah", "rumah", 20.0, 4),           # Senin 08
+    ("2024-01-02 13:00", "Andir", "Toko Kelontong", "toko", 5.5, 1),      # Selasa 13
+    ("2024-01-07 23:00", "Andir", "lahan kosong", "lainnya", None, None), # Minggu 23
+]
+
+
+def test_heatmap_hitung_dan_rata_rata():
+    hm = HeatmapIndex()
+    df = frame(ROWS)
+    hm.on_snapshot(df, df, True)
+    q = hm.query()
+    assert q["total"] == 4
+    assert q["count"][0][8] == 2 and q["count"][1][13] == 1 and q["count"][6][23] == 1
+    assert q["avg_air"][0][8] == 15.0 and q["avg_mobil"][0][8] == 3.0
+    assert q["avg_air"][6][23] is None
+
+
+def test_heatmap_inkremental_sama_dengan_sekaligus():
+    df = frame(ROWS)
+    sekaligus, bertahap = HeatmapIndex(), HeatmapIndex()
+    sekaligus.on_snapshot(df, df, True)
+    bertahap.on_snapshot(df.iloc[:2], df.iloc[:2], True)
+    bertahap.on_snapshot(df.iloc[2:], df, False)
+    assert sekaligus.query() == bertahap.query()
+
+
+def test_heatmap_filter_obyek_seperti_apply_filters():
+    hm = HeatmapIndex()
+    df = frame(ROWS)
+    hm.on_snapshot(df, df, True)
+    # kategori standar mengambil semua variasi teks asli
+    assert hm.query(obyek="rumah")["total"] == 2
+    assert hm.query(obyek="toko", kecamatan="andir")["total"] == 1
+    assert hm.query(obyek="toko", kecamatan="coblong")["total"] == 0
+    # teks asli bebas tidak ada di sel -> dihitung dari snapshot yang difilter seperti _apply_filters
+    assert not hm.covers("Rumah Tinggal")
+    with pytest.raises(ValueError):
+        hm.query(obyek="Rumah Tinggal")
+    pytest.importorskip("gspread")
+    from core.data_source import SheetReader
+    sub = SheetReader._apply_filters(df, obyek="Rumah Tinggal")
+    assert HeatmapIndex.from_frame(sub).query()["total"] == 1
+
+
+def test_heatmap_sel_terbatas_walau_obyek_banyak_variasi():
+    rows = [("2024-01-01 08:00", ["Coblong", "Andir"][i % 2], f"rumah tinggal no {i}", "rumah", 1.0, 1)
+            for i in range(200)]
+    hm = HeatmapIndex()
+    df = frame(rows)
+    hm.on_snapshot(df, df, True)
+    assert len(hm._cells) == 2
+    assert hm.query(obyek="rumah")["total"] == 200
+
+
+def acak(n=400, seed=5):
+    import random
+    rng = random.Random(seed)
+    awal = pd.Timestamp("2024-03-01")
+    rows = []
+    for _ in range(n):
+        t = awal + pd.Timedelta(minutes=rng.randint(0, 40 * 24 * 60))
+        air = None if rng.random() < 0.1 else round(rng.uniform(1, 50), 2)
+        rows.append((str(t), rng.choice(["Coblong", "Andir", "Regol"]), "rumah", "rumah",
+                     air, rng.randint(1, 5)))
+    return frame(rows)
+
+
+def brute(df, at, w, kec):
+    at = pd.Timestamp(at)
+    d = df[(df["Kecamatan"] == kec) & (df["Waktu_dt"] > at - pd.Timedelta(w)) & (df["Waktu_dt"] <= at)]
+    return len(d), round(d["Air"].sum(), 2), int(d["Mobil"].sum())
+
+
+def test_demand_jendela_sama_dengan_brute_force():
+    df = acak()
+    idx = DemandIndex()
+    idx.on_snapshot(df, df, True)
+    for at in ("2024-03-10 12:00", "2024-04-05", "2024-03-01 00:00"):
+        q = idx.query("24h,7d,30d", at=at)
+        for kec in ("Coblong", "Andir", "Regol"):
+            for w in ("24h", "7d", "30d"):
+                got = q["kecamatan"][kec][w]
+                assert (got["count"], got["air_sum"], got["mobil_sum"]) == brute(df, at, w, kec)
+
+
+def test_demand_inkremental_dan_susulan_sama_dengan_sekaligus():
+    df = acak().sort_values("Waktu_dt").reset_index(drop=True)
+    sekaligus = DemandIndex()
+    sekaligus.on_snapshot(df, df, True)
+    bertahap = DemandIndex()
+    bertahap.on_snapshot(df.iloc[:300], df.iloc[:300], True)
+    bertahap.on_snapshot(df.iloc[300:], df, False)          # append di belakang
+    susulan = DemandIndex()
+    susulan.on_snapshot(df.iloc[100:], df.iloc[100:], True)
+    susulan.on_snapshot(df.iloc[:100], df, False)           # lebih lama -> disusun ulang
+    for at in ("2024-03-15", "2024-04-10"):
+        expected = sekaligus.query("1d,7d,30d", at=at)
+        assert bertahap.query("1d,7d,30d", at=at) == expected
+        assert susulan.query("1d,7d,30d", at=at) == expected
+
+
+def test_demand_batas_jendela_dan_filter_kecamatan():
+    df = frame([
+        ("2024-01-01 00:00", "Coblong", "rumah", "rumah", 10.0, 2),
+        ("2024-01-02 00:00", "Coblong", "rumah", "rumah", 20.0, 4),
+        ("2024-01-02 00:00", "Andir", "toko", "toko", None, 1),
+    ])
+    idx = DemandIndex()
+    idx.on_snapshot(df, df, True)
+    q = idx.query("24h", kecamatan="coblong", at="2024-01-02 00:00")
+    assert list(q["kecamatan"]) == ["Coblong"]
+    c = q["kecamatan"]["Coblong"]["24h"]                    # (at - 24h, at]: 1 Jan 00:00 tidak ikut
+    assert c["count"] == 1 and c["air_sum"] == 20.0 and c["avg_mobil"] == 4.0
+    assert idx.query("24h", kecamatan="andir", at="2024-01-02")["kecamatan"]["Andir"]["24h"]["avg_air"] is None
+
+
+def test_parse_windows_default():
+    assert [w for w, _ in DemandIndex.parse_windows("")] == list(DemandIndex.DEFAULT_WINDOWS)
+    assert DemandIndex.parse_windows(" 24h , 7d") == [("24h", 86_400 * 10**9), ("7d", 7 * 86_400 * 10**9)]
+
+
+@pytest.mark.parametrize("spec", ["abc", "-1d", "0h", ",".join(["1d"] * 9)])
+def test_parse_windows_tidak_valid(spec):
+    with pytest.raises(ValueError):
+        DemandIndex.parse_windows(spec)
@@ -0,0 +1,51 @@
+# test/test_services.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+
+import pytest
+
+from core.services import LazyService
+
+
+def gagal_lalu_ok(n):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) <= n:
+            raise ConnectionError("sheet tidak terjangkau")
+        return "ok"
+    return factory, calls
+
+
+def test_gagal_dicoba_lagi_setelah_backoff():
+    factory, calls = gagal_lalu_ok(1)
+    svc = LazyService("x", factory, retry_backoff=0.05)
+    with pytest.raises(RuntimeError, match="tidak terjangkau"):
+        svc.get()
+    assert svc.error.startswith("ConnectionError") and not svc.ready
+    with pytest.raises(RuntimeError):                 # masih dalam jeda: error lama, factory tidak dipanggil
+        svc.get()
+    assert len(calls) == 1 and 0 < svc.retry_in <= 0.05
+
+    time.sleep(0.06)
+    assert svc.get() == "ok"
+    assert len(calls) == 2 and svc.error is None and svc.ready and svc.retry_in is None
+
+
+def test_start_mencoba_lagi_di_latar_dan_backoff_dobel():
+    factory, calls = gagal_lalu_ok(2)
+    svc = LazyService("x", factory, retry_backoff=0.05, max_backoff=0.08)
+    svc.wait_ready(1)
+    assert svc.error and svc.retry_in <= 0.05
+
+    time.sleep(0.06)
+    svc.wait_ready(1)                                 # percobaan ke-2 juga gagal -> jeda dobel (dibatasi)
+    assert len(calls) == 2 and svc.error and 0.05 < svc.retry_in <= 0.08
+    svc.start()
+    assert len(calls) == 2
+
+    time.sleep(0.09)
+    assert svc.wait_ready(1) and svc.ready and len(calls) == 3
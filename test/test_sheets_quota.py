@@ -0,0 +1,126 @@
+# test/test_sheets_quota.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+
+import pytest
+
+from core.sheets_quota import QuotaExhausted, SheetsScheduler, may_have_applied
+
+
+class Resp:
+    def __init__(self, status, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+
+
+class APIError(Exception):
+    """Tiruan gspread.exceptions.APIError (cukup atribut `response`)."""
+
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.response = Resp(status, headers)
+
+
+def gagal_lalu_ok(*errors):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+    return fn, calls
+
+
+def sched(**kw):
+    kw.setdefault("per_minute", 10)
+    kw.setdefault("write_reserve", 2)
+    return SheetsScheduler(base_delay=0.001, max_delay=0.002, **kw)
+
+
+def test_baca_ditolak_saat_cadangan_tulis():
+    s = sched()
+    for _ in range(8):
+        s.call(lambda: None, kind="read")
+    with pytest.raises(QuotaExhausted):
+        s.call(lambda: None, kind="read")
+    # 2 slot terakhir tetap untuk tulis
+    s.call(lambda: None, kind="write")
+    s.call(lambda: None, kind="write")
+    assert s.stats()["reads_rejected"] == 1 and s.stats()["used_last_minute"] == 10
+
+
+def test_tulis_menunggu_budget_sampai_max_wait():
+    s = sched(per_minute=2, write_reserve=0, max_wait=0.05)
+    s.call(lambda: None, kind="write")
+    s.call(lambda: None, kind="write")
+    t0 = time.monotonic()
+    with pytest.raises(QuotaExhausted):
+        s.call(lambda: None, kind="write")
+    assert time.monotonic() - t0 < 1.0           # jendela 60 detik > max_wait -> langsung menyerah
+    assert s.stats()["writes_timed_out"] == 1
+
+
+def test_baca_ditolak_selama_ada_tulis_menunggu():
+    s = sched(per_minute=3, write_reserve=0, max_wait=5)
+    s._cooldown_until = time.monotonic() + 0.3   # tulis harus menunggu cooldown
+    t = threading.Thread(target=s.call, args=(lambda: None,), kwargs={"kind": "write"})
+    t.start()
+    deadline = time.monotonic() + 1
+    while not s.stats()["writers_waiting"] and time.monotonic() < deadline:
+        time.sleep(0.005)
+    with pytest.raises(QuotaExhausted):
+        s.call(lambda: None, kind="read")
+    t.join()
+    assert s.stats()["write"] == 1
+
+
+def test_429_diulang_dan_pasang_cooldown():
+    s = sched()
+    fn, calls = gagal_lalu_ok(APIError(429), APIError(429))
+    assert s.call(fn, kind="write") == "ok"
+    st = s.stats()
+    assert len(calls) == 3 and st["throttled"] == 2 and st["retries"] == 2 and st["ok"] == 1
+
+
+def test_baca_5xx_dan_jaringan_diulang_sampai_batas():
+    s = sched(read_retries=2)
+    fn, calls = gagal_lalu_ok(APIError(503), ConnectionError("putus"))
+    assert s.call(fn, kind="read") == "ok"
+    fn, calls = gagal_lalu_ok(*[APIError(500)] * 5)
+    with pytest.raises(APIError):
+        s.call(fn, kind="read")
+    assert len(calls) == 3                        # 1 + read_retries
+    assert s.stats()["failed"] == 1
+
+
+@pytest.mark.parametrize("err", [APIError(500), APIError(503), ConnectionError("putus"), TimeoutError()])
+def test_tulis_tidak_diulang_kalau_mungkin_sudah_masuk(err):
+    s = sched()
+    fn, calls = gagal_lalu_ok(err)
+    with pytest.raises(type(err)):
+        s.call(fn, kind="write")
+    assert len(calls) == 1
+    assert may_have_applied(err)
+
+
+def test_error_klien_tidak_diulang():
+    s = sched()
+    fn, calls = gagal_lalu_ok(APIError(400))
+    with pytest.raises(APIError):
+        s.call(fn, kind="read")
+    assert len(calls) == 1
+    assert not may_have_applied(APIError(400)) and not may_have_applied(APIError(429))
+    assert not may_have_applied(ValueError("x"))
+
+
+def test_backoff_eksponensial_dan_retry_after():
+    s = SheetsScheduler(per_minute=10, write_reserve=0, base_delay=1.0, max_delay=8.0)
+    for attempt, cap in [(0, 1.0), (1, 2.0), (2, 4.0), (5, 8.0)]:
+        d = s._backoff(attempt, APIError(429))
+        assert cap / 2 <= d <= cap
+    assert s._backoff(0, APIError(429, {"Retry-After": "20"})) == 20.0
+    assert s._backoff(0, APIError(429, {"Retry-After": "nanti"})) <= 1.0
@@ -0,0 +1,54 @@
+# test/test_split.py
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from tools.split import split_memory, split_stream  # noqa: E402
+
+
+@pytest.fixture
+def csv(tmp_path):
+    # 'lokasi' numerik di awal file lalu teks: tebakan dtype per chunk akan berbeda
+    rows = [{"lokasi": str(i % 12), "kawasan": f"k{i % 3}", "obyek": ["rumah", "toko ", "pasar"][i % 3],
+             "air": float(i % 7) * 1.5, "mobil": i % 4 + 1} for i in range(300)]
+    rows += [{"lokasi": f"Jl. {i}", "kawasan": "k1", "obyek": "rumah", "air": 3, "mobil": 2} for i in range(100)]
+    path = tmp_path / "data.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def load(out, part):
+    return {c: np.load(f"{out}/encoded/{part}/{c}.npy") for c in ("lokasi", "kawasan", "obyek", "air", "mobil")}
+
+
+def test_split_stream_tidak_tergantung_chunksize(csv, tmp_path):
+    a, b = tmp_path / "a", tmp_path / "b"
+    na = split_stream(csv, str(a), chunksize=7)
+    nb = split_stream(csv, str(b), chunksize=1000)
+    assert na == nb
+    for part in ("train", "test"):
+        xa, xb = load(a, part), load(b, part)
+        for c in xa:
+            assert np.array_equal(xa[c], xb[c])
+
+
+def test_urutan_kategori_sama_dengan_ordinal_encoder(csv, tmp_path):
+    # kategori stream (dari train-nya sendiri) harus berurutan seperti OrdinalEncoder pada string
+    mem, stream = tmp_path / "mem", tmp_path / "stream"
+    split_memory(csv, str(mem))
+    split_stream(csv, str(stream))
+    with open(f"{stream}/ordinal_categories_mapping.json", encoding="utf-8") as f:
+        cats_stream = json.load(f)
+    with open(f"{mem}/ordinal_categories_mapping.json", encoding="utf-8") as f:
+        cats_mem = json.load(f)
+    for col in cats_stream:
+        assert cats_stream[col] == sorted(cats_stream[col])
+        assert cats_mem[col] == sorted(cats_mem[col])
+    assert "toko" in cats_stream["obyek"] and "toko " not in cats_stream["obyek"]
@@ -0,0 +1,73 @@
+# tools/bench_dashboard.py
+"""
+Ukur TTFB & byte terkirim dashboard/API pada arsip sintetis besar,
+sebelum (render biasa, tanpa kompresi) vs sesudah (streaming + gzip/brotli).
+
+Contoh:
+  python tools/bench_dashboard.py --rows 200000
+"""
+import argparse, json, os, sys, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import main  # noqa: E402
+from core.services import LazyService  # noqa: E402
+from synthetic_sheet import SyntheticSheet  # noqa: E402
+
+PATHS = ["/", "/api/stats?period=month", "/api/stats?period=day&from=2024-01-01&to=2024-01-31",
+         "/api/stats/pivot?rows=kecamatan&cols=month&sums=air,mobil",
+         "/api/laporan?limit=500", "/api/heatmap", "/api/demand?windows=24h,7d,30d"]
+
+def measure(client, path, repeat):
+    ttfb, total, size = [], [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        resp = client.get(path, headers={"Accept-Encoding": "gzip, br"}, buffered=False)
+        it = iter(resp.response)
+        first = next(it, b"")
+        ttfb.append(time.perf_counter() - t0)
+        size = len(first) + sum(len(c) for c in it)
+        total.append(time.perf_counter() - t0)
+        resp.close()
+    return {
+        "ttfb_ms": round(min(ttfb) * 1000, 2),
+        "total_ms": round(min(total) * 1000, 2),
+        "bytes": size,
+        "encoding": resp.headers.get("Content-Encoding", "identity"),
+    }
+
+def main_bench():
+    ap = argparse.ArgumentParser(description="Benchmark TTFB & ukuran respons dashboard.")
+    ap.add_argument("--rows", type=int, default=100_000, help="Jumlah baris arsip sintetis.")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", help="Simpan hasil ke JSON.")
+    args = ap.parse_args()
+
+    sheet = SyntheticSheet(args.rows)
+    main.start_services = lambda: None   # jangan sentuh Google/Twilio/model saat benchmark
+    main.sr = LazyService("sheet_reader", lambda: main._buat_sheet_reader(sheet=sheet),
+                          warmup=lambda reader: reader.get_dataframe())
+    t0 = time.perf_counter()
+    main.sr.wait_ready()
+    print(f"Arsip sintetis {args.rows} baris dimuat dalam {time.perf_counter() - t0:.1f} s")
+
+    results = {}
+    for label, stream, compress in [("sebelum", False, False), ("sesudah", True, True)]:
+        main.app.config["DASHBOARD_STREAMING"] = stream
+        main.app.config["COMPRESS_RESPONSES"] = compress
+        client = main.app.test_client()
+        results[label] = {p: measure(client, p, args.repeat) for p in PATHS}
+
+    print(f"{'path':<62}{'TTFB ms':>18}{'bytes':>22}")
+    for p in PATHS:
+        a, b = results["sebelum"][p], results["sesudah"][p]
+        print(f"{p:<62}{a['ttfb_ms']:>8} -> {b['ttfb_ms']:<8}{a['bytes']:>10} -> {b['bytes']:<10}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"rows": args.rows, **results}, f, indent=2)
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,227 @@
+# tools/bench_model.py
+"""
+Benchmark bundle model di model/: waktu load, memori resident, ukuran file,
+latensi prediksi 1 baris & batch (p50/p99), throughput, dan akurasi (MAE/MSE/R²).
+Hasilnya ditulis ke report JSON; grafik evaluasi (evaluasi/grafik_evaluasi.py) dibuat dari report ini.
+
+Setiap bundle diukur di proses baru supaya angka memori tidak tercampur bundle lain.
+Akurasi dihitung bila ada config di training/configs/ yang `bundle`-nya menunjuk file tsb
+(split test sama dengan pipeline: random_state & test_size dari config).
+
+Contoh:
+  python tools/bench_model.py                                     # semua model/*.pkl
+  python tools/bench_model.py --bundle model/trained_model_real.pkl --out model/benchmark_report.json
+  python tools/bench_model.py --baseline model/benchmark_baseline.json   # gate regresi (exit 1)
+"""
+import argparse, glob, json, os, platform, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+DEFAULT_REPORT = "model/benchmark_report.json"
+CONFIG_DIR = "training/configs"
+
+# metrik yang dijaga gate regresi (lebih besar = lebih buruk)
+GATED = ("load_s", "rss_mb", "size_mb", "single_p50_ms", "single_p99_ms", "batch_p50_ms", "batch_p99_ms")
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return kb / 1024 if sys.platform != "darwin" else kb / 2**20
+
+def _pair(a, m):
+    return (lambda X: (a.predict(X), m.predict(X))), [a, m]
+
+def _joint(model, targets):
+    ia, im = targets.index("air"), targets.index("mobil")
+    def predict(X):
+        p = model.predict(X)
+        return p[:, ia], p[:, im]
+    return predict, [model]
+
+def variants(bundle: dict) -> dict:
+    """
+    {label: (fn(X) -> (pred_air, pred_mobil), [model])} untuk semua varian dalam bundle:
+    pasangan model_air/model_mobil(_<nama>) dan model multi-output model(_<nama>).
+    """
+    out, targets = {}, bundle.get("targets", ["air", "mobil"])
+    if "model_air" in bundle and "model_mobil" in bundle:
+        out["default"] = _pair(bundle["model_air"], bundle["model_mobil"])
+    if "model" in bundle:
+        out["default" if "default" not in out else "multi"] = _joint(bundle["model"], targets)
+    for key in bundle:
+        if key.startswith("model_air_") and f"model_mobil_{key[10:]}" in bundle:
+            out[key[10:]] = _pair(bundle[key], bundle[f"model_mobil_{key[10:]}"])
+        elif key.startswith("model_") and not key.startswith(("model_air", "model_mobil")):
+            out[key[6:]] = _joint(bundle[key], targets)
+    return out
+
+def find_config(bundle_path: str):
+    target = os.path.normpath(bundle_path)
+    for path in sorted(glob.glob(os.path.join(CONFIG_DIR, "*.json"))):
+        try:
+            cfg = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        if cfg.get("bundle") and os.path.normpath(cfg["bundle"]) == target:
+            return path
+    return None
+
+def test_rows(cfg: dict, features: list):
+    """Baris test mentah (sebelum encode) dengan split yang sama seperti training/pipeline.py."""
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    cfg = {"test_size": 0.2, "random_state": 42, "dropna": "all", **cfg}
+    tcols = cfg["targets"]
+    df = pd.read_csv(cfg["csv"])
+    df = df[list(cfg["features"]) + [tcols["air"], tcols["mobil"]]].copy()
+    for t in ("air", "mobil"):
+        df[tcols[t]] = pd.to_numeric(df[tcols[t]], errors="coerce")
+    subset = [tcols["air"], tcols["mobil"]] if cfg["dropna"] == "targets" else None
+    df = df.dropna(subset=subset)
+    _, test = train_test_split(df, test_size=cfg["test_size"], random_state=cfg["random_state"])
+    return test[features], {t: test[tcols[t]].to_numpy(dtype=float) for t in ("air", "mobil")}
+
+def _pct(samples_s):
+    a = np.asarray(samples_s) * 1000.0
+    return round(float(np.percentile(a, 50)), 4), round(float(np.percentile(a, 99)), 4)
+
+def measure(bundle_path: str, config_path, repeat: int, batch: int) -> dict:
+    """Dijalankan di proses terpisah (spawn)."""
+    import joblib, pickle
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    rss0 = rss_mb()
+    t0 = time.perf_counter()
+    bundle = joblib.load(bundle_path)
+    load_s = time.perf_counter() - t0
+    rss_load = rss_mb() - rss0
+
+    features, encoder = bundle["features"], bundle["encoder"]
+    cfg = json.loads(Path(config_path).read_text(encoding="utf-8")) if config_path else None
+    if cfg:
+        raw, y_true = test_rows(cfg, features)
+    else:
+        # tanpa data: pakai kombinasi kategori dari encoder
+        import pandas as pd
+        rng = np.random.default_rng(0)
+        raw = pd.DataFrame({f: rng.choice(c, size=max(batch, 100)) for f, c in zip(features, encoder.categories_)})
+        y_true = None
+    X = encoder.transform(raw)
+    Xb = np.resize(X, (batch, X.shape[1]))
+
+    result = {
+        "bundle": bundle_path, "config": config_path,
+        "size_mb": round(os.path.getsize(bundle_path) / 2**20, 3),
+        "load_s": round(load_s, 4), "rss_mb": round(rss_load, 2),
+        "n_test": int(X.shape[0]) if y_true else None, "variants": {},
+    }
+    for label, (predict, models) in variants(bundle).items():
+        predict(X[:1])  # pemanasan
+        single = []
+        for i in range(repeat):
+            row = raw.iloc[[i % len(raw)]]
+            t0 = time.perf_counter()
+            predict(encoder.transform(row))   # jalur sama dengan FirePredictor.predict
+            single.append(time.perf_counter() - t0)
+        batched = []
+        for _ in range(max(3, repeat // 20)):
+            t0 = time.perf_counter()
+            predict(Xb)
+            batched.append(time.perf_counter() - t0)
+
+        s50, s99 = _pct(single)
+        b50, b99 = _pct(batched)
+        v = {"n_models": len(models), "model_mb": round(len(pickle.dumps(models)) / 2**20, 3),
+             "single_p50_ms": s50, "single_p99_ms": s99, "batch_size": batch,
+             "batch_p50_ms": b50, "batch_p99_ms": b99,
+             "throughput_rows_s": round(batch / (b50 / 1000.0), 1) if b50 else None}
+        if y_true:
+            pa, pm = predict(X)
+            for t, p in (("air", pa), ("mobil", pm)):
+                v[f"MAE_{t}"] = round(float(mean_absolute_error(y_true[t], p)), 3)
+                v[f"MSE_{t}"] = round(float(mean_squared_error(y_true[t], p)), 3)
+                v[f"R2_{t}"] = round(float(r2_score(y_true[t], p)), 3)
+        result["variants"][label] = v
+    return result
+
+def gate(report: dict, baseline: dict, max_slowdown: float, max_growth: float) -> list:
+    """Daftar pelanggaran: metrik yang naik melebihi faktor dibanding baseline."""
+    issues = []
+    for name, cur in report["bundles"].items():
+        base = baseline.get("bundles", {}).get(name)
+        if not base:
+            continue
+        pairs = [(k, cur.get(k), base.get(k)) for k in ("load_s", "rss_mb", "size_mb")]
+        for label, v in cur.get("variants", {}).items():
+            bv = base.get("variants", {}).get(label, {})
+            pairs += [(f"{label}.{k}", v.get(k), bv.get(k))
+                      for k in GATED + ("model_mb",) if k.startswith(("single", "batch", "model"))]
+        for key, now, before in pairs:
+            if now is None or not before:
+                continue
+            limit = max_growth if key.endswith(("rss_mb", "size_mb", "model_mb")) else max_slowdown
+            if now > before * limit:
+                issues.append(f"{name}: {key} {before} -> {now} (> {limit}x)")
+    return issues
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark bundle model: latensi, memori, ukuran, akurasi.")
+    ap.add_argument("--bundle", action="append", help="Path bundle .pkl (boleh berulang; default model/*.pkl).")
+    ap.add_argument("--repeat", type=int, default=200, help="Jumlah prediksi 1 baris per varian.")
+    ap.add_argument("--batch", type=int, default=1000, help="Ukuran batch untuk latensi batch/throughput.")
+    ap.add_argument("--out", default=DEFAULT_REPORT)
+    ap.add_argument("--baseline", help="Report lama untuk gate regresi.")
+    ap.add_argument("--max-slowdown", type=float, default=1.2, help="Batas rasio latensi/load vs baseline.")
+    ap.add_argument("--max-growth", type=float, default=1.2, help="Batas rasio ukuran/memori vs baseline.")
+    args = ap.parse_args()
+
+    bundles = args.bundle or sorted(glob.glob("model/**/*.pkl", recursive=True))
+    if not bundles:
+        print("⚠️ Tidak ada bundle .pkl di model/", file=sys.stderr)
+        sys.exit(2)
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "env": {"python": platform.python_version(), "machine": platform.machine(), "cpu": os.cpu_count()},
+        "bundles": {},
+    }
+    ctx = get_context("spawn")
+    for path in bundles:
+        cfg = find_config(path)
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            try:
+                res = pool.submit(measure, path, cfg, args.repeat, args.batch).result()
+            except Exception as e:
+                print(f" Gagal benchmark {path}: {e}")
+                continue
+        report["bundles"][Path(path).stem] = res
+        for label, v in res["variants"].items():
+            acc = f"  R2 air {v['R2_air']} / mobil {v['R2_mobil']}" if "R2_air" in v else ""
+            print(f"{Path(path).stem}[{label}]: load {res['load_s']} s, {res['size_mb']} MB, "
+                  f"1 baris p50 {v['single_p50_ms']} ms, batch {v['throughput_rows_s']} baris/s{acc}")
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"✅ Report tersimpan di {args.out}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        issues = gate(report, baseline, args.max_slowdown, args.max_growth)
+        for msg in issues:
+            print(f"❌ Regresi: {msg}")
+        if issues:
+            sys.exit(1)
+        print("✅ Tidak ada regresi terhadap baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# tools/bench_obyek.py
+"""
+Throughput standarisasi obyek: scan kata kunci naif (rantai any(k in s ...), seperti
+std_obyek lama) vs automaton core/obyek.py, dengan dan tanpa memo, untuk tabel
+kata kunci asli dan tabel sintetis besar.
+
+Contoh:
+  python tools/bench_obyek.py --texts 200000 --categories 200 --keywords 20
+"""
+import argparse, json, os, random, string, sys, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from core.obyek import KEYWORDS, ObyekNormalizer  # noqa: E402
+
+def naive(table):
+    table = [(cat, [k.lower() for k in words]) for cat, words in table]
+    def fn(text):
+        s = (text or "").lower()
+        for cat, words in table:
+            if any(k in s for k in words):
+                return cat
+        return "lainnya"
+    return fn
+
+def synthetic_table(rng, n_cat, n_kw):
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+    table = [(cat, list(words)) for cat, words in KEYWORDS]
+    for i in range(n_cat):
+        table.append((f"kategori_{i}", [word() for _ in range(n_kw)]))
+    return table
+
+def texts_for(rng, table, n, distinct):
+    kws = [k for _, words in table for k in words]
+    pool = []
+    for _ in range(distinct):
+        parts = [rng.choice(kws) if rng.random() < 0.5 else "".join(rng.choice(string.ascii_lowercase)
+                 for _ in range(rng.randint(3, 8))) for _ in range(rng.randint(1, 5))]
+        pool.append(" ".join(parts).title())
+    return [rng.choice(pool) for _ in range(n)]
+
+def bench(fn, texts):
+    t0 = time.perf_counter()
+    for t in texts:
+        fn(t)
+    dt = time.perf_counter() - t0
+    return {"seconds": round(dt, 4), "texts_per_s": round(len(texts) / dt, 1)}
+
+def run_case(name, table, texts):
+    ref = naive(table)
+    fresh = ObyekNormalizer(table, memo_size=0)
+    memo = ObyekNormalizer(table)
+    mismatch = sum(ref(t) != fresh.normalize(t) for t in texts[:5000])
+    res = {
+        "keywords": sum(len(w) for _, w in table),
+        "naive": bench(ref, texts),
+        "automaton": bench(fresh.normalize, texts),
+        "automaton_memo": bench(memo.normalize, texts),
+        "mismatch_first_5000": mismatch,
+    }
+    print(f"{name:<10} {res['keywords']:>7} kata kunci | naif {res['naive']['texts_per_s']:>12} teks/s | "
+          f"automaton {res['automaton']['texts_per_s']:>12} | +memo {res['automaton_memo']['texts_per_s']:>12}"
+          + ("" if mismatch == 0 else f" | ⚠️ {mismatch} hasil beda"))
+    return res
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark standarisasi obyek (naif vs automaton).")
+    ap.add_argument("--texts", type=int, default=100_000)
+    ap.add_argument("--distinct", type=int, default=5_000, help="Jumlah teks unik (sisanya berulang).")
+    ap.add_argument("--categories", type=int, default=200, help="Kategori sintetis tambahan.")
+    ap.add_argument("--keywords", type=int, default=20, help="Kata kunci per kategori sintetis.")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out")
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    big = synthetic_table(rng, args.categories, args.keywords)
+    results = {
+        "asli": run_case("asli", KEYWORDS, texts_for(rng, KEYWORDS, args.texts, args.distinct)),
+        "sintetis": run_case("sintetis", big, texts_for(rng, big, args.texts, args.distinct)),
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
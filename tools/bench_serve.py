@@ -0,0 +1,100 @@
+# tools/bench_serve.py
+"""
+Load test sederhana untuk membandingkan server dev Flask vs mode prod (waitress).
+
+Contoh:
+  python main.py --headless --server dev            # terminal 1
+  python tools/bench_serve.py --out bench_dev.json  # terminal 2
+  python main.py --headless --server prod --threads 16
+  python tools/bench_serve.py --out bench_prod.json
+  python tools/bench_serve.py --compare bench_dev.json bench_prod.json
+"""
+import argparse, json, sys, threading, time
+from pathlib import Path
+
+import numpy as np
+import requests
+
+DEFAULT_PATHS = ["/api/stats?period=month", "/api/laporan?limit=50", "/"]
+
+def worker(base_url, paths, deadline, latencies, errors, lock):
+    sess = requests.Session()  # keep-alive per worker
+    i = 0
+    local_lat, local_err = [], 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            r = sess.get(base_url + path, timeout=30)
+            if r.status_code >= 400:
+                local_err += 1
+        except requests.RequestException:
+            local_err += 1
+            continue
+        local_lat.append(time.perf_counter() - t0)
+    with lock:
+        latencies.extend(local_lat)
+        errors[0] += local_err
+
+def run(base_url, paths, concurrency, duration, warmup):
+    # pemanasan: isi snapshot & memo supaya yang diukur adalah server, bukan baca sheet pertama
+    for p in paths:
+        for _ in range(warmup):
+            requests.get(base_url + p, timeout=60)
+
+    latencies, errors, lock = [], [0], threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=worker, args=(base_url, paths, deadline, latencies, errors, lock))
+               for _ in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - t0
+
+    lat_ms = np.array(latencies) * 1000.0
+    return {
+        "url": base_url,
+        "paths": paths,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": int(lat_ms.size),
+        "errors": int(errors[0]),
+        "rps": round(lat_ms.size / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(float(np.percentile(lat_ms, 50)), 2) if lat_ms.size else None,
+        "p95_ms": round(float(np.percentile(lat_ms, 95)), 2) if lat_ms.size else None,
+        "p99_ms": round(float(np.percentile(lat_ms, 99)), 2) if lat_ms.size else None,
+        "max_ms": round(float(lat_ms.max()), 2) if lat_ms.size else None,
+    }
+
+def compare(a_path, b_path):
+    a = json.loads(Path(a_path).read_text(encoding="utf-8"))
+    b = json.loads(Path(b_path).read_text(encoding="utf-8"))
+    print(f"{'metrik':<10}{Path(a_path).stem:>16}{Path(b_path).stem:>16}{'rasio':>10}")
+    for k in ["rps", "p50_ms", "p95_ms", "p99_ms", "max_ms", "errors"]:
+        va, vb = a.get(k), b.get(k)
+        ratio = f"{vb / va:.2f}x" if va and vb is not None else "-"
+        print(f"{k:<10}{str(va):>16}{str(vb):>16}{ratio:>10}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Load test endpoint dashboard (RPS & tail latency).")
+    ap.add_argument("--url", default="http://127.0.0.1:5000")
+    ap.add_argument("--path", action="append", help="Path yang diuji (boleh berulang).")
+    ap.add_argument("-c", "--concurrency", type=int, default=32)
+    ap.add_argument("-d", "--duration", type=float, default=20.0, help="Durasi (detik).")
+    ap.add_argument("--warmup", type=int, default=3)
+    ap.add_argument("--out", help="Simpan hasil ke JSON.")
+    ap.add_argument("--compare", nargs=2, metavar=("A.json", "B.json"), help="Bandingkan dua hasil.")
+    args = ap.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    result = run(args.url.rstrip("/"), args.path or DEFAULT_PATHS, args.concurrency, args.duration, args.warmup)
+    print(json.dumps(result, indent=2))
+    if args.out:
+        Path(args.out).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    sys.exit(main())
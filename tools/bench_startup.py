@@ -0,0 +1,107 @@
+# tools/bench_startup.py
+"""
+Cek budget waktu startup aplikasi.
+
+1) `python -X importtime -c "import main"`: total waktu import + modul terberat,
+   gagal (exit 1) bila melewati budget atau bila modul berat ikut ter-import.
+2) (opsional, --serve) jalankan `main.py --headless --server prod`, ukur waktu
+   sampai GET / pertama dijawab 200 (dashboard dari cache disk).
+
+Contoh:
+  python tools/bench_startup.py --budget-ms 400
+  python tools/bench_startup.py --serve --port 5055
+"""
+import argparse, os, re, subprocess, sys, time, urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# modul yang tidak boleh ikut saat `import main`
+HEAVY_MODULES = ["pandas", "numpy", "sklearn", "joblib", "gspread", "oauth2client", "twilio"]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def import_profile():
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m:
+            self_us, cum_us, indent, name = int(m.group(1)), int(m.group(2)), len(m.group(3)), m.group(4)
+            rows.append((name, self_us, cum_us, indent))
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:], file=sys.stderr)
+    return proc.returncode, rows
+
+def time_to_first_response(port, timeout):
+    env = dict(os.environ, FIREAI_HEADLESS="1")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "main.py", "--headless", "--server", "prod", "--port", str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - t0 < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - t0
+            except OSError:
+                time.sleep(0.05)
+        return None
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+def main():
+    ap = argparse.ArgumentParser(description="Profil import & budget startup main.py.")
+    ap.add_argument("--budget-ms", type=float, default=400.0, help="Budget total waktu import main.")
+    ap.add_argument("--top", type=int, default=15, help="Tampilkan N modul terberat.")
+    ap.add_argument("--serve", action="store_true", help="Ukur juga waktu sampai GET / pertama.")
+    ap.add_argument("--port", type=int, default=5055)
+    ap.add_argument("--serve-budget-s", type=float, default=1.0)
+    args = ap.parse_args()
+
+    code, rows = import_profile()
+    if code != 0:
+        print("❌ `import main` gagal.")
+        return 1
+
+    total_us = sum(r[2] for r in rows if r[3] == 1)  # modul level atas
+    main_row = next((r for r in rows if r[0] == "main"), None)
+    main_ms = (main_row[2] if main_row else total_us) / 1000.0
+
+    print(f"import main: {main_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"{'modul':<40}{'self ms':>10}{'kumulatif ms':>14}")
+    for name, self_us, cum_us, _ in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"{name:<40}{self_us / 1000:>10.1f}{cum_us / 1000:>14.1f}")
+
+    loaded = {r[0].split(".")[0] for r in rows}
+    heavy = [m for m in HEAVY_MODULES if m in loaded]
+
+    ok = True
+    if heavy:
+        print(f"❌ Modul berat ikut ter-import: {heavy}")
+        ok = False
+    if main_ms > args.budget_ms:
+        print(f"❌ Melewati budget import ({main_ms:.1f} > {args.budget_ms:.0f} ms)")
+        ok = False
+
+    if args.serve:
+        ttfr = time_to_first_response(args.port, timeout=30)
+        if ttfr is None:
+            print("❌ Server tidak menjawab GET / dalam 30 detik")
+            ok = False
+        else:
+            print(f"GET / pertama: {ttfr:.2f} s (budget {args.serve_budget_s:.1f} s)")
+            if ttfr > args.serve_budget_s:
+                print("❌ Melewati budget startup")
+                ok = False
+
+    print("✅ Startup dalam budget" if ok else "❌ Startup di luar budget")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+# tools/kecamatan_report.py
+"""
+Laporan reklasifikasi kecamatan: tebakan lama (substring persis / segmen terakhir)
+vs resolver fuzzy (core/kecamatan.py) pada seluruh arsip.
+
+Contoh:
+  python tools/kecamatan_report.py                          # dari Google Sheet
+  python tools/kecamatan_report.py --csv data/data3.csv --column lokasi --out kecamatan_report.json
+"""
+import argparse, json, os, sys, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+from core.data_source import _guess_kecamatan_from_alamat, kecamatan_resolver  # noqa: E402
+
+def main():
+    ap = argparse.ArgumentParser(description="Berapa baris yang pindah kategori kecamatan dengan resolver fuzzy.")
+    ap.add_argument("--csv", help="Baca alamat dari CSV (default: Google Sheet via SheetReader).")
+    ap.add_argument("--column", default="Alamat", help="Kolom alamat di CSV.")
+    ap.add_argument("--top", type=int, default=20, help="Jumlah perubahan terbanyak yang dicetak.")
+    ap.add_argument("--out", help="Simpan laporan lengkap ke JSON.")
+    args = ap.parse_args()
+
+    if args.csv:
+        alamat = pd.read_csv(args.csv, usecols=[args.column])[args.column]
+    else:
+        from core.data_source import SheetReader
+        alamat = SheetReader().get_dataframe()["Alamat"]
+
+    resolver = kecamatan_resolver()
+    t0 = time.perf_counter()
+    report = resolver.reclassification_report(alamat, _guess_kecamatan_from_alamat)
+    report["seconds"] = round(time.perf_counter() - t0, 3)
+    report["resolver_stats"] = dict(resolver.stats)
+    resolver.save()
+
+    print(f"Baris: {report['rows']}, pindah kategori: {report['reclassified']} "
+          f"({report['categories_before']} -> {report['categories_after']} kategori, {report['seconds']} s)")
+    for ch in report["changes"][:args.top]:
+        print(f"{ch['count']:>7}  {ch['from']!r} -> {ch['to']!r}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,191 @@
+import argparse
+import json
 import os
+
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import OrdinalEncoder
 
-# === Load Data ===
-df = pd.read_csv("data/data_4.csv")
+# Contoh:
+#   python tools/split.py                                   # seperti dulu: semua di memori, CSV di lampiran/
+#   python tools/split.py --stream --chunksize 200000       # arsip besar: per chunk, output .npy per kolom
+
+SRC = "data/data_4.csv"
+OUT = "lampiran"
 
 features = ["lokasi", "kawasan", "obyek"]
 target_air = "air"
 target_mobil = "mobil"
+COLUMNS = features + [target_air, target_mobil]
+
+# dtype eksplisit: tebakan pandas bisa beda antar chunk (int di satu chunk, object/float di chunk
+# lain), padahal hash baris & urutan kategori harus sama berapa pun chunksize-nya
+DTYPES = {**{f: str for f in features}, target_air: float, target_mobil: float}
+
+# ukuran file contoh untuk lampiran skripsi
+N_SAMPLE, N_TRAIN_SAMPLE, N_TEST_SAMPLE = 20, 16, 4
+
+
+# === Mode memori (asli) ===
+def normalize(df):
+    """Nilai kanonik: fitur = string tanpa spasi tepi, target = float. Dipakai kedua mode."""
+    df = df[COLUMNS].copy()
+    for f in features:
+        df[f] = df[f].str.strip()
+    for c in (target_air, target_mobil):
+        df[c] = pd.to_numeric(df[c], errors="coerce").astype(np.float64)
+    return df.dropna()
+
+
+def split_memory(src, out, test_size=0.2, seed=42):
+    df = pd.read_csv(src, dtype=DTYPES)
+    df_clean = normalize(df)
+
+    # Split dulu
+    train_df, test_df = train_test_split(df_clean, test_size=test_size, random_state=seed)
+
+    # Ordinal Encoder (fit di TRAIN SAJA)
+    ord_enc = OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1)
+    ord_enc.fit(train_df[features])
+
+    X_train_enc = ord_enc.transform(train_df[features])
+    X_test_enc  = ord_enc.transform(test_df[features])
+
+    # Buat DataFrame hasil encoding
+    train_enc_df = pd.DataFrame(X_train_enc, columns=features, index=train_df.index)
+    train_enc_df[target_air] = train_df[target_air].values
+    train_enc_df[target_mobil] = train_df[target_mobil].values
+
+    test_enc_df = pd.DataFrame(X_test_enc, columns=features, index=test_df.index)
+    test_enc_df[target_air] = test_df[target_air].values
+    test_enc_df[target_mobil] = test_df[target_mobil].values
+
+    # Simpan contoh & full
+    os.makedirs(out, exist_ok=True)
+    df_clean.head(N_SAMPLE).to_csv(f"{out}/sample_dataset.csv", index=False)
+    train_df.head(N_TRAIN_SAMPLE).to_csv(f"{out}/sample_training.csv", index=False)
+    test_df.head(N_TEST_SAMPLE).to_csv(f"{out}/sample_testing.csv", index=False)
+
+    train_enc_df.head(N_TRAIN_SAMPLE).to_csv(f"{out}/sample_training_encoded_ordinal.csv", index=False)
+    test_enc_df.head(N_TEST_SAMPLE).to_csv(f"{out}/sample_testing_encoded_ordinal.csv", index=False)
+
+    train_enc_df.to_csv(f"{out}/full_training_encoded_ordinal.csv", index=False)
+    test_enc_df.to_csv(f"{out}/full_testing_encoded_ordinal.csv", index=False)
+
+    # (Opsional) Simpan mapping kategori → index untuk dokumentasi skripsi
+    mapping = {col: list(cats.astype(str)) for col, cats in zip(features, ord_enc.categories_)}
+    write_mapping(mapping, f"{out}/ordinal_categories_mapping.json")
+
+
+# === Mode streaming (arsip besar) ===
+def is_test(chunk, test_size, seed):
+    """Train/test ditentukan hash isi baris -> deterministik per baris, tanpa shuffle global.
+    Baris duplikat selalu jatuh di sisi yang sama (tidak bocor antara train & test).
+    `chunk` harus sudah lewat `normalize` (dtype tetap) supaya hash tidak tergantung chunk."""
+    h = pd.util.hash_pandas_object(chunk[COLUMNS], index=False, hash_key=f"{seed:016d}"[:16])
+    return (h.to_numpy() % np.uint64(10_000)) < np.uint64(round(test_size * 10_000))
+
+
+def read_chunks(src, chunksize):
+    for chunk in pd.read_csv(src, usecols=COLUMNS, dtype=DTYPES, chunksize=chunksize):
+        yield normalize(chunk)
+
+
+def write_mapping(mapping, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(mapping, f, ensure_ascii=False, indent=2)
+
 
-df_clean = df[features + [target_air, target_mobil]].dropna().copy()
+def split_stream(src, out, test_size=0.2, seed=42, chunksize=100_000):
+    """
+    Dua pass berukuran memori tetap (~1 chunk + daftar kategori):
+      1) hitung baris train/test & kumpulkan kategori dari baris TRAIN saja;
+      2) encode per chunk, tulis langsung ke file .npy per kolom (memmap, columnar biner).
+    Output: <out>/encoded/{train,test}/<kolom>.npy + mapping kategori + meta.json.
+    """
+    # --- pass 1: kategori & jumlah baris ---
+    cats = {f: set() for f in features}
+    n = {"train": 0, "test": 0}
+    for chunk in read_chunks(src, chunksize):
+        test = is_test(chunk, test_size, seed)
+        n["test"] += int(test.sum())
+        n["train"] += int((~test).sum())
+        train = chunk[~test]
+        for f in features:
+            cats[f].update(train[f].unique())
+    # fitur dibaca sebagai string di kedua mode -> OrdinalEncoder juga mengurutkan leksikografis
+    categories = {f: sorted(cats[f]) for f in features}
 
-# Split dulu
-train_df, test_df = train_test_split(df_clean, test_size=0.2, random_state=42)
+    # --- pass 2: encode & tulis inkremental ---
+    cols = {}
+    for part in ("train", "test"):
+        os.makedirs(f"{out}/encoded/{part}", exist_ok=True)
+        for c in COLUMNS:
+            dtype = np.int32 if c in features else np.float64
+            cols[part, c] = np.lib.format.open_memmap(
+                f"{out}/encoded/{part}/{c}.npy", mode="w+", dtype=dtype, shape=(n[part],))
+    pos = {"train": 0, "test": 0}
+    samples = {"dataset": [], "train": [], "test": [], "train_enc": [], "test_enc": []}
+    limits = {"dataset": N_SAMPLE, "train": N_TRAIN_SAMPLE, "test": N_TEST_SAMPLE,
+              "train_enc": N_TRAIN_SAMPLE, "test_enc": N_TEST_SAMPLE}
 
-# Ordinal Encoder (fit di TRAIN SAJA)
-ord_enc = OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1)
-ord_enc.fit(train_df[features])
+    def keep(name, df):
+        have = sum(len(x) for x in samples[name])
+        if have < limits[name]:
+            samples[name].append(df.head(limits[name] - have))
 
-X_train_enc = ord_enc.transform(train_df[features])
-X_test_enc  = ord_enc.transform(test_df[features])
+    for chunk in read_chunks(src, chunksize):
+        test = is_test(chunk, test_size, seed)
+        enc = pd.DataFrame(index=chunk.index)
+        for f in features:
+            # kategori yang tidak ada di train -> -1 (sama dengan handle_unknown OrdinalEncoder)
+            enc[f] = pd.Categorical(chunk[f], categories=categories[f]).codes.astype(np.int32)
+        for c in (target_air, target_mobil):
+            enc[c] = chunk[c]
 
-# Buat DataFrame hasil encoding
-train_enc_df = pd.DataFrame(X_train_enc, columns=features, index=train_df.index)
-train_enc_df[target_air] = train_df[target_air].values
-train_enc_df[target_mobil] = train_df[target_mobil].values
+        keep("dataset", chunk)
+        for part, mask in (("train", ~test), ("test", test)):
+            rows = enc[mask]
+            a, b = pos[part], pos[part] + len(rows)
+            for c in COLUMNS:
+                cols[part, c][a:b] = rows[c].to_numpy()
+            pos[part] = b
+            keep(part, chunk[mask])
+            keep(f"{part}_enc", rows)
 
-test_enc_df = pd.DataFrame(X_test_enc, columns=features, index=test_df.index)
-test_enc_df[target_air] = test_df[target_air].values
-test_enc_df[target_mobil] = test_df[target_mobil].values
+    for arr in cols.values():
+        arr.flush()
+    del cols
 
-# Simpan contoh & full
-os.makedirs("lampiran", exist_ok=True)
-df_clean.head(20).to_csv("lampiran/sample_dataset.csv", index=False)
-train_df.head(16).to_csv("lampiran/sample_training.csv", index=False)
-test_df.head(4).to_csv("lampiran/sample_testing.csv", index=False)
+    # Simpan contoh untuk lampiran (kecil, tetap CSV)
+    names = {"dataset": "sample_dataset", "train": "sample_training", "test": "sample_testing",
+             "train_enc": "sample_training_encoded_ordinal", "test_enc": "sample_testing_encoded_ordinal"}
+    for key, fname in names.items():
+        if samples[key]:
+            pd.concat(samples[key]).to_csv(f"{out}/{fname}.csv", index=False)
 
-train_enc_df.head(16).to_csv("lampiran/sample_training_encoded_ordinal.csv", index=False)
-test_enc_df.head(4).to_csv("lampiran/sample_testing_encoded_ordinal.csv", index=False)
+    write_mapping(categories, f"{out}/ordinal_categories_mapping.json")
+    meta = {"src": src, "test_size": test_size, "seed": seed, "chunksize": chunksize,
+            "rows": n, "columns": COLUMNS, "format": "npy per kolom (numpy.load(..., mmap_mode='r'))"}
+    with open(f"{out}/encoded/meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return n
 
-train_enc_df.to_csv("lampiran/full_training_encoded_ordinal.csv", index=False)
-test_enc_df.to_csv("lampiran/full_testing_encoded_ordinal.csv", index=False)
 
-# (Opsional) Simpan mapping kategori → index untuk dokumentasi skripsi
-mapping = {col: list(cats.astype(str)) for col, cats in zip(features, ord_enc.categories_)}
-pd.Series(mapping).to_json("lampiran/ordinal_categories_mapping.json", force_ascii=False)
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Split train/test + ordinal encoding untuk lampiran.")
+    ap.add_argument("--src", default=SRC)
+    ap.add_argument("--out", default=OUT)
+    ap.add_argument("--test-size", type=float, default=0.2)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--stream", action="store_true", help="Baca per chunk, output biner per kolom (arsip besar).")
+    ap.add_argument("--chunksize", type=int, default=100_000)
+    args = ap.parse_args()
 
-print("✅ Selesai: Ordinal encoding & file contoh tersimpan di folder lampiran/")
+    if args.stream:
+        n = split_stream(args.src, args.out, args.test_size, args.seed, args.chunksize)
+        print(f"✅ Selesai (streaming): train={n['train']} test={n['test']} -> {args.out}/encoded/")
+    else:
+        split_memory(args.src, args.out, args.test_size, args.seed)
+        print(f"✅ Selesai: Ordinal encoding & file contoh tersimpan di folder {args.out}/")
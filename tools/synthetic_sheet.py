@@ -0,0 +1,85 @@
+# tools/synthetic_sheet.py
+"""
+Worksheet palsu berisi arsip laporan sintetis, untuk benchmark tanpa Google Sheet.
+Meniru `gspread.Worksheet`: get_all_records() dan append_row().
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+KECAMATAN = [
+    "Andir", "Antapani", "Arcamanik", "Astanaanyar", "Babakan Ciparay", "Bandung Kidul",
+    "Bandung Wetan", "Batununggal", "Bojongloa Kaler", "Buahbatu", "Cibiru", "Cicendo",
+    "Coblong", "Gedebage", "Kiaracondong", "Lengkong", "Regol", "Sukajadi", "Sukasari", "Ujungberung",
+]
+OBYEK = ["rumah", "toko", "pasar", "gudang", "kantor", "lahan kosong", "panel listrik", "kendaraan"]
+HEADER = ["Tanggal", "Pukul", "Nama Pelapor", "Alamat", "Obyek", "Air", "Mobil"]
+
+
+class SyntheticSheet:
+    def __init__(self, n_rows: int = 50_000, seed: int = 42, start: datetime = datetime(2019, 1, 1)):
+        rng = np.random.default_rng(seed)
+        minutes = np.sort(rng.integers(0, 60 * 24 * 365 * 6, size=n_rows))
+        kec = rng.integers(0, len(KECAMATAN), size=n_rows)
+        oby = rng.integers(0, len(OBYEK), size=n_rows)
+        air = np.round(rng.gamma(2.0, 8.0, size=n_rows), 2)
+        mobil = rng.integers(1, 6, size=n_rows)
+
+        self._rows = []
+        for i in range(n_rows):
+            t = start + timedelta(minutes=int(minutes[i]))
+            self._rows.append({
+                "Tanggal": t.strftime("%Y-%m-%d %H:%M"),
+                "Pukul": t.strftime("%H:%M"),
+                "Nama Pelapor": f"Pelapor {i}",
+                "Alamat": f"Jl. Contoh No.{i % 300}, {KECAMATAN[kec[i]]}, Bandung",
+                "Obyek": OBYEK[oby[i]],
+                "Air": float(air[i]),
+                "Mobil": int(mobil[i]),
+            })
+        self._lock = threading.Lock()
+
+    def get_all_records(self):
+        with self._lock:
+            return [dict(r) for r in self._rows]
+
+    def append_row(self, row, value_input_option=None):
+        with self._lock:
+            self._rows.append(dict(zip(HEADER, row)))
+
+
+class _YearSheet:
+    def __init__(self, title, rows, lock, delay):
+        self.title, self._rows, self._lock, self._delay = title, rows, lock, delay
+
+    def get_all_records(self):
+        if self._delay:
+            time.sleep(self._delay * len(self._rows) / 10_000)   # tiru latensi API ~ jumlah baris
+        with self._lock:
+            return [dict(r) for r in self._rows]
+
+    def append_row(self, row, value_input_option=None):
+        with self._lock:
+            self._rows.append(dict(zip(HEADER, row)))
+
+
+class SyntheticSpreadsheet:
+    """
+    Arsip sintetis yang dipecah satu worksheet per tahun (judul "2019", "2020", ...),
+    meniru `gspread.Spreadsheet.worksheets()` untuk SheetReader(shards="year").
+    `delay` = detik per 10.000 baris per baca, supaya efek baca paralel/cache terlihat.
+    """
+
+    def __init__(self, n_rows: int = 50_000, seed: int = 42, delay: float = 0.0):
+        base = SyntheticSheet(n_rows, seed)
+        self._lock = threading.Lock()
+        by_year = {}
+        for r in base._rows:
+            by_year.setdefault(r["Tanggal"][:4], []).append(r)
+        self._sheets = [_YearSheet(y, rows, self._lock, delay) for y, rows in sorted(by_year.items())]
+        self.sheet1 = self._sheets[0]
+
+    def worksheets(self):
+        return list(self._sheets)
@@ -1,24 +1,24 @@
 # tools/train_and_export_trees_from_csv.py
-import argparse, os, json, shutil, subprocess, warnings, sys
+import argparse, hashlib, os, json, shutil, subprocess, time, warnings, sys
 from pathlib import Path
 
 import numpy as np
-import pandas as pd
-import joblib
+import matplotlib
+matplotlib.use("Agg")  # render di worker tanpa display
 import matplotlib.pyplot as plt
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OrdinalEncoder
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from joblib import Parallel, delayed
 from sklearn.tree import export_text, export_graphviz
 from sklearn import tree
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from training.pipeline import load_config, prepare_data, run  # noqa: E402
+
 warnings.filterwarnings("ignore", category=UserWarning)
 
 DEFAULT_CSV = "data/data3.csv"
-
-def coerce_numeric(series):
-    return pd.to_numeric(series, errors="coerce")
+DEFAULT_CONFIG = "training/configs/trees_from_csv.json"
+FORMATS = ("txt", "png", "graphviz")
+MANIFEST = "export_manifest.json"
 
 def save_tree_text(estimator, features, outpath):
     txt = export_text(estimator, feature_names=features, decimals=3)
@@ -57,6 +57,77 @@ def save_tree_graphviz(estimator, features, basename_noext, max_depth=None):
         return dot_path, png_path
     return dot_path, None
 
+# ====== ekspor paralel + inkremental ======
+def tree_key(estimator, features, fmt, max_depth) -> str:
+    """Hash struktur pohon + parameter render; sama -> artefak lama masih valid."""
+    t = estimator.tree_
+    h = hashlib.sha1()
+    for arr in (t.children_left, t.children_right, t.feature, t.threshold, t.value):
+        h.update(np.ascontiguousarray(arr).tobytes())
+    render = {"fmt": fmt, "features": list(features),
+              "max_depth": None if fmt == "txt" else max_depth, "dot": bool(shutil.which("dot"))}
+    h.update(json.dumps(render, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+def artifact_paths(base, fmt) -> list:
+    if fmt == "txt":
+        return [base + ".txt"]
+    if fmt == "png":
+        return [base + ".png"]
+    return [base + "_gv.dot"] + ([base + "_gv.png"] if shutil.which("dot") else [])
+
+def render_one(estimator, features, base, fmt, max_depth) -> float:
+    t0 = time.perf_counter()
+    if fmt == "txt":
+        save_tree_text(estimator, features, base + ".txt")
+    elif fmt == "png":
+        save_tree_png(estimator, features, base + ".png", max_depth=max_depth)
+    else:
+        save_tree_graphviz(estimator, features, base + "_gv", max_depth=max_depth)
+    return time.perf_counter() - t0
+
+def export_trees(models: dict, features, outdir, n_trees, formats, max_depth, jobs=-1) -> dict:
+    """
+    Render pohon (models = {"air": rf, "mobil": rf}) ke format yang diminta di process pool.
+    Artefak yang key-nya sama dengan manifest sebelumnya dan file-nya masih ada dilewati.
+    """
+    manifest_path = os.path.join(outdir, MANIFEST)
+    old = json.loads(Path(manifest_path).read_text(encoding="utf-8")) if os.path.exists(manifest_path) else {}
+
+    tasks, skipped, manifest = [], [], dict(old)  # format yang tidak diminta run ini tetap tercatat
+    for prefix, model in models.items():
+        for i in range(min(n_trees, len(model.estimators_))):
+            est = model.estimators_[i]
+            base = os.path.join(outdir, f"{prefix}_tree_{i}")
+            for fmt in formats:
+                name = f"{prefix}_tree_{i}.{fmt}"
+                key = tree_key(est, features, fmt, max_depth)
+                prev = old.get(name)
+                if prev and prev["key"] == key and all(os.path.exists(p) for p in artifact_paths(base, fmt)):
+                    skipped.append(name)
+                else:
+                    tasks.append((name, key, est, base, fmt))
+
+    t0 = time.perf_counter()
+    secs = Parallel(n_jobs=jobs, backend="loky")(
+        delayed(render_one)(est, features, base, fmt, max_depth) for _, _, est, base, fmt in tasks
+    ) if tasks else []
+    wall = time.perf_counter() - t0
+    for (name, key, *_), s in zip(tasks, secs):
+        manifest[name] = {"key": key, "render_s": round(s, 3)}
+    Path(manifest_path).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    return {
+        "formats": list(formats),
+        "rendered": len(tasks),
+        "skipped": len(skipped),
+        "wall_s": round(wall, 3),
+        "render_s_sum": round(sum(secs), 3),
+        # waktu render artefak yang dilewati (tercatat di run sebelumnya) + hemat dari paralel
+        "saved_by_cache_s": round(sum(manifest[n]["render_s"] for n in skipped), 3),
+        "saved_by_parallel_s": round(max(sum(secs) - wall, 0.0), 3),
+    }
+
 def save_importances(model, features, out_json):
     imp = model.feature_importances_
     order = np.argsort(imp)[::-1]
@@ -84,113 +155,69 @@ def main():
     ap.add_argument("--outdir", default="model/trees_from_csv", help="Folder output.")
     ap.add_argument("--n-trees", type=int, default=1, help="Jumlah pohon yang diekspor per model.")
     ap.add_argument("--max-depth", type=int, default=4, help="Kedalaman maksimum visualisasi PNG.")
+    ap.add_argument("--format", default=",".join(FORMATS),
+                    help=f"Format ekspor, dipisah koma: {', '.join(FORMATS)} (default semua).")
     ap.add_argument("--no-graphviz", action="store_true", help="Matikan ekspor Graphviz (.dot/.png).")
+    ap.add_argument("--config", default=DEFAULT_CONFIG, help="Config training (kolom & hyperparameter).")
+    ap.add_argument("--jobs", type=int, default=-1, help="Proses paralel untuk fit & render pohon.")
     args = ap.parse_args()
 
+    formats = [f.strip() for f in args.format.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        ap.error(f"format tidak dikenal: {unknown} (pilihan: {', '.join(FORMATS)})")
+    if args.no_graphviz:
+        formats = [f for f in formats if f != "graphviz"]
+
     csv_path = resolve_csv_path(args.csv)
     os.makedirs(args.outdir, exist_ok=True)
 
-    # ====== 1) Load data ======
-    df = pd.read_csv(csv_path)
-
-    # Fitur yang dipakai (bisa kamu ubah sesuai kebutuhan dataset)
-    features = ["lokasi", "kawasan", "obyek", "penyebab"]  # sertakan 'penyebab' bila ada
-    target_air = "air"
-    target_mobil = "mobil"
-
-    # Validasi kolom
-    missing = [c for c in features + [target_air, target_mobil] if c not in df.columns]
-    if missing:
+    # ====== 1-6) Load, encode, split, train (paralel), evaluasi, simpan ======
+    # hyperparameter & kolom dari training/configs/trees_from_csv.json
+    cfg = load_config(args.config)
+    cfg["csv"] = str(csv_path)
+    cfg["bundle"] = os.path.join(args.outdir, "trained_model_from_csv.pkl")
+    cfg["evaluation"] = os.path.join(args.outdir, "evaluation.json")
+    features = cfg["features"]
+
+    try:
+        data = prepare_data(cfg)
+    except ValueError as e:
         print(
-            f"❌ Kolom berikut tidak ditemukan di CSV: {missing}\n"
-            f"Pastikan CSV memiliki: {features + [target_air, target_mobil]}",
+            f"❌ {e}\n"
+            f"Pastikan CSV memiliki: {features + list(cfg['targets'].values())}",
             file=sys.stderr,
         )
         sys.exit(2)
 
-    # ====== 2) Bersihkan & siapkan data ======
-    for num_col in [target_air, target_mobil, "kerugian", "luas", "jam", "bulan"]:
-        if num_col in df.columns:
-            df[num_col] = coerce_numeric(df[num_col])
-
-    df_clean = df[features + [target_air, target_mobil]].dropna(subset=[target_air, target_mobil]).copy()
-
-    encoder = OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1)
-    X = encoder.fit_transform(df_clean[features])
-
-    y_air = df_clean[target_air].values.astype(float)
-    y_mobil = df_clean[target_mobil].values.astype(float)
-
-    # ====== 3) Split ======
-    X_train, X_test, y_air_train, y_air_test, y_mobil_train, y_mobil_test = train_test_split(
-        X, y_air, y_mobil, test_size=0.2, random_state=42
-    )
-
-    # ====== 4) Train ======
-    common_params = dict(
-        n_estimators=200,
-        random_state=42,
-        max_depth=10,
-        min_samples_leaf=5,
-        max_features="sqrt",
-        bootstrap=True,
-    )
-    model_air = RandomForestRegressor(**common_params)
-    model_mobil = RandomForestRegressor(**common_params)
-
-    model_air.fit(X_train, y_air_train)
-    model_mobil.fit(X_train, y_mobil_train)
-
-    # ====== 5) Evaluasi ======
-    y_air_pred = model_air.predict(X_test)
-    y_mobil_pred = model_mobil.predict(X_test)
-    evaluation = {
-        "MAE_air": round(mean_absolute_error(y_air_test, y_air_pred), 3),
-        "MSE_air": round(mean_squared_error(y_air_test, y_air_pred), 3),
-        "R2_air": round(r2_score(y_air_test, y_air_pred), 3),
-        "MAE_mobil": round(mean_absolute_error(y_mobil_test, y_mobil_pred), 3),
-        "MSE_mobil": round(mean_squared_error(y_mobil_test, y_mobil_pred), 3),
-        "R2_mobil": round(r2_score(y_mobil_test, y_mobil_pred), 3),
-        "n_train": int(X_train.shape[0]),
-        "n_test": int(X_test.shape[0]),
+    cfg["evaluation_extra"] = {
+        "n_train": int(data["X_train"].shape[0]),
+        "n_test": int(data["X_test"].shape[0]),
         "features": features,
         "csv": str(csv_path),
     }
+    res = run(cfg, jobs=args.jobs, data=data)
+    model_air, model_mobil = res["bundle"]["model_air"], res["bundle"]["model_mobil"]
+    evaluation = res["evaluation"]
+    bundle_path, eval_path = cfg["bundle"], cfg["evaluation"]
 
-    # ====== 6) Simpan model & evaluasi ======
-    bundle_path = os.path.join(args.outdir, "trained_model_from_csv.pkl")
-    joblib.dump(
-        {"model_air": model_air, "model_mobil": model_mobil, "encoder": encoder, "features": features},
-        bundle_path,
-    )
-    eval_path = os.path.join(args.outdir, "evaluation.json")
-    Path(eval_path).write_text(json.dumps(evaluation, indent=2), encoding="utf-8")
-
-    # ====== 7) Ekspor pohon keputusan ======
-    def export_some(model, name_prefix):
-        n = min(args.n_trees, len(model.estimators_))
-        # feature importances
-        save_importances_path = os.path.join(args.outdir, f"{name_prefix}_feature_importances.json")
-        save_importances(model, features, save_importances_path)
-        # trees
-        for i in range(n):
-            base = os.path.join(args.outdir, f"{name_prefix}_tree_{i}")
-            save_tree_text(model.estimators_[i], features, base + ".txt")
-            save_tree_png(model.estimators_[i], features, base + ".png", max_depth=args.max_depth)
-            if not args.no_graphviz:
-                save_tree_graphviz(model.estimators_[i], features, base + "_gv", max_depth=args.max_depth)
-
-    export_some(model_air, "air")
-    export_some(model_mobil, "mobil")
+    # ====== 7) Ekspor pohon keputusan (paralel, lewati yang tidak berubah) ======
+    for name_prefix, model in (("air", model_air), ("mobil", model_mobil)):
+        save_importances(model, features, os.path.join(args.outdir, f"{name_prefix}_feature_importances.json"))
+    export = export_trees({"air": model_air, "mobil": model_mobil}, features, args.outdir,
+                          args.n_trees, formats, args.max_depth, jobs=args.jobs)
 
     # ====== 8) Ringkasan ke stdout ======
     summary = {
         "bundle_path": bundle_path,
         "evaluation_path": eval_path,
         "outdir": args.outdir,
+        "feature_store": data.get("store"),
         "trees_exported_each": int(args.n_trees),
         "png_max_depth": int(args.max_depth),
-        "graphviz_used": bool(shutil.which("dot")) and (not args.no_graphviz),
+        "graphviz_used": bool(shutil.which("dot")) and ("graphviz" in formats),
+        "fit_timing": res["timing"],
+        "export": export,
         "evaluation": evaluation,
     }
     print(json.dumps(summary, indent=2))
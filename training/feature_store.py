@@ -0,0 +1,120 @@
+# training/feature_store.py
+"""
+Feature store: dataset CSV di-encode SEKALI menjadi array NumPy di disk.
+
+  cache/features/<hash>/
+    X.npy, y_air.npy, y_mobil.npy   -> dibuka dengan mmap (zero-copy, dibagi antar proses)
+    encoder.pkl                     -> OrdinalEncoder yang dipakai
+    categories.json                 -> mapping kategori -> index per fitur (untuk dokumentasi)
+    meta.json                       -> hash, csv, fitur, jumlah baris
+
+<hash> = sha1(isi CSV + fitur + kolom target + aturan dropna). Selama CSV dan config sama,
+pipeline/search/export langsung memakai array yang ada tanpa read_csv + fit encoder lagi.
+
+Contoh:
+  python training/feature_store.py --config training/configs/real.json
+"""
+import argparse, hashlib, json, os, shutil, sys, tempfile
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import OrdinalEncoder
+
+TARGETS = ("air", "mobil")
+STORE_ROOT = os.getenv("FIREAI_FEATURE_STORE", "cache/features")
+
+# ====== encoding ======
+def encode_frame(cfg: dict, df: pd.DataFrame) -> dict:
+    """DataFrame -> bersihkan -> OrdinalEncoder (fit di seluruh data, sama seperti skrip lama)."""
+    features = list(cfg["features"])
+    tcols = cfg["targets"]  # {"air": "air (m3)", "mobil": "jumlah_mobil_air"}
+
+    missing = [c for c in features + [tcols[t] for t in TARGETS] if c not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan di {cfg.get('csv')}: {missing}")
+
+    df = df[features + [tcols[t] for t in TARGETS]].copy()
+    for t in TARGETS:
+        df[tcols[t]] = pd.to_numeric(df[tcols[t]], errors="coerce")
+    subset = [tcols[t] for t in TARGETS] if cfg.get("dropna", "all") == "targets" else None
+    df = df.dropna(subset=subset)
+
+    encoder = OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1)
+    X = encoder.fit_transform(df[features])
+    ys = {t: df[tcols[t]].values.astype(float) for t in TARGETS}
+    return {"features": features, "encoder": encoder, "X": X, "y": ys}
+
+# ====== store ======
+def content_hash(cfg: dict) -> str:
+    h = hashlib.sha1()
+    with open(cfg["csv"], "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    spec = {"features": list(cfg["features"]), "targets": cfg["targets"], "dropna": cfg.get("dropna", "all")}
+    h.update(json.dumps(spec, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def build(cfg: dict, root: str = STORE_ROOT, digest: str | None = None) -> str:
+    """Encode CSV ke <root>/<hash>/ (ditulis ke folder sementara lalu di-rename, aman dari proses paralel)."""
+    digest = digest or content_hash(cfg)
+    path = os.path.join(root, digest)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        return path
+
+    enc = encode_frame(cfg, pd.read_csv(cfg["csv"]))
+    os.makedirs(root, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f".{digest}-", dir=root)
+    try:
+        np.save(os.path.join(tmp, "X.npy"), np.ascontiguousarray(enc["X"], dtype=np.float64))
+        for t in TARGETS:
+            np.save(os.path.join(tmp, f"y_{t}.npy"), np.ascontiguousarray(enc["y"][t]))
+        joblib.dump(enc["encoder"], os.path.join(tmp, "encoder.pkl"))
+        mapping = {f: {str(c): i for i, c in enumerate(cats)}
+                   for f, cats in zip(enc["features"], enc["encoder"].categories_)}
+        Path(os.path.join(tmp, "categories.json")).write_text(
+            json.dumps(mapping, indent=2, ensure_ascii=False), encoding="utf-8")
+        meta = {"hash": digest, "csv": cfg["csv"], "features": enc["features"], "targets": cfg["targets"],
+                "dropna": cfg.get("dropna", "all"), "n_rows": int(enc["X"].shape[0])}
+        Path(os.path.join(tmp, "meta.json")).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # proses lain sudah lebih dulu menulis hash yang sama
+            shutil.rmtree(tmp, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return path
+
+def load(path: str) -> dict:
+    """Buka store: X & y sebagai memmap read-only (tidak disalin ke RAM sampai dipakai)."""
+    meta = json.loads(Path(os.path.join(path, "meta.json")).read_text(encoding="utf-8"))
+    return {
+        "features": meta["features"],
+        "encoder": joblib.load(os.path.join(path, "encoder.pkl")),
+        "X": np.load(os.path.join(path, "X.npy"), mmap_mode="r"),
+        "y": {t: np.load(os.path.join(path, f"y_{t}.npy"), mmap_mode="r") for t in TARGETS},
+        "hash": meta["hash"],
+        "path": path,
+    }
+
+def load_or_build(cfg: dict, root: str = STORE_ROOT) -> dict:
+    return load(build(cfg, root))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Encode dataset sekali ke feature store (array mmap).")
+    ap.add_argument("--config", required=True, help="Config training (csv, features, targets).")
+    ap.add_argument("--root", default=STORE_ROOT)
+    args = ap.parse_args(argv)
+
+    cfg = json.loads(Path(args.config).read_text(encoding="utf-8"))
+    digest = content_hash(cfg)
+    existed = os.path.exists(os.path.join(args.root, digest, "meta.json"))
+    store = load(build(cfg, args.root, digest))
+    state = "sudah ada, dipakai ulang" if existed else "baru di-encode"
+    print(f"✅ Feature store {store['path']} ({state}): {store['X'].shape[0]} baris x {store['X'].shape[1]} fitur")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+# training/incremental.py
+"""
+Retraining inkremental dari laporan baru di Google Sheet.
+
+- Hanya baris SETELAH versi model terakhir yang dibaca (sheet append-only, sama dengan
+  asumsi `SheetReader.subscribe`); posisi terakhir disimpan di <bundle>.state.json.
+  Realisasi diisi petugas setelah kejadian, jadi `rows_seen` hanya maju sampai baris
+  pertama yang realisasinya masih kosong; baris sesudahnya yang sudah dipakai dicatat
+  di `consumed` (nomor baris) supaya tidak dilatih dua kali.
+- Baris baru diubah ke fitur dengan fungsi yang SAMA dengan /submit (core/features.py:
+  lokasi = alamat apa adanya, kawasan = "umum", bulan dari waktu laporan) lalu di-encode
+  dengan encoder bundle (kategori baru -> -1, encoder tidak di-fit ulang).
+- Model dengan `warm_start` (RandomForest/GradientBoosting) ditumbuhkan: `--add-trees`
+  pohon/stage baru dilatih hanya di data baru, pohon lama tetap. Biaya ~ jumlah baris baru.
+- Evaluasi di hold-out window (baris baru paling akhir), model lama vs baru. Bundle baru
+  hanya dipublikasikan bila metrik tidak turun melebihi toleransi.
+
+Target = kolom realisasi lapangan ("Air Realisasi"/"Mobil Realisasi"), BUKAN Air/Mobil:
+dua kolom itu berisi prediksi model sendiri saat laporan masuk. Hanya baris yang realisasinya
+terisi yang dipakai; kalau kolom realisasi tidak ada di sheet, retraining berhenti dengan error.
+
+Contoh:
+  python training/incremental.py --bundle model/trained_model_Dummy.pkl --add-trees 20
+  python training/incremental.py --dry-run
+"""
+import argparse, copy, json, os, sys, time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, r2_score
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.features import fitur_laporan, standarkan  # noqa: E402
+from training.pipeline import TARGETS  # noqa: E402
+
+DEFAULT_BUNDLE = "model/trained_model_Dummy.pkl"
+
+# target -> kolom realisasi di snapshot SheetReader (lihat STANDARD_COLUMNS)
+TARGET_SOURCE = {"air": "Air Realisasi", "mobil": "Mobil Realisasi"}
+
+# ====== state ======
+def state_path(bundle_path: str) -> str:
+    return os.path.splitext(bundle_path)[0] + ".state.json"
+
+def load_state(path: str) -> dict:
+    if os.path.exists(path):
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    return {"rows_seen": 0, "consumed": [], "version": 0, "history": []}
+
+def _atomic_write(path: str, write) -> None:
+    tmp = f"{path}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+# ====== data ======
+def check_ground_truth(df: pd.DataFrame) -> None:
+    """Error kalau sheet tidak punya kolom realisasi (kolom kosong seluruhnya = tidak ada)."""
+    missing = [col for col in TARGET_SOURCE.values() if col not in df.columns or df[col].isna().all()]
+    if missing:
+        raise ValueError(f"Kolom realisasi {missing} tidak ada/kosong di sheet. Air/Mobil berisi prediksi "
+                         "model sendiri dan tidak boleh dipakai sebagai target; isi kolom realisasi dulu.")
+
+def has_ground_truth(df: pd.DataFrame) -> pd.Series:
+    """True per baris kalau realisasi Air & Mobil sudah terisi (angka)."""
+    return pd.DataFrame({t: pd.to_numeric(df[TARGET_SOURCE[t]], errors="coerce") for t in TARGETS},
+                        index=df.index).notna().all(axis=1)
+
+def known_categories(bundle: dict) -> dict:
+    return {f: set(map(str, c)) for f, c in zip(bundle["features"], bundle["encoder"].categories_)}
+
+def to_features(df: pd.DataFrame, features: list, known: dict) -> tuple:
+    """
+    Snapshot SheetReader -> (DataFrame fitur, {target: array}), dibangun persis seperti /submit.
+    Hanya baris dengan realisasi Air & Mobil, waktu, alamat dan obyek yang dipakai.
+    """
+    ys = pd.DataFrame({t: pd.to_numeric(df[TARGET_SOURCE[t]], errors="coerce") for t in TARGETS}, index=df.index)
+    ok = (has_ground_truth(df) & df["Waktu_dt"].notna()
+          & df["Alamat"].notna() & df["Obyek"].notna()).to_numpy()
+    rows = [standarkan(fitur_laporan(alamat, obyek, waktu.month), features, known)
+            for alamat, obyek, waktu in zip(df["Alamat"][ok], df["Obyek"][ok], df["Waktu_dt"][ok])]
+    unknown = [f for f in features if rows and f not in rows[0]]
+    if unknown:
+        raise ValueError(f"Fitur {unknown} tidak dibangun oleh core/features.py (tidak dikirim /submit)")
+    feats = pd.DataFrame(rows, columns=features, index=df.index[ok])
+    return feats, {t: ys.loc[ok, t].to_numpy(dtype=float) for t in TARGETS}
+
+def new_rows(reader, rows_seen: int, consumed=()) -> tuple:
+    """Baris setelah `rows_seen` yang belum dipakai; index = nomor baris (0-based) di snapshot."""
+    df = reader.get_dataframe().reset_index(drop=True)
+    if rows_seen > len(df):
+        raise ValueError(f"Sheet berisi {len(df)} baris, lebih sedikit dari rows_seen={rows_seen} "
+                         "(baris lama dihapus?) -> jalankan training penuh")
+    new = df.iloc[rows_seen:]
+    new = new[~new.index.isin(list(consumed))]
+    if "Waktu_dt" in new.columns:
+        new = new.sort_values("Waktu_dt", kind="stable", na_position="first")
+    return new, len(df)
+
+# ====== model ======
+def grow(model, X, y, add_trees: int):
+    """Salinan model + `add_trees` estimator baru yang dilatih di (X, y)."""
+    m = copy.deepcopy(model)
+    params = m.get_params()
+    if "warm_start" not in params or "n_estimators" not in params:
+        raise ValueError(f"{type(m).__name__} tidak mendukung warm_start")
+    m.set_params(warm_start=True, n_estimators=params["n_estimators"] + add_trees)
+    m.fit(X, y)
+    m.set_params(warm_start=False)
+    return m
+
+def score(model, X, y) -> dict:
+    return score_pred(y, model.predict(X))
+
+def score_pred(y, pred) -> dict:
+    return {"MAE": round(float(mean_absolute_error(y, pred)), 3),
+            "R2": round(float(r2_score(y, pred)), 3) if len(y) > 1 else None}
+
+def regressed(old: dict, new: dict, tol: float) -> bool:
+    if new["MAE"] > old["MAE"] * (1 + tol) + 1e-9:
+        return True
+    if old["R2"] is not None and new["R2"] is not None and new["R2"] < old["R2"] - tol:
+        return True
+    return False
+
+def retrain(bundle_path: str, reader, add_trees: int = 20, holdout: float = 0.2,
+            min_rows: int = 20, tol: float = 0.02, dry_run: bool = False) -> dict:
+    spath = state_path(bundle_path)
+    state = load_state(spath)
+    bundle = joblib.load(bundle_path)
+    features, encoder = bundle["features"], bundle["encoder"]
+
+    check_ground_truth(reader.get_dataframe())
+    consumed = set(state.get("consumed", []))
+    raw, total = new_rows(reader, state["rows_seen"], consumed)
+    feats, ys = to_features(raw, features, known_categories(bundle))
+    settled = raw.index[has_ground_truth(raw).to_numpy()]
+    result = {"rows_seen": state["rows_seen"], "rows_total": total, "rows_new": len(raw),
+              "rows_usable": len(feats), "rows_waiting": len(raw) - len(settled), "published": False}
+    if len(feats) < min_rows:
+        result["reason"] = f"baris baru terpakai {len(feats)} < min_rows {min_rows}"
+        return result
+
+    X = encoder.transform(feats[features])
+    n_hold = max(1, int(round(len(X) * holdout)))
+    X_tr, X_ho = X[:-n_hold], X[-n_hold:]
+
+    t0 = time.perf_counter()
+    metrics, grown = {}, {}
+    if "model" in bundle:
+        # bundle multi-output: 1 model, kolom output sesuai bundle["targets"]
+        order = bundle.get("targets", list(TARGETS))
+        Y = np.column_stack([ys[t] for t in order])
+        grown["model"] = grow(bundle["model"], X_tr, Y[:-n_hold], add_trees)
+        p_old, p_new = bundle["model"].predict(X_ho), grown["model"].predict(X_ho)
+        for j, t in enumerate(order):
+            metrics[t] = {"old": score_pred(ys[t][-n_hold:], p_old[:, j]),
+                          "new": score_pred(ys[t][-n_hold:], p_new[:, j])}
+    else:
+        for t in TARGETS:
+            old_model = bundle[f"model_{t}"]
+            grown[f"model_{t}"] = grow(old_model, X_tr, ys[t][:-n_hold], add_trees)
+            metrics[t] = {"old": score(old_model, X_ho, ys[t][-n_hold:]),
+                          "new": score(grown[f"model_{t}"], X_ho, ys[t][-n_hold:])}
+    result.update(fit_s=round(time.perf_counter() - t0, 3), holdout_rows=n_hold, metrics=metrics)
+
+    bad = [t for t in TARGETS if regressed(metrics[t]["old"], metrics[t]["new"], tol)]
+    if bad:
+        result["reason"] = f"metrik turun untuk {', '.join(bad)} -> bundle lama dipertahankan"
+        return result
+    if dry_run:
+        result["reason"] = "dry-run"
+        return result
+
+    new_bundle = {**bundle, **grown}
+    _atomic_write(bundle_path, lambda p: joblib.dump(new_bundle, p))
+
+    state["version"] += 1
+    # baris berealisasi (terpakai atau tidak layak) selesai; yang belum berealisasi ditunggu
+    done = consumed | set(settled.tolist())
+    cursor = state["rows_seen"]
+    while cursor < total and cursor in done:
+        cursor += 1
+    state["rows_seen"] = cursor
+    state["consumed"] = sorted(i for i in done if i >= cursor)
+    state["history"].append({"version": state["version"], "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                             "rows_new": len(raw), "metrics": metrics})
+    _atomic_write(spath, lambda p: Path(p).write_text(json.dumps(state, indent=2), encoding="utf-8"))
+    result.update(published=True, version=state["version"])
+    return result
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Retraining inkremental (warm start) dari laporan baru di sheet.")
+    ap.add_argument("--bundle", default=DEFAULT_BUNDLE)
+    ap.add_argument("--add-trees", type=int, default=20, help="Pohon/stage baru per target.")
+    ap.add_argument("--holdout", type=float, default=0.2, help="Porsi baris baru terakhir untuk evaluasi.")
+    ap.add_argument("--min-rows", type=int, default=20)
+    ap.add_argument("--tol", type=float, default=0.02, help="Toleransi penurunan MAE (relatif) / R² (absolut).")
+    ap.add_argument("--dry-run", action="store_true", help="Latih & evaluasi tanpa menyimpan bundle.")
+    ap.add_argument("--init", action="store_true",
+                    help="Tandai semua baris sheet saat ini sebagai sudah dipakai (bundle baru dari training penuh).")
+    args = ap.parse_args(argv)
+
+    from core.data_source import SheetReader
+    if args.init:
+        spath = state_path(args.bundle)
+        state = load_state(spath)
+        state["rows_seen"] = len(SheetReader().get_dataframe())
+        state["consumed"] = []
+        _atomic_write(spath, lambda p: Path(p).write_text(json.dumps(state, indent=2), encoding="utf-8"))
+        print(f"✅ rows_seen = {state['rows_seen']} tersimpan di {spath}")
+        return
+    res = retrain(args.bundle, SheetReader(), add_trees=args.add_trees, holdout=args.holdout,
+                  min_rows=args.min_rows, tol=args.tol, dry_run=args.dry_run)
+    print(json.dumps(res, indent=2))
+    if res["published"]:
+        print(f"✅ Bundle versi {res['version']} tersimpan di {args.bundle}")
+    else:
+        print(f"ℹ️ Bundle tidak diubah: {res.get('reason')}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+# training/pipeline.py
+"""
+Pipeline training terpadu: load CSV -> OrdinalEncoder -> split 80:20 -> fit semua
+kandidat model (RF/GBR) untuk target air & mobil SECARA PARALEL -> evaluasi -> simpan
+bundle + evaluation JSON dalam format yang dibaca `core.predictor.FirePredictor`.
+
+Contoh:
+  python training/pipeline.py --config training/configs/real.json
+  python training/pipeline.py --config training/configs/compare_fair.json --jobs 4 --baseline
+"""
+import argparse, json, os, sys, time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from training import feature_store  # noqa: E402
+from training.feature_store import TARGETS, encode_frame  # noqa: E402
+
+JOINT = "air+mobil"  # key target untuk model multi-output
+
+ESTIMATORS = {
+    "RandomForestRegressor": RandomForestRegressor,
+    "GradientBoostingRegressor": GradientBoostingRegressor,
+}
+
+def load_config(path) -> dict:
+    cfg = json.loads(Path(path).read_text(encoding="utf-8"))
+    cfg.setdefault("test_size", 0.2)
+    cfg.setdefault("random_state", 42)
+    cfg.setdefault("dropna", "all")      # all = fitur+target, targets = hanya target
+    cfg.setdefault("round", 2)
+    if "candidates" not in cfg:
+        raise ValueError(f"{path}: 'candidates' wajib diisi")
+    return cfg
+
+# ====== data ======
+def load_encoded(cfg: dict, df: pd.DataFrame | None = None) -> dict:
+    """
+    Matriks ter-encode untuk cfg. Tanpa `df`: lewat feature store (CSV di-encode sekali,
+    berikutnya array mmap dipakai ulang selama hash CSV+config sama). `"feature_store": false`
+    di config memaksa encode langsung dari CSV.
+    """
+    if df is not None:
+        return encode_frame(cfg, df)
+    if cfg.get("feature_store", True) is False:
+        return encode_frame(cfg, pd.read_csv(cfg["csv"]))
+    return feature_store.load_or_build(cfg, cfg.get("feature_store_root", feature_store.STORE_ROOT))
+
+def prepare_data(cfg: dict, df: pd.DataFrame | None = None) -> dict:
+    """CSV -> matriks ter-encode + split. Nama kolom target diambil dari cfg['targets']."""
+    enc = load_encoded(cfg, df)
+    X_train, X_test, y_air_train, y_air_test, y_mobil_train, y_mobil_test = train_test_split(
+        enc["X"], enc["y"]["air"], enc["y"]["mobil"],
+        test_size=cfg["test_size"], random_state=cfg["random_state"]
+    )
+    return {
+        "features": enc["features"], "encoder": enc["encoder"], "store": enc.get("path"),
+        "X_train": X_train, "X_test": X_test,
+        "y_train": {"air": y_air_train, "mobil": y_mobil_train},
+        "y_test": {"air": y_air_test, "mobil": y_mobil_test},
+    }
+
+# ====== training ======
+def make_estimator(spec: dict, inner_jobs: int | None = None, force: bool = False):
+    """`force` = n_jobs internal tetap `inner_jobs` walau config kandidat menyetel n_jobs sendiri."""
+    cls = ESTIMATORS[spec["type"]]
+    params = dict(spec.get("params", {}))
+    if inner_jobs and "n_jobs" in cls().get_params() and (force or "n_jobs" not in params):
+        params["n_jobs"] = inner_jobs
+    return cls(**params)
+
+def _targets_of(spec: dict) -> tuple:
+    """Kandidat multi-output (`"multi_output": true`) = 1 model untuk kedua target sekaligus."""
+    return (JOINT,) if spec.get("multi_output") else TARGETS
+
+def _y_for(y: dict, target: str):
+    return np.column_stack([y[t] for t in TARGETS]) if target == JOINT else y[target]
+
+def predict_targets(models: dict, name: str, X) -> tuple:
+    """(pred_air, pred_mobil) untuk kandidat `name`, baik 2 model terpisah maupun 1 model multi-output."""
+    if (name, JOINT) in models:
+        pred = models[(name, JOINT)].predict(X)
+        return pred[:, 0], pred[:, 1]
+    return models[(name, "air")].predict(X), models[(name, "mobil")].predict(X)
+
+def _fit_one(spec, inner_jobs, force, X, y):
+    t0 = time.perf_counter()
+    model = make_estimator(spec, inner_jobs, force).fit(X, y)
+    return model, time.perf_counter() - t0
+
+def fit_all(candidates: list, X_train, y_train: dict, jobs: int = -1,
+            inner_jobs: int | None = None) -> tuple:
+    """
+    Fit setiap (kandidat, target) sebagai job terpisah di process pool.
+    Core yang tersisa dibagi ke n_jobs internal RandomForest supaya tidak oversubscribe;
+    `inner_jobs` memaksa n_jobs internal (mis. jobs=1, inner_jobs=1 = benar-benar berurutan).
+    Return: ({(nama, target): model}, {(nama, target): detik_fit}, detik_wall).
+    """
+    tasks = [(c, t) for c in candidates for t in _targets_of(c)]
+    cpu = os.cpu_count() or 1
+    n_outer = cpu if jobs in (None, -1) else max(1, int(jobs))
+    n_outer = min(n_outer, len(tasks))
+    inner = inner_jobs or max(1, cpu // n_outer)
+    force = inner_jobs is not None
+
+    t0 = time.perf_counter()
+    out = Parallel(n_jobs=n_outer, backend="loky")(
+        delayed(_fit_one)(c, inner, force, X_train, _y_for(y_train, t)) for c, t in tasks
+    )
+    wall = time.perf_counter() - t0
+    models = {(c["name"], t): m for (c, t), (m, _) in zip(tasks, out)}
+    fit_s = {(c["name"], t): s for (c, t), (_, s) in zip(tasks, out)}
+    return models, fit_s, wall
+
+def evaluate(model_air, model_mobil, X_test, y_test: dict, rnd: int = 2) -> dict:
+    return evaluate_predictions(model_air.predict(X_test), model_mobil.predict(X_test), y_test, rnd)
+
+def evaluate_predictions(y_air_pred, y_mobil_pred, y_test: dict, rnd: int = 2) -> dict:
+    return {
+        "MAE_air": round(mean_absolute_error(y_test["air"], y_air_pred), rnd),
+        "MSE_air": round(mean_squared_error(y_test["air"], y_air_pred), rnd),
+        "R2_air": round(r2_score(y_test["air"], y_air_pred), rnd),
+        "MAE_mobil": round(mean_absolute_error(y_test["mobil"], y_mobil_pred), rnd),
+        "MSE_mobil": round(mean_squared_error(y_test["mobil"], y_mobil_pred), rnd),
+        "R2_mobil": round(r2_score(y_test["mobil"], y_mobil_pred), rnd),
+    }
+
+# ====== output ======
+def build_bundle(cfg: dict, data: dict, models: dict) -> dict:
+    """
+    1 kandidat -> format FirePredictor (model_air/model_mobil, atau `model` untuk multi-output);
+    >1 kandidat -> model_air_<nama> / model_mobil_<nama>, atau model_<nama> untuk multi-output.
+    """
+    cands = cfg["candidates"]
+    bundle = {"encoder": data["encoder"], "features": data["features"]}
+    for c in cands:
+        suffix = "" if len(cands) == 1 else f"_{c['name']}"
+        if c.get("multi_output"):
+            bundle[f"model{suffix}"] = models[(c["name"], JOINT)]
+            bundle["targets"] = list(TARGETS)   # urutan kolom output model multi-output
+        else:
+            bundle[f"model_air{suffix}"] = models[(c["name"], "air")]
+            bundle[f"model_mobil{suffix}"] = models[(c["name"], "mobil")]
+    return bundle
+
+def run(cfg: dict, jobs: int = -1, baseline: bool = False, data: dict | None = None) -> dict:
+    data = data or prepare_data(cfg)
+    cands = cfg["candidates"]
+
+    models, fit_s, wall = fit_all(cands, data["X_train"], data["y_train"], jobs=jobs)
+    timing = {
+        "wall_s": round(wall, 3),
+        "fit_s": {f"{n}/{t}": round(s, 3) for (n, t), s in fit_s.items()},
+        "sum_fit_s": round(sum(fit_s.values()), 3),
+    }
+    if baseline:
+        # ukur ulang berurutan (1 proses, 1 core) sebagai pembanding speedup yang jujur
+        _, _, seq_wall = fit_all(cands, data["X_train"], data["y_train"], jobs=1, inner_jobs=1)
+        timing["sequential_wall_s"] = round(seq_wall, 3)
+        timing["speedup"] = round(seq_wall / wall, 2) if wall else None
+
+    rnd = cfg["round"]
+    evals = {c.get("label", c["name"]): evaluate_predictions(*predict_targets(models, c["name"], data["X_test"]),
+                                                             data["y_test"], rnd)
+             for c in cands}
+    if len(cands) == 1:
+        evaluation = {**next(iter(evals.values())), **cfg.get("evaluation_extra", {})}
+    else:
+        evaluation = evals
+
+    bundle = build_bundle(cfg, data, models)
+    if cfg.get("bundle"):
+        os.makedirs(os.path.dirname(cfg["bundle"]) or ".", exist_ok=True)
+        joblib.dump(bundle, cfg["bundle"])
+    if cfg.get("evaluation"):
+        os.makedirs(os.path.dirname(cfg["evaluation"]) or ".", exist_ok=True)
+        Path(cfg["evaluation"]).write_text(json.dumps(evaluation, indent=2), encoding="utf-8")
+
+    return {"bundle": bundle, "evaluation": evaluation, "timing": timing, "data": data}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Training terpadu RF/GBR untuk air & mobil (paralel).")
+    ap.add_argument("--config", required=True, help="File config JSON (lihat training/configs/).")
+    ap.add_argument("--jobs", type=int, default=-1, help="Jumlah proses paralel (-1 = semua core).")
+    ap.add_argument("--baseline", action="store_true", help="Ukur juga versi berurutan untuk speedup.")
+    args = ap.parse_args(argv)
+
+    cfg = load_config(args.config)
+    print(f"✅ Load dataset: {cfg['csv']}")
+    res = run(cfg, jobs=args.jobs, baseline=args.baseline)
+
+    print(json.dumps(res["evaluation"], indent=2))
+    t = res["timing"]
+    msg = f"⏱️ Wall-clock fit: {t['wall_s']} s (jumlah waktu fit per job: {t['sum_fit_s']} s)"
+    if "speedup" in t:
+        msg += f", berurutan: {t['sequential_wall_s']} s -> speedup {t['speedup']}x"
+    print(msg)
+    if cfg.get("bundle"):
+        print(f"✅ Bundle tersimpan di {cfg['bundle']}")
+    if cfg.get("evaluation"):
+        print(f"✅ Evaluasi tersimpan di {cfg['evaluation']}")
+
+if __name__ == "__main__":
+    sys.exit(main())
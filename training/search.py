@@ -0,0 +1,209 @@
+# training/search.py
+"""
+Pencarian hyperparameter RF/GBR dengan cross-validation paralel.
+
+- Dataset di-encode SEKALI lewat feature store (training/feature_store.py); indeks fold
+  disimpan di cache/search/, worker membuka X/y dengan mmap (tanpa encode/copy ulang).
+- Kandidat = kombinasi grid (training/configs/search_grid.json); dievaluasi per
+  (kandidat, fold) di process pool. `--strategy halving` memakai successive halving:
+  semua kandidat dinilai di sedikit fold, hanya 1/eta terbaik lanjut ke fold berikutnya.
+- Leaderboard (fit time, latensi prediksi, MAE/R² air & mobil) ditulis ke
+  model/report_compare.json.
+
+Contoh:
+  python training/search.py --config training/configs/compare_fair.json --cv 5 --jobs -1
+  python training/search.py --config training/configs/trees_from_csv.json --strategy halving
+"""
+import argparse, itertools, json, math, os, sys, time
+from pathlib import Path
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.model_selection import KFold
+from sklearn.metrics import mean_absolute_error, r2_score
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from training import feature_store  # noqa: E402
+from training.pipeline import TARGETS, ESTIMATORS, load_config  # noqa: E402
+
+DEFAULT_GRID = "training/configs/search_grid.json"
+DEFAULT_REPORT = "model/report_compare.json"
+DEFAULT_CACHE = "cache/search"
+
+# ====== fold di atas feature store ======
+def build_cache(cfg: dict, cv: int, seed: int, cache_root: str) -> dict:
+    """
+    Matriks ter-encode diambil dari feature store (encode sekali per hash CSV+config);
+    di sini cukup indeks fold, disimpan per (hash, cv, seed) supaya run berikutnya sama persis.
+    """
+    store = feature_store.load_or_build(cfg, cfg.get("feature_store_root", feature_store.STORE_ROOT))
+    folds_path = os.path.join(cache_root, f"folds_{store['hash']}_cv{cv}_s{seed}.npz")
+    if not os.path.exists(folds_path):
+        os.makedirs(cache_root, exist_ok=True)
+        folds = list(KFold(n_splits=cv, shuffle=True, random_state=seed).split(store["X"]))
+        tmp = folds_path + ".tmp.npz"
+        np.savez(tmp,
+                 **{f"train_{i}": tr for i, (tr, _) in enumerate(folds)},
+                 **{f"test_{i}": te for i, (_, te) in enumerate(folds)})
+        os.replace(tmp, folds_path)
+    return {"store": store["path"], "folds": folds_path}
+
+def _load(paths: dict, fold: int):
+    X = np.load(os.path.join(paths["store"], "X.npy"), mmap_mode="r")
+    ys = {t: np.load(os.path.join(paths["store"], f"y_{t}.npy"), mmap_mode="r") for t in TARGETS}
+    with np.load(paths["folds"]) as f:
+        tr, te = f[f"train_{fold}"], f[f"test_{fold}"]
+    return X, ys, tr, te
+
+# ====== kandidat ======
+def expand_grid(grid: dict) -> list:
+    """{"RandomForestRegressor": {"n_estimators": [100, 200], ...}} -> daftar spec kandidat."""
+    cands = []
+    for est_type, space in grid.items():
+        if est_type not in ESTIMATORS:
+            raise ValueError(f"Estimator tidak dikenal: {est_type}")
+        keys = sorted(space)
+        for values in itertools.product(*(space[k] for k in keys)):
+            params = dict(zip(keys, values))
+            name = est_type.replace("Regressor", "") + "(" + ", ".join(f"{k}={v}" for k, v in params.items()) + ")"
+            cands.append({"name": name, "type": est_type, "params": params})
+    return cands
+
+def _eval_fold(paths: dict, spec: dict, fold: int, seed: int) -> dict:
+    X, ys, tr, te = _load(paths, fold)
+    X_tr, X_te = X[tr], X[te]
+    out = {"fold": fold}
+    for t in TARGETS:
+        params = dict(spec["params"])
+        est = ESTIMATORS[spec["type"]]
+        if "random_state" in est().get_params():
+            params.setdefault("random_state", seed)
+        if "n_jobs" in est().get_params():
+            params["n_jobs"] = 1  # paralelisme ada di level pool
+        model = est(**params)
+
+        t0 = time.perf_counter()
+        model.fit(X_tr, ys[t][tr])
+        out[f"fit_s_{t}"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        pred = model.predict(X_te)
+        out[f"predict_batch_us_per_row_{t}"] = (time.perf_counter() - t0) / max(len(te), 1) * 1e6
+
+        row = X_te[:1]
+        t0 = time.perf_counter()
+        for _ in range(20):
+            model.predict(row)
+        out[f"predict_single_ms_{t}"] = (time.perf_counter() - t0) / 20 * 1000
+
+        out[f"MAE_{t}"] = float(mean_absolute_error(ys[t][te], pred))
+        out[f"R2_{t}"] = float(r2_score(ys[t][te], pred))
+    return out
+
+def _summarize(spec: dict, fold_results: list) -> dict:
+    keys = [k for k in fold_results[0] if k != "fold"]
+    mean = {k: float(np.mean([r[k] for r in fold_results])) for k in keys}
+    row = {
+        "name": spec["name"], "type": spec["type"], "params": spec["params"],
+        "folds": len(fold_results),
+        "fit_s": round(mean["fit_s_air"] + mean["fit_s_mobil"], 4),
+        "predict_single_ms": round(mean["predict_single_ms_air"] + mean["predict_single_ms_mobil"], 4),
+        "predict_batch_us_per_row": round(mean["predict_batch_us_per_row_air"]
+                                          + mean["predict_batch_us_per_row_mobil"], 4),
+    }
+    for t in TARGETS:
+        row[f"MAE_{t}"] = round(mean[f"MAE_{t}"], 3)
+        row[f"R2_{t}"] = round(mean[f"R2_{t}"], 3)
+        row[f"R2_{t}_std"] = round(float(np.std([r[f"R2_{t}"] for r in fold_results])), 3)
+    # skor ranking: rata-rata R² kedua target (lebih tinggi lebih baik)
+    row["score"] = round((row["R2_air"] + row["R2_mobil"]) / 2, 4)
+    return row
+
+# ====== strategi ======
+def _run_tasks(path, tasks, seed, jobs, results):
+    todo = [(c, f) for c, f in tasks if (c["name"], f) not in results]
+    out = Parallel(n_jobs=jobs, backend="loky")(delayed(_eval_fold)(path, c, f, seed) for c, f in todo)
+    for (c, f), r in zip(todo, out):
+        results[(c["name"], f)] = r
+
+def search_grid(path, cands, cv, seed, jobs) -> list:
+    results = {}
+    _run_tasks(path, [(c, f) for c in cands for f in range(cv)], seed, jobs, results)
+    return [_summarize(c, [results[(c["name"], f)] for f in range(cv)]) for c in cands]
+
+def search_halving(path, cands, cv, seed, jobs, eta=3) -> list:
+    """Successive halving dengan jumlah fold sebagai resource; hasil fold lama dipakai ulang."""
+    results, board = {}, {}
+    alive = list(cands)
+    n_rounds = max(1, math.ceil(math.log(len(cands), eta))) if len(cands) > 1 else 1
+    for r in range(n_rounds + 1):
+        n_folds = cv if r == n_rounds else max(1, min(cv, math.ceil(cv * eta ** (r - n_rounds))))
+        _run_tasks(path, [(c, f) for c in alive for f in range(n_folds)], seed, jobs, results)
+        rows = [_summarize(c, [results[(c["name"], f)] for f in range(n_folds)]) for c in alive]
+        for row in rows:
+            board[row["name"]] = row
+        if r == n_rounds or len(alive) == 1:
+            break
+        rows.sort(key=lambda x: x["score"], reverse=True)
+        keep = {x["name"] for x in rows[:max(1, math.ceil(len(alive) / eta))]}
+        alive = [c for c in alive if c["name"] in keep]
+    return list(board.values())
+
+def write_report(report_path: str, leaderboard: list, meta: dict) -> dict:
+    """Leaderboard + ringkasan kandidat terbaik per jenis (kunci RF/GBR seperti laporan lama)."""
+    leaderboard = sorted(leaderboard, key=lambda x: (x["folds"], x["score"]), reverse=True)
+    for i, row in enumerate(leaderboard, 1):
+        row["rank"] = i
+    report = {}
+    for short, est_type in (("RF", "RandomForestRegressor"), ("GBR", "GradientBoostingRegressor")):
+        best = next((r for r in leaderboard if r["type"] == est_type), None)
+        if best:
+            report[short] = {k: best[k] for k in ("MAE_air", "R2_air", "MAE_mobil", "R2_mobil")}
+            report[short]["params"] = best["params"]
+    report["leaderboard"] = leaderboard
+    report["search"] = meta
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    Path(report_path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return report
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="CV hyperparameter search paralel untuk model air & mobil.")
+    ap.add_argument("--config", required=True, help="Config dataset (training/configs/*.json).")
+    ap.add_argument("--grid", default=DEFAULT_GRID, help="Grid parameter per estimator (JSON).")
+    ap.add_argument("--cv", type=int, default=5)
+    ap.add_argument("--strategy", choices=["grid", "halving"], default="grid")
+    ap.add_argument("--eta", type=int, default=3, help="Faktor eliminasi successive halving.")
+    ap.add_argument("--jobs", type=int, default=-1)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--cache-dir", default=DEFAULT_CACHE)
+    ap.add_argument("--report", default=DEFAULT_REPORT)
+    args = ap.parse_args(argv)
+
+    cfg = load_config(args.config)
+    cands = expand_grid(json.loads(Path(args.grid).read_text(encoding="utf-8")))
+
+    t0 = time.perf_counter()
+    path = build_cache(cfg, args.cv, args.seed, args.cache_dir)
+    prep_s = time.perf_counter() - t0
+    print(f"✅ Dataset ter-encode: {path['store']} ({prep_s:.2f} s)")
+    print(f"🔎 {len(cands)} kandidat, {args.cv}-fold, strategi {args.strategy}")
+
+    t0 = time.perf_counter()
+    if args.strategy == "halving":
+        board = search_halving(path, cands, args.cv, args.seed, args.jobs, eta=args.eta)
+    else:
+        board = search_grid(path, cands, args.cv, args.seed, args.jobs)
+    wall = time.perf_counter() - t0
+
+    report = write_report(args.report, board, {
+        "config": args.config, "csv": cfg["csv"], "cv": args.cv, "strategy": args.strategy,
+        "seed": args.seed, "n_candidates": len(cands), "wall_s": round(wall, 2), "cache": path,
+    })
+    print(f"{'#':>3}  {'score':>7}  {'R2_air':>7}  {'R2_mob':>7}  {'fit s':>7}  kandidat")
+    for row in report["leaderboard"][:10]:
+        print(f"{row['rank']:>3}  {row['score']:>7}  {row['R2_air']:>7}  {row['R2_mobil']:>7}  "
+              f"{row['fit_s']:>7}  {row['name']}")
+    print(f"✅ Leaderboard tersimpan di {args.report} ({wall:.1f} s)")
+
+if __name__ == "__main__":
+    sys.exit(main())
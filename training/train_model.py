@@ -1,67 +1,10 @@
 # training/train_dummy_model.py
-import pandas as pd
-import joblib, json, os
-from pathlib import Path
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OrdinalEncoder
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, r2_score,mean_squared_error
+# Pembungkus lama; logika training ada di training/pipeline.py (config: training/configs/dummy.json)
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# === Load Data Dummy ===
-df = pd.read_csv("data/Dataset_Real_Dummy_6000.csv")
-features = [
-             'lokasi', 
-            'kawasan',
-            'obyek',
-            
-            ]
-target_air = 'air'
-target_mobil = 'mobil'
+from training.pipeline import main
 
-# === Preprocessing ===
-df_clean = df[features + [target_air, target_mobil]].dropna()
-
-# ✅ Encoder yang mendukung input baru
-encoder = OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1)
-X = encoder.fit_transform(df_clean[features])
-
-y_air = df_clean[target_air].values
-y_mobil = df_clean[target_mobil].values
-
-# === Split Data 80:20 ===
-X_train, X_test, y_air_train, y_air_test, y_mobil_train, y_mobil_test = train_test_split(
-    X, y_air, y_mobil, test_size=0.2, random_state=42
-)
-
-# === Train Models ===
-model_air = RandomForestRegressor(n_estimators=100, random_state=42)
-model_air.fit(X_train, y_air_train)
-
-model_mobil = RandomForestRegressor(n_estimators=100, random_state=42)
-model_mobil.fit(X_train, y_mobil_train)
-
-# === Evaluation ===
-y_air_pred = model_air.predict(X_test)
-y_mobil_pred = model_mobil.predict(X_test)
-evaluation = {
-    "MAE_air": round(mean_absolute_error(y_air_test, y_air_pred), 2),
-    "MSE_air": round(mean_squared_error(y_air_test, y_air_pred), 2),
-    "R2_air": round(r2_score(y_air_test, y_air_pred), 2),
-
-    "MAE_mobil": round(mean_absolute_error(y_mobil_test, y_mobil_pred), 2),
-    "MSE_mobil": round(mean_squared_error(y_mobil_test, y_mobil_pred), 2),
-    "R2_mobil": round(r2_score(y_mobil_test, y_mobil_pred), 2)
-}
-
-# === Save Model & Evaluation ===
-os.makedirs("model", exist_ok=True)
-joblib.dump({
-    'model_air': model_air,
-    'model_mobil': model_mobil,
-    'encoder': encoder,
-    'features': features
-}, "model/trained_model_dummy.pkl")
-
-Path("model/evaluation_dummy.json").write_text(json.dumps(evaluation, indent=2))
-print("✅ Model dummy selesai dilatih dan disimpan.")
-print(json.dumps(evaluation, indent=2))
+if __name__ == "__main__":
+    main(["--config", "training/configs/dummy.json"] + sys.argv[1:])
+    print("✅ Model dummy selesai dilatih dan disimpan.")